@@ -11,7 +11,9 @@ import uuid
 
 from ..models.UniversalMessage import UniversalMessage, ErrorTypes
 from ..dependencies import get_settings_manager_instance
-from ..dependencies import get_explanation_delivery_service_instance
+from ..dependencies import get_explanation_delivery_service_instance, get_detection_pipeline_instance, get_durable_queues_instance
+from ..queues.FileQueueLocks import queue_file_lock
+from ..core.ollama_timings import OLLAMA_KEEP_ALIVE, OLLAMA_WARMUP, OllamaTimings
 
 # === Config ===
 # Moved configuration to constants for clarity
@@ -21,6 +23,11 @@ CACHE_FILE = "Backend/AI/explanation_cache.json"
 MODEL = "llama3.2"
 COOLDOWN_SECONDS = 300
 OLLAMA_API_URL = "http://localhost:11434/api/chat"
+EXPLANATION_SYSTEM_PROMPT = (
+    "You are a helpful assistant explaining technical terms in clear language. "
+    "Provide a clear, concise explanation in 1-2 sentences. Focus on what the term means and why it's important. "
+    "Do not include reasoning or thought processes."
+)
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -46,19 +53,22 @@ class MainModel:
 
         # A single, reusable async HTTP client is more efficient.
         self.http_client = httpx.AsyncClient(timeout=180.0)
+        self.ollama_timings = OllamaTimings("MainModel")
 
         # Import outgoing queue for immediate explanation updates
         from ..core.Queues import queues
         self.outgoing_queue = queues.outgoing
 
         # CRITICAL FIX: Locks to prevent race conditions when accessing shared files.
-        # Each file that is read, modified, and then written back needs its own lock.
-        self.detections_lock = asyncio.Lock()
-        self.explanations_lock = asyncio.Lock()
+        # Each file that is read, modified, and then written back needs its own lock,
+        # shared with the other writers of the queue files.
+        self.detections_lock = queue_file_lock(self.detections_queue_file)
+        self.explanations_lock = queue_file_lock(self.explanations_queue_file)
         self.cache_lock = asyncio.Lock()
 
         # Cooldown tracking (Note: this is still in-memory and will reset on restart)
         self.explained_terms = {}
+        self._warm_up_task: Optional[asyncio.Task] = None
 
     async def send_explanation_update(self, term: str, explanation: str, entry: Dict):
         """
@@ -152,32 +162,15 @@ class MainModel:
         if is_retry:
             retry_instruction = " This is a regeneration request - provide an alternative, more extensive explanation than what might have been given before."
 
-        # Style-specific instructions
-        style_instructions = {
-            "simple": "Provide a brief, easy-to-understand explanation in 1 sentence.",
-            "detailed": "Provide a comprehensive explanation in 2-3 sentences with examples if helpful.",
-            "technical": "Provide an in-depth technical explanation with precise terminology and context.",
-            "beginner": "Provide an explanation suitable for complete beginners, avoiding jargon and using simple analogies."
-        }
-        
-        style_instruction = style_instructions.get(explanation_style, style_instructions["detailed"])
-        
-        retry_instruction = ""
-        if is_retry:
-            retry_instruction = " This is a regeneration request - provide an alternative, more extensive explanation than what might have been given before."
-
+        # The system message is fixed so Ollama can reuse its evaluated prefix; what varies per
+        # user and term comes after it, the term and its context last
+        instructions = f"{role_context}{domain_context}{retry_instruction}".strip()
+        if domain and domain.strip():
+            instructions += f" Domain focus: {domain.strip()}."
+        request = f'Please directly explain the term "{term}" as used in this context:\n"{context}"'
         return [
-            {
-                "role": "system",
-                "content": f"You are a helpful assistant explaining technical terms in clear language.{role_context}{domain_context}{retry_instruction}"
-            },
-            {
-                "role": "user",
-                "content": f"""Please directly explain the term "{term}" as used in this context:
-"{context}"
-
-{f"Domain focus: {domain.strip()}. " if domain and domain.strip() else ""}Provide a clear, concise explanation in 1-2 sentences. Focus on what the term means and why it's important. Do not include reasoning or thought processes."""
-            }
+            {"role": "system", "content": EXPLANATION_SYSTEM_PROMPT},
+            {"role": "user", "content": f"{instructions.strip()}\n\n{request}" if instructions.strip() else request},
         ]
 
     async def query_llm(self, messages: List[Dict], model: str = MODEL) -> Optional[str]:
@@ -187,10 +180,12 @@ class MainModel:
         try:
             response = await self.http_client.post(
                 OLLAMA_API_URL,
-                json={"model": model, "messages": messages, "stream": False},
+                json={"model": model, "messages": messages, "stream": False, "keep_alive": OLLAMA_KEEP_ALIVE},
             )
             response.raise_for_status()
-            raw_response = response.json()["message"]["content"].strip()
+            result = response.json()
+            self.ollama_timings.record(result, "explanation")
+            raw_response = result["message"]["content"].strip()
             return self.clean_output(raw_response)
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error querying LLM: {e.response.status_code} - {e.response.text}")
@@ -198,6 +193,26 @@ class MainModel:
             logger.error(f"Error querying LLM: {e}", exc_info=True)
         return None
 
+    async def warm_up(self, model: str = MODEL):
+        """Loads the model and evaluates the fixed system prompt once before the first explanation."""
+        try:
+            response = await self.http_client.post(
+                OLLAMA_API_URL,
+                json={
+                    "model": model,
+                    "messages": [{"role": "system", "content": EXPLANATION_SYSTEM_PROMPT}],
+                    "stream": False,
+                    "keep_alive": OLLAMA_KEEP_ALIVE,
+                    "options": {"num_predict": 1},
+                },
+            )
+            response.raise_for_status()
+            timing = self.ollama_timings.record(response.json(), "warm-up")
+            logger.info(f"MainModel: Warmed up {model} (load {timing['load_ms']:.0f}ms, "
+                        f"prompt eval {timing['prompt_eval_ms']:.0f}ms)")
+        except Exception as e:
+            logger.warning(f"MainModel: Ollama warm-up failed: {e}")
+
     async def load_cache(self) -> Dict[str, str]:
         """Load explanation cache from file safely."""
         async with self.cache_lock:
@@ -229,6 +244,19 @@ class MainModel:
         """
         FIX: Write explanation to output queue safely using a lock to prevent race conditions.
         """
+        durable_queues = get_durable_queues_instance()
+        if durable_queues is not None:
+            try:
+                await durable_queues.explanations.add([explanation_entry])
+                logger.info(f"Successfully wrote explanation to the durable queue for client {explanation_entry.get('client_id')}")
+            except Exception as e:
+                logger.error(f"Error writing explanation to the durable queue: {e}", exc_info=True)
+                return False
+            delivery_service = get_explanation_delivery_service_instance()
+            if delivery_service:
+                delivery_service.trigger_immediate_check()
+            return True
+
         async with self.explanations_lock:
             try:
                 current_queue = []
@@ -263,6 +291,11 @@ class MainModel:
 
     async def process_detections_queue(self):
         """Process detected terms from SmallModel and generate explanations."""
+        durable_queues = get_durable_queues_instance()
+        if durable_queues is not None:
+            await self._process_durable_detections(durable_queues)
+            return
+
         pending_detections = []
         
         # --- Stage 1: Safely read and update the detections queue ---
@@ -292,6 +325,55 @@ class MainModel:
             except FileNotFoundError:
                 return
         # --- Stage 2: Process the items outside the lock to avoid blocking other writers ---
+        await self.explain_detections(pending_detections)
+        await self._mark_detections_processed([entry["id"] for entry in pending_detections])
+
+    async def _mark_detections_processed(self, detection_ids: List[str]):
+        """Marks explained detections as 'processed', so the QueueCompactionService can archive them."""
+        if not detection_ids:
+            return
+        id_set = set(detection_ids)
+        async with self.detections_lock:
+            try:
+                async with aiofiles.open(self.detections_queue_file, 'r', encoding='utf-8') as f:
+                    content = await f.read()
+                all_detections = json.loads(content) if content.strip() else []
+                processed_at = time.time()
+                for entry in all_detections:
+                    if entry.get("id") in id_set:
+                        entry["status"] = "processed"
+                        entry["processed_at"] = processed_at
+                temp_file = self.detections_queue_file.with_suffix('.tmp')
+                async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
+                    await f.write(json.dumps(all_detections, indent=2, ensure_ascii=False))
+                await asyncio.to_thread(os.replace, str(temp_file), str(self.detections_queue_file))
+            except FileNotFoundError:
+                return
+            except Exception as e:
+                logger.error(f"Error marking detections as processed: {e}")
+
+    async def _process_durable_detections(self, durable_queues):
+        """Claims pending detections in the durable queue; they are marked processed once explained."""
+        claimed = await durable_queues.detections.claim("pending", "processing")
+        if not claimed:
+            await durable_queues.maybe_compact()
+            return
+        logger.info(f"Claimed {len(claimed)} detections from the durable queue.")
+        done = []
+        try:
+            for entry in claimed:
+                await self.explain_detections([entry])
+                done.append(entry["id"])
+        except Exception as e:
+            # Released for the next poll instead of waiting for the claim to expire; if this
+            # process dies, the claim expires and the detections are retried all the same
+            logger.error(f"Error explaining durable detections, releasing {len(claimed) - len(done)}: {e}", exc_info=True)
+            await durable_queues.detections.set_status([entry["id"] for entry in claimed[len(done):]], "pending")
+        finally:
+            await durable_queues.detections.set_status(done, "processed")
+
+    async def explain_detections(self, pending_detections: List[Dict]):
+        """Generate explanations for claimed detections and queue them for delivery."""
         if not pending_detections:
             return
 
@@ -351,14 +433,48 @@ class MainModel:
 
     async def run_continuous_processing(self):
         """Run continuous processing loop for detected terms."""
-        logger.info(f"Starting MainModel continuous processing, monitoring: {self.detections_queue_file}")
+        if OLLAMA_WARMUP:
+            # In the background: detections arriving meanwhile wait for the model load anyway
+            self._warm_up_task = asyncio.create_task(self.warm_up())
+        try:
+            pipeline = get_detection_pipeline_instance()
+            if pipeline is not None:
+                await self._consume_detection_pipeline(pipeline)
+                return
+            logger.info(f"Starting MainModel continuous processing, monitoring: {self.detections_queue_file}")
+            while True:
+                try:
+                    await self.process_detections_queue()
+                    await asyncio.sleep(1)
+                except asyncio.CancelledError:
+                    logger.info("MainModel processing cancelled by shutdown")
+                    break
+                except KeyboardInterrupt:
+                    logger.info("MainModel processing stopped by user")
+                    break
+        finally:
+            # Stopped with the processing, like the SmallModel warm-up with the MessageRouter
+            if self._warm_up_task and not self._warm_up_task.done():
+                self._warm_up_task.cancel()
+                await asyncio.gather(self._warm_up_task, return_exceptions=True)
+
+    async def _consume_detection_pipeline(self, pipeline):
+        """Processing loop on the in-process detection pipeline: no polling, each batch as soon as it is queued."""
+        logger.info("Starting MainModel continuous processing, consuming the in-process detection pipeline")
         while True:
             try:
-                await self.process_detections_queue()
-                await asyncio.sleep(1)
+                batch = await pipeline.get_batch()
+                for n, entry in enumerate(batch):
+                    try:
+                        await self.explain_detections([entry])
+                    except Exception:
+                        # Retried after the back-off; still unacknowledged in the journal for a restart
+                        await pipeline.requeue(batch[n:])
+                        raise
+                    pipeline.task_done([entry])
             except asyncio.CancelledError:
                 logger.info("MainModel processing cancelled by shutdown")
                 break
-            except KeyboardInterrupt:
-                logger.info("MainModel processing stopped by user")
-                break
\ No newline at end of file
+            except Exception as e:
+                logger.error(f"Error processing detections from the pipeline: {e}", exc_info=True)
+                await asyncio.sleep(1)
@@ -6,12 +6,18 @@ import aiofiles
 import asyncio
 import logging
 import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from ..models.UniversalMessage import UniversalMessage
-from ..dependencies import get_settings_manager_instance
+from ..dependencies import get_settings_manager_instance, get_detection_pipeline_instance, get_durable_queues_instance
+from ..core.hallucination_filter import context_aware_filter
+from ..core.detection_cache import DetectionCache, detection_cache_key
+from ..core.json_stream import JsonObjectStream
+from ..core.ollama_timings import OLLAMA_KEEP_ALIVE, OllamaTimings
+from ..queues.FileQueueLocks import queue_file_lock
 
 # Setup logging
 logger = logging.getLogger(__name__)
@@ -24,7 +30,94 @@ DETECTIONS_QUEUE_FILE = Path("Backend/AI/detections_queue.json")
 
 # Performance configuration
 AI_TIMEOUT_SECONDS = int(os.getenv("SMALLMODEL_AI_TIMEOUT", "180"))  # Configurable AI timeout
-BATCH_DELAY_SECONDS = float(os.getenv("SMALLMODEL_BATCH_DELAY", "0.5"))  # Configurable batch delay
+BATCH_DELAY_SECONDS = float(os.getenv("SMALLMODEL_BATCH_DELAY", "0.5"))  # Configurable batch delay (0 = no batching)
+BATCH_MAX_SENTENCES = int(os.getenv("SMALLMODEL_BATCH_MAX_SENTENCES", "8"))  # A full batch is sent at once
+# Interim transcripts run through the pattern detector only; set to 0 to ignore interims
+SPECULATIVE_DETECTION = os.getenv("SMALLMODEL_SPECULATIVE_DETECTION", "1").lower() in ("1", "true", "yes")
+MAX_TRACKED_UTTERANCES = 256  # Utterances whose speculative terms await their final
+# Fixed instructions of every detection request. They come first and never change, so Ollama
+# reuses their evaluated prefix from its KV cache; the per-sentence text follows in the user message.
+DETECTION_SYSTEM_PROMPT = """Domain Term Extraction Prompt
+You mark the technical terms or words in transcribed sentences that might not be understood by a general audience.
+
+CRITICAL FILTERING RULES:
+1. IGNORE small talk, greetings, fillers (hello, hi, okay, well, you know, etc.)
+2. IGNORE basic common words (the, and, but, very, really, etc.)
+3. IGNORE prompt-related words (extract, technical, terms, confidence, json, etc.)
+4. IGNORE generic tech words without domain specificity (system, data, process, etc.)
+5. PRIORITIZE genuinely technical, domain-specific, or specialized terms
+6. If the input seems to be silence, empty, or contains prompt fragments, return []
+
+ADAPTIVE EXTRACTION STRATEGY:
+- If sentence contains clear technical/domain terms: Extract ONLY high-confidence technical terms
+- If sentence is mostly casual/small talk: Extract 1-2 moderately interesting words to maintain user engagement
+- NEVER extract pure greetings or fillers, but consider contextually relevant words
+
+CONFIDENCE SCORING (0.01-0.99):
+- 0.90-0.99: Highly technical/specialized terms needing explanation (neural network, backpropagation, cryptocurrency)
+- 0.70-0.89: Moderately technical terms (algorithm, database, authentication)
+- 0.50-0.69: Somewhat technical but commonly known (website, email, password)
+- 0.01-0.49: Common/basic terms (should rarely be extracted unless in casual conversation)
+
+Extract technical or domain specific terms and return ONLY a valid JSON object.
+Do not return anything else — no markdown, no comments, no prose.
+---
+### EXAMPLE RESPONSES ###
+
+Technical conversation example:
+Input: "We implemented a neural network using backpropagation."
+Output: {"terms": [{"term": "neural network", "confidence": 0.92}, {"term": "backpropagation", "confidence": 0.89}]}
+
+Casual conversation with some interesting terms:
+Input: "I really enjoyed that photography workshop last weekend."
+Output: {"terms": [{"term": "photography workshop", "confidence": 0.65}]}
+
+Pure small talk example:
+Input: "Hi there, how are you doing today?"
+Output: {"terms": []}
+
+Silence/contamination example:
+Input: "extract technical terms"
+Output: {"terms": []}
+
+Numbered sentences example:
+Input:
+1. "We deploy it with Kubernetes."
+2. "Thanks, see you tomorrow."
+Output: {"terms": [{"sentence": 1, "term": "Kubernetes", "confidence": 0.85}]}
+########################################
+---
+Output Format:
+Return a JSON object {"terms": [...]}. Each term object has these keys:
+- "term" (string): The technical term, exactly as it appears in the input
+- "confidence" (float): 0.01 (simple/common) to 0.99 (very technical/obscure)
+- "sentence" (int): Only for numbered sentences: the number of the sentence the term appears in
+---"""
+
+# Ollama structured output: "schema" constrains decoding to DETECTION_SCHEMA, "json" only to
+# valid JSON (Ollama < 0.5), "" leaves the format to the prompt
+OUTPUT_FORMAT = os.getenv("SMALLMODEL_OUTPUT_FORMAT", "schema").lower()
+DETECTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "terms": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "term": {"type": "string"},
+                    "confidence": {"type": "number"},
+                    "sentence": {"type": "integer"},
+                },
+                "required": ["term", "confidence"],
+            },
+        },
+    },
+    "required": ["terms"],
+}
+
+# Read Ollama's token stream and announce each term as soon as its JSON object is complete
+STREAMING_DETECTION = os.getenv("SMALLMODEL_STREAMING", "1").lower() in ("1", "true", "yes")
 
 class SmallModel:
     """
@@ -39,18 +132,28 @@ class SmallModel:
         # Using a single, reusable async HTTP client is more efficient
         self.http_client = httpx.AsyncClient(timeout=180.0)
         
-        # A lock is essential to prevent race conditions when writing to the shared queue file
-        self.queue_lock = asyncio.Lock()
         self.detections_queue_file = DETECTIONS_QUEUE_FILE
+        # A lock is essential to prevent race conditions when writing to the shared queue file
+        self.queue_lock = queue_file_lock(self.detections_queue_file)
 
         # Import outgoing queue for immediate notifications
         from ..core.Queues import queues
         self.outgoing_queue = queues.outgoing
 
-        # Batching for improved performance
+        # Batching for improved performance: sentences of all clients that arrive within batch_delay
+        # share one LLM request (list of (sentence, user_role, domain, on_term, future))
         self.detection_batch = []
         self.batch_timeout = None
-        self.batch_delay = BATCH_DELAY_SECONDS  # seconds to collect terms before sending batch
+        self.batch_delay = BATCH_DELAY_SECONDS  # seconds to collect sentences before sending a batch
+        self.batch_max_sentences = BATCH_MAX_SENTENCES
+        # In-flight batch requests; referenced here so they are not garbage-collected and can be cancelled on stop()
+        self._batch_tasks = set()
+        self.batch_stats = {"sentences": 0, "requests": 0, "max_batch": 0}
+        self.ollama_timings = OllamaTimings("SmallModel")
+        # Repeated and replayed sentences (and manual requests on a just-detected sentence) reuse the result
+        self.detection_cache = DetectionCache()
+        # How detection responses were parsed: structured fast path or lenient extraction
+        self.parse_stats = {"structured": 0, "fallback": 0}
 
         # Filtering configuration
         self.confidence_threshold = 0.4  # Terms with confidence < this are ignored 
@@ -129,13 +232,18 @@ class SmallModel:
             "format", "keys", "string", "float", "int", "output", "prompt", "user", "role"
         }
         self.cooldown_map = {}
+        # Terms shown speculatively from interims, per utterance_id, until its final reconciles them
+        # (then None, so that interims processed after their final are ignored)
+        self.speculative_terms: "OrderedDict[str, Optional[Dict[str, Dict]]]" = OrderedDict()
         self.detections_queue_file.parent.mkdir(parents=True, exist_ok=True)
         logger.info("SmallModel initialized and ready to produce detections.")
 
-    async def send_immediate_detection_notification(self, message: UniversalMessage, detected_terms: List[Dict]):
+    async def send_immediate_detection_notification(self, message: UniversalMessage, detected_terms: List[Dict],
+                                                    status: str = "detected"):
         """
         Send immediate detection notification to frontend while processing continues in background.
         This provides instant user feedback showing detected terms without waiting for explanations.
+        Terms found in interim transcripts are sent with status "speculative".
         """
         try:
             if not detected_terms:
@@ -151,13 +259,14 @@ class SmallModel:
                             "confidence": term_data.get("confidence", 0.5),
                             "context": term_data["context"],
                             "timestamp": term_data["timestamp"],
-                            "status": "detected",  # Status: detected -> processing -> explained
+                            "status": status,  # Status: (speculative ->) detected -> processing -> explained
                             "explanation": None  # Will be filled in later
                         }
                         for term_data in detected_terms
                     ],
                     "original_message_id": message.id,
-                    "processing_status": "terms_detected"
+                    "utterance_id": message.payload.get("utterance_id"),
+                    "processing_status": "terms_speculative" if status == "speculative" else "terms_detected"
                 },
                 client_id=message.client_id,
                 origin="SmallModel",
@@ -172,6 +281,54 @@ class SmallModel:
         except Exception as e:
             logger.error(f"Error sending immediate detection notification: {e}", exc_info=True)
 
+    async def send_retraction_notification(self, message: UniversalMessage, retracted_terms: List[Dict],
+                                           utterance_id: Optional[str]):
+        """Tells the frontend to drop placeholders of speculative terms the final transcript did not confirm."""
+        try:
+            retraction = UniversalMessage(
+                type="detection.retracted",
+                payload={
+                    "retracted_terms": [
+                        {"term": term_data["term"], "reason": term_data["reason"]} for term_data in retracted_terms
+                    ],
+                    "utterance_id": utterance_id,
+                    "original_message_id": message.id,
+                },
+                client_id=message.client_id,
+                origin="SmallModel",
+                destination="frontend"
+            )
+            await self.outgoing_queue.enqueue(retraction)
+            logger.info(f"Retracted {len(retracted_terms)} speculative terms for client {message.client_id}")
+        except Exception as e:
+            logger.error(f"Error sending retraction notification: {e}", exc_info=True)
+
+    def parse_detection_response(self, content: str) -> List[Dict]:
+        """
+        Term objects of a detection response. Fast path: the {"terms": [...]} object of structured
+        output, validated item by item; anything else goes through safe_json_extract.
+        """
+        try:
+            parsed = json.loads(content)
+        except (json.JSONDecodeError, TypeError):
+            parsed = None
+        if isinstance(parsed, dict) and isinstance(parsed.get("terms"), list):
+            self.parse_stats["structured"] += 1
+            return [item for item in parsed["terms"] if self._is_valid_term(item)]
+
+        self.parse_stats["fallback"] += 1
+        return [item for item in self.safe_json_extract(content or "") if self._is_valid_term(item)]
+
+    @staticmethod
+    def _is_valid_term(item) -> bool:
+        """A term object with a non-empty term and, if given, a numeric confidence."""
+        if not isinstance(item, dict):
+            return False
+        term, confidence = item.get("term"), item.get("confidence")
+        if not isinstance(term, str) or not term.strip():
+            return False
+        return confidence is None or (isinstance(confidence, (int, float)) and not isinstance(confidence, bool))
+
     def safe_json_extract(self, content: str) -> List[Dict]:
         """
         Safely and aggressively extracts a JSON array from a raw LLM response.
@@ -306,19 +463,41 @@ class SmallModel:
             # Unknown content type - use normal threshold
             return self.confidence_threshold  # 0.6
 
+    @staticmethod
+    def _detection_request(prompt: str, stream: bool) -> Dict:
+        """Ollama chat request: the fixed system prompt, then `prompt` with the variable part."""
+        return {
+            "model": LLAMA_MODEL,
+            "messages": [
+                {"role": "system", "content": DETECTION_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "stream": stream,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            **({"format": DETECTION_SCHEMA if OUTPUT_FORMAT == "schema" else "json"} if OUTPUT_FORMAT else {}),
+        }
+
+    async def warm_up(self):
+        """Loads the model and evaluates the fixed system prompt once, so its KV cache is ready for the first transcript."""
+        try:
+            request = self._detection_request("Warm-up, no sentence yet. Return []", stream=False)
+            request["options"] = {"num_predict": 1}
+            response = await self.http_client.post(OLLAMA_API_URL, json=request)
+            response.raise_for_status()
+            timing = self.ollama_timings.record(response.json(), "warm-up")
+            logger.info(f"SmallModel: Warmed up {LLAMA_MODEL} (load {timing['load_ms']:.0f}ms, "
+                        f"prompt eval {timing['prompt_eval_ms']:.0f}ms)")
+        except Exception as e:
+            logger.warning(f"SmallModel: Ollama warm-up failed: {e}")
+
     async def _query_ollama_async(self, prompt: str) -> Optional[str]:
         """Asynchronously queries the Ollama server to avoid blocking the event loop."""
         try:
-            response = await self.http_client.post(
-                OLLAMA_API_URL,
-                json={
-                    "model": LLAMA_MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "stream": False
-                }
-            )
+            response = await self.http_client.post(OLLAMA_API_URL, json=self._detection_request(prompt, stream=False))
             response.raise_for_status()
-            return response.json()['message']['content']
+            result = response.json()
+            self.ollama_timings.record(result, "detection")
+            return result['message']['content']
         except httpx.RequestError as e:
             logger.error(f"Ollama query failed (HTTP request error): {e}")
             return None
@@ -326,131 +505,178 @@ class SmallModel:
             logger.error(f"An unexpected error occurred during AI detection: {e}", exc_info=True)
             return None
 
-    async def detect_terms_with_ai(self, sentence: str, user_role: Optional[str] = None, domain: Optional[str] = None) -> List[Dict]:
-        """Use Ollama to detect important terms in the given sentence asynchronously."""
+    async def _stream_ollama_async(self, prompt: str, on_object: Callable[[Dict], Awaitable[None]]) -> Optional[str]:
+        """
+        Queries Ollama with streaming enabled and calls `on_object` with every JSON object of the
+        response as soon as it is complete. Returns the whole response, like _query_ollama_async.
+        """
+        parser = JsonObjectStream()
+        content = []
+        try:
+            async with self.http_client.stream(
+                "POST", OLLAMA_API_URL, json=self._detection_request(prompt, stream=True)
+            ) as response:
+                response.raise_for_status()
+                # NDJSON: one chunk per line, the last one with "done": true
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        logger.error(f"Ollama stream failed: {chunk['error']}")
+                        return None
+                    token = chunk.get("message", {}).get("content", "")
+                    content.append(token)
+                    for obj in parser.feed(token):
+                        try:
+                            await on_object(obj)
+                        except Exception as e:
+                            logger.error(f"Error handling streamed detection {obj}: {e}", exc_info=True)
+                    if chunk.get("done"):
+                        # The last chunk carries the metrics of the whole request
+                        self.ollama_timings.record(chunk, "streamed detection")
+                        break
+            return "".join(content)
+        except httpx.RequestError as e:
+            logger.error(f"Ollama query failed (HTTP request error): {e}")
+            return None
+        except Exception as e:
+            logger.error(f"An unexpected error occurred during streaming AI detection: {e}", exc_info=True)
+            return None
+
+    async def detect_terms_with_ai(self, sentence: str, user_role: Optional[str] = None, domain: Optional[str] = None,
+                                   on_term: Optional[Callable[[Dict], Awaitable[None]]] = None) -> List[Dict]:
+        """
+        Use Ollama to detect important terms in the given sentence asynchronously. With `on_term`,
+        each term is also passed to it as soon as the streamed response contains it. Results are
+        cached per sentence, domain and role; identical requests in flight share one detection.
+        """
+        key = detection_cache_key(sentence, self._resolve_domain(domain), user_role)
+        return await self.detection_cache.get_or_detect(
+            key, lambda: self._detect_terms_uncached(sentence, user_role, domain, on_term))
+
+    async def _detect_terms_uncached(self, sentence: str, user_role: Optional[str], domain: Optional[str],
+                                     on_term: Optional[Callable[[Dict], Awaitable[None]]]) -> Tuple[List[Dict], bool]:
+        """Detected terms, and whether they came from the LLM (pattern fallback results are not cached)."""
         # Use configurable timeout for faster fallback
         ai_timeout = AI_TIMEOUT_SECONDS
-        
+
         try:
             # Try AI detection with timeout
-            detection_task = asyncio.create_task(self._perform_ai_detection(sentence, user_role, domain))
-            ai_result = await asyncio.wait_for(detection_task, timeout=ai_timeout)
-            
+            ai_result = await asyncio.wait_for(self._detect_batched(sentence, user_role, domain, on_term), timeout=ai_timeout)
+
             if ai_result:
                 logger.info(f"AI detection completed for: {sentence[:50]}...")
-                return ai_result
+                return ai_result, True
                 
         except asyncio.TimeoutError:
             logger.warning(f"AI detection timed out after {ai_timeout}s, using fallback detection")
         except Exception as e:
             logger.error(f"AI detection failed: {e}, using fallback detection")
         
-        # Use fast fallback detection
+        # Use fast fallback detection (also when the LLM found nothing)
         logger.info(f"Using fallback detection for: {sentence[:50]}...")
-        return await self.detect_terms_fallback(sentence)
+        return await self.detect_terms_fallback(sentence), False
     
-    async def _perform_ai_detection(self, sentence: str, user_role: Optional[str] = None, domain: Optional[str] = None) -> List[Dict]:
-        """Perform AI-based term detection with the LLM. Uses global settings for domain if not provided."""
-        # Get domain from SettingsManager if not provided
+    async def _detect_batched(self, sentence: str, user_role: Optional[str] = None, domain: Optional[str] = None,
+                              on_term: Optional[Callable[[Dict], Awaitable[None]]] = None) -> List[Dict]:
+        """Adds the sentence to the current batch and waits for its share of the batch's LLM response."""
+        if self.batch_delay <= 0:
+            return await self._perform_ai_detection(sentence, user_role, domain, on_term)
+        future = asyncio.get_running_loop().create_future()
+        self.detection_batch.append((sentence, user_role, domain, on_term, future))
+        if len(self.detection_batch) >= self.batch_max_sentences:
+            self._flush_detection_batch()
+        elif self.batch_timeout is None:
+            self.batch_timeout = asyncio.get_running_loop().call_later(self.batch_delay, self._flush_detection_batch)
+        return await future
+
+    def _flush_detection_batch(self):
+        """Sends the collected sentences: one LLM request per (user_role, domain), which shape the prompt."""
+        if self.batch_timeout is not None:
+            self.batch_timeout.cancel()
+            self.batch_timeout = None
+        batch, self.detection_batch = self.detection_batch, []
+        groups: Dict[tuple, List[tuple]] = {}
+        for request in batch:
+            groups.setdefault((request[1], request[2]), []).append(request)
+        for (user_role, domain), requests in groups.items():
+            task = asyncio.create_task(self._run_detection_batch(requests, user_role, domain))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def stop(self):
+        """Cancels the collected sentences and the batch requests still waiting for Ollama."""
+        if self.batch_timeout is not None:
+            self.batch_timeout.cancel()
+            self.batch_timeout = None
+        batch, self.detection_batch = self.detection_batch, []
+        for *_, future in batch:
+            future.cancel()
+        tasks = list(self._batch_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_detection_batch(self, requests: List[tuple], user_role: Optional[str], domain: Optional[str]):
+        sentences = [request[0] for request in requests]
+        self.batch_stats["sentences"] += len(sentences)
+        self.batch_stats["requests"] += 1
+        self.batch_stats["max_batch"] = max(self.batch_stats["max_batch"], len(sentences))
+        on_terms = [request[3] for request in requests]
+        try:
+            if len(sentences) == 1:
+                results = [await self._perform_ai_detection(sentences[0], user_role, domain, on_terms[0])]
+            else:
+                logger.info(f"SmallModel: Detecting terms in a batch of {len(sentences)} sentences")
+                results = await self._perform_batch_ai_detection(sentences, user_role, domain, on_terms)
+        except asyncio.CancelledError:
+            for *_, future in requests:
+                future.cancel()  # Callers stop waiting instead of running into AI_TIMEOUT_SECONDS
+            raise
+        except Exception as e:
+            for *_, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), result in zip(requests, results):
+            if not future.done():  # The caller may have timed out
+                future.set_result(result)
+
+    def _resolve_domain(self, domain: Optional[str]) -> Optional[str]:
+        """Gets the domain from the SettingsManager if the transcript does not carry one."""
         if not domain:
             settings_manager = get_settings_manager_instance()
             if settings_manager:
                 domain = settings_manager.get_setting("domain", "")
-                
-        context_intro = f"Mark the technical terms or words that might not be understood by a general audience in this sentence"
+        return domain
+
+    def _build_detection_prompt(self, sentences: List[str], user_role: Optional[str], domain: Optional[str]) -> str:
+        """
+        The variable part of the detection prompt, sent after the fixed DETECTION_SYSTEM_PROMPT:
+        first what stays the same for a session (domain examples, role), the sentences last.
+        """
+        if len(sentences) == 1:
+            context_intro = f"Mark the technical terms or words that might not be understood by a general audience in this sentence"
+        else:
+            context_intro = f"Mark the technical terms or words that might not be understood by a general audience in each of these numbered sentences"
         if user_role:
             context_intro += f", considering the user is a '{user_role}'"
         if domain and domain.strip():
             context_intro += f", in the context of '{domain.strip()}'"
-        context_intro += f": \"{sentence}\""
-
-        prompt = f"""
-Domain Term Extraction Prompt
-{context_intro}
-
-CRITICAL FILTERING RULES:
-1. IGNORE small talk, greetings, fillers (hello, hi, okay, well, you know, etc.)
-2. IGNORE basic common words (the, and, but, very, really, etc.)  
-3. IGNORE prompt-related words (extract, technical, terms, confidence, json, etc.)
-4. IGNORE generic tech words without domain specificity (system, data, process, etc.)
-5. PRIORITIZE genuinely technical, domain-specific, or specialized terms
-6. If the input seems to be silence, empty, or contains prompt fragments, return []
-
-ADAPTIVE EXTRACTION STRATEGY:
-- If sentence contains clear technical/domain terms: Extract ONLY high-confidence technical terms
-- If sentence is mostly casual/small talk: Extract 1-2 moderately interesting words to maintain user engagement
-- NEVER extract pure greetings or fillers, but consider contextually relevant words
+        if len(sentences) == 1:
+            context_intro += f": \"{sentences[0]}\""
+        else:
+            context_intro += ":\n" + "\n".join(f"{n}. \"{sentence}\"" for n, sentence in enumerate(sentences, 1))
 
-DOMAIN-SPECIFIC EXAMPLES:
+        return f"""DOMAIN-SPECIFIC EXAMPLES:
 {self._get_domain_examples(domain)}
+{f"Focus on terms relevant to: {domain.strip()}. " if domain and domain.strip() else ""}The user's role is "{user_role}". Adjust the confidence and terms accordingly.
 
-CONFIDENCE SCORING (0.01-0.99):
-- 0.90-0.99: Highly technical/specialized terms needing explanation (neural network, backpropagation, cryptocurrency)
-- 0.70-0.89: Moderately technical terms (algorithm, database, authentication)
-- 0.50-0.69: Somewhat technical but commonly known (website, email, password)
-- 0.01-0.49: Common/basic terms (should rarely be extracted unless in casual conversation)
-
-Extract technical or domain specific terms and return ONLY a valid JSON array of objects.
-Do not return anything else — no markdown, no comments, no prose.
-{f"Focus on terms relevant to: {domain.strip()}" if domain and domain.strip() else ""}
----
-### EXAMPLE RESPONSES ###
-
-Technical conversation example:
-Input: "We implemented a neural network using backpropagation."
-Output:
-[
-  {{
-    "term": "neural network",
-    "confidence": 0.92,
-    "context": "We implemented a neural network using backpropagation.",
-    "timestamp": 1234567890
-  }},
-  {{
-    "term": "backpropagation", 
-    "confidence": 0.89,
-    "context": "We implemented a neural network using backpropagation.",
-    "timestamp": 1234567890
-  }}
-]
-
-Casual conversation with some interesting terms:
-Input: "I really enjoyed that photography workshop last weekend."
-Output:
-[
-  {{
-    "term": "photography workshop",
-    "confidence": 0.65,
-    "context": "I really enjoyed that photography workshop last weekend.",
-    "timestamp": 1234567890
-  }}
-]
-
-Pure small talk example:
-Input: "Hi there, how are you doing today?"
-Output: []
-
-Silence/contamination example:
-Input: "extract technical terms"
-Output: []
-########################################
----
-Output Format:
-Return a JSON **array of objects**. Each object must have these keys:
-- "term" (string): The technical term
-- "confidence" (float): 0.01 (simple/common) to 0.99 (very technical/obscure)
-- "context" (string): The full input sentence
-- "timestamp" (int): A Unix timestamp
----
-{f"Domain context: {domain.strip()}. " if domain and domain.strip() else ""}Repeat: the user's role is "{user_role}". Adjust the confidence and terms accordingly.
+{context_intro}
 """
-        raw_response = await self._query_ollama_async(prompt)
-        if not raw_response:
-            return []
 
-        now = int(time.time())
-        raw_terms = self.safe_json_extract(raw_response)
-        
+    def _parse_detected_terms(self, raw_terms: List, sentence: str, now: int) -> List[Dict]:
         processed_terms = []
         for term_info in raw_terms:
             if isinstance(term_info, dict) and "term" in term_info:
@@ -463,6 +689,72 @@ Return a JSON **array of objects**. Each object must have these keys:
                 })
         return processed_terms
 
+    async def _query_detection(self, prompt: str, on_object: Optional[Callable[[Dict], Awaitable[None]]]) -> Optional[str]:
+        """The LLM response to a detection prompt, streamed into `on_object` if someone waits for single terms."""
+        if on_object is not None and STREAMING_DETECTION:
+            return await self._stream_ollama_async(prompt, on_object)
+        return await self._query_ollama_async(prompt)
+
+    async def _perform_ai_detection(self, sentence: str, user_role: Optional[str] = None, domain: Optional[str] = None,
+                                    on_term: Optional[Callable[[Dict], Awaitable[None]]] = None) -> List[Dict]:
+        """Perform AI-based term detection with the LLM. Uses global settings for domain if not provided."""
+        domain = self._resolve_domain(domain)
+
+        async def on_object(term_info: Dict):
+            if self._is_valid_term(term_info):
+                for term_obj in self._parse_detected_terms([term_info], sentence, int(time.time())):
+                    await on_term(term_obj)
+
+        raw_response = await self._query_detection(self._build_detection_prompt([sentence], user_role, domain),
+                                                   on_object if on_term is not None else None)
+        if not raw_response:
+            # Raised, not an empty result: the caller falls back to pattern detection and does not cache it
+            raise RuntimeError("No detection response from Ollama")
+        return self._parse_detected_terms(self.parse_detection_response(raw_response), sentence, int(time.time()))
+
+    @staticmethod
+    def _sentence_of_term(term_info: Dict, sentences: List[str]) -> Optional[int]:
+        """Index of the batch sentence a term belongs to: its "sentence" number, else the first sentence containing it."""
+        number = term_info.get("sentence")
+        if isinstance(number, int) and 1 <= number <= len(sentences):
+            return number - 1
+        term_lower = str(term_info.get("term", "")).lower()
+        return next((i for i, sentence in enumerate(sentences) if term_lower and term_lower in sentence.lower()), None)
+
+    async def _perform_batch_ai_detection(self, sentences: List[str], user_role: Optional[str] = None,
+                                          domain: Optional[str] = None,
+                                          on_terms: Optional[List[Optional[Callable[[Dict], Awaitable[None]]]]] = None
+                                          ) -> List[List[Dict]]:
+        """
+        Detects terms in several sentences with one LLM request and returns them per sentence.
+        Terms are assigned by their "sentence" number, else to the first sentence containing them.
+        """
+        domain = self._resolve_domain(domain)
+        on_terms = on_terms or [None] * len(sentences)
+
+        async def on_object(term_info: Dict):
+            index = self._sentence_of_term(term_info, sentences)
+            if self._is_valid_term(term_info) and index is not None and on_terms[index] is not None:
+                for term_obj in self._parse_detected_terms([{**term_info, "context": sentences[index]}],
+                                                           sentences[index], int(time.time())):
+                    await on_terms[index](term_obj)
+
+        raw_response = await self._query_detection(self._build_detection_prompt(sentences, user_role, domain),
+                                                   on_object if any(on_terms) else None)
+        results: List[List[Dict]] = [[] for _ in sentences]
+        if not raw_response:
+            raise RuntimeError("No detection response from Ollama")
+
+        now = int(time.time())
+        for term_info in self.parse_detection_response(raw_response):
+            index = self._sentence_of_term(term_info, sentences)
+            if index is None:
+                logger.debug(f"SmallModel: Dropped batch term '{term_info.get('term')}' matching no sentence")
+                continue
+            # The context is always the sentence itself, whatever the model echoed
+            results[index].extend(self._parse_detected_terms([{**term_info, "context": sentences[index]}], sentences[index], now))
+        return results
+
     async def detect_terms_fallback(self, sentence: str) -> List[Dict]:
         """Fallback detection using basic patterns when AI is unavailable."""
         logger.info("Using enhanced fallback detection method")
@@ -524,8 +816,57 @@ Return a JSON **array of objects**. Each object must have these keys:
         logger.info(f"Fallback detection found {len(result_terms)} terms")
         return result_terms
 
+    def _build_queue_entries(self, message: UniversalMessage, detected_terms: List[Dict]) -> List[Dict]:
+        entries = []
+        for term_data in detected_terms:
+            queue_entry = {
+                "id": str(uuid4()),
+                "term": term_data["term"],
+                "context": term_data["context"],
+                "domain": term_data.get("domain", ""),  # Include domain context
+                "explanation_style": term_data.get("explanation_style", "detailed"),  # Include explanation style
+                "timestamp": term_data["timestamp"],
+                "client_id": message.client_id,
+                "user_session_id": message.payload.get("user_session_id"),
+                "original_message_id": term_data.get("source_message_id", message.id),
+                "status": "pending",
+                "explannation": None
+            }
+                # Include confidence only when provided by producer (e.g., AI detection),
+                # manual requests may omit it deliberately.
+            if "confidence" in term_data and term_data["confidence"] is not None:
+                queue_entry["confidence"] = term_data["confidence"]
+
+            entries.append(queue_entry)
+        return entries
+
     async def write_detection_to_queue(self, message: UniversalMessage, detected_terms: List[Dict]) -> bool:
-        """Safely write detected terms to the file-based queue."""
+        """
+        Safely hand detected terms to the MainModel: via the in-process pipeline or the durable
+        SQLite queue if configured, else the file-based queue.
+        """
+        try:
+            entries = self._build_queue_entries(message, detected_terms)
+        except (KeyError, TypeError) as e:
+            logger.error(f"Error writing detections to queue: {e}", exc_info=True)
+            return False
+        pipeline = get_detection_pipeline_instance()
+        if pipeline is not None:
+            if await pipeline.put(entries):
+                logger.info(f"Successfully handed {len(entries)} detections to the detection pipeline.")
+                return True
+            return False
+
+        durable_queues = get_durable_queues_instance()
+        if durable_queues is not None:
+            try:
+                await durable_queues.detections.add(entries)
+                logger.info(f"Successfully wrote {len(entries)} detections to the durable queue.")
+                return True
+            except Exception as e:
+                logger.error(f"Error writing detections to the durable queue: {e}", exc_info=True)
+                return False
+
         async with self.queue_lock:
             try:
                 current_queue = []
@@ -537,26 +878,7 @@ Return a JSON **array of objects**. Each object must have these keys:
                 except FileNotFoundError:
                     logger.info("Detections queue file not found, creating a new one.")
 
-                for term_data in detected_terms:
-                    queue_entry = {
-                        "id": str(uuid4()),
-                        "term": term_data["term"],
-                        "context": term_data["context"],
-                        "domain": term_data.get("domain", ""),  # Include domain context
-                        "explanation_style": term_data.get("explanation_style", "detailed"),  # Include explanation style
-                        "timestamp": term_data["timestamp"],
-                        "client_id": message.client_id,
-                        "user_session_id": message.payload.get("user_session_id"),
-                        "original_message_id": message.id,
-                        "status": "pending",
-                        "explannation": None
-                    }
-                        # Include confidence only when provided by producer (e.g., AI detection),
-                        # manual requests may omit it deliberately.
-                    if "confidence" in term_data and term_data["confidence"] is not None:
-                        queue_entry["confidence"] = term_data["confidence"]
-
-                    current_queue.append(queue_entry)
+                current_queue.extend(entries)
 
                 temp_file = self.detections_queue_file.with_suffix('.tmp')
                 async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
@@ -569,11 +891,155 @@ Return a JSON **array of objects**. Each object must have these keys:
                 logger.error(f"Error writing detections to queue: {e}", exc_info=True)
                 return False
 
+    async def process_interim(self, message: UniversalMessage):
+        """
+        Speculative detection on an interim transcript: only the pattern detector runs, so terms
+        appear while the speaker is still talking. Nothing is queued for explanation and no
+        cooldown starts; the final transcript of the same utterance_id confirms or retracts them.
+        """
+        if message.type != "stt.transcription.interim" or not SPECULATIVE_DETECTION:
+            return
+        utterance_id = message.payload.get("utterance_id")
+        text = message.payload.get("text", "").strip()
+        if not utterance_id or len(text.split()) < 2:
+            return
+
+        try:
+            verdict = context_aware_filter.check(text)
+            if verdict.blocked:
+                logger.debug(f"SmallModel: Skipped interim blocked as hallucination ({verdict.reason}): '{text}'")
+                return
+
+            if utterance_id in self.speculative_terms:
+                shown = self.speculative_terms[utterance_id]
+                if shown is None:
+                    return  # Late interim: the final was already reconciled
+            else:
+                shown = self.speculative_terms[utterance_id] = {}
+                while len(self.speculative_terms) > MAX_TRACKED_UTTERANCES:
+                    self.speculative_terms.popitem(last=False)  # Final never arrived
+
+            new_terms = []
+            for term_obj in await self.detect_terms_fallback(text):
+                term_lower = term_obj["term"].lower()
+                if term_lower in shown or not self.should_pass_filters(term_obj["confidence"], term_obj["term"], text):
+                    continue
+                shown[term_lower] = term_obj
+                new_terms.append(term_obj)
+
+            if new_terms:
+                await self.send_immediate_detection_notification(message, new_terms, status="speculative")
+        except Exception as e:
+            logger.error(f"Error processing interim transcript: {e}", exc_info=True)
+
+    @staticmethod
+    def _transcript_sources(message: UniversalMessage) -> List[Dict]:
+        """The transcripts a message stands for: the ones a coalesced message merged, or itself."""
+        sources = message.payload.get("sources")
+        if sources:
+            return sources
+        return [{
+            "message_id": message.id,
+            "text": message.payload.get("text", ""),
+            "utterance_id": message.payload.get("utterance_id"),
+        }]
+
+    @staticmethod
+    def _source_of_term(term: str, sources: List[Dict]) -> Dict:
+        """The transcript a detected term was said in: the first containing it, else the one sharing most words."""
+        term_lower = term.lower()
+        for source in sources:
+            if re.search(rf"\b{re.escape(term_lower)}\b", source["text"].lower()):
+                return source
+        term_words = set(term_lower.split())
+        return max(reversed(sources), key=lambda source: len(term_words & set(source["text"].lower().split())))
+
+    async def _reconcile_speculative_terms(self, message: UniversalMessage, accepted_terms: List[Dict]) -> List[Dict]:
+        """
+        Reconciles the speculative terms of the final's utterances with the terms accepted from the
+        final: confirmed ones are not announced again, all others are retracted. Returns the
+        accepted terms that still need an immediate notification.
+        """
+        accepted = {term_obj["term"].lower() for term_obj in accepted_terms}
+        already_shown = set()
+        for source in self._transcript_sources(message):
+            utterance_id = source.get("utterance_id")
+            if not utterance_id:
+                continue
+            shown = self.speculative_terms.pop(utterance_id, None)
+            self.speculative_terms[utterance_id] = None  # Tombstone: interims arriving late are ignored
+            while len(self.speculative_terms) > MAX_TRACKED_UTTERANCES:
+                self.speculative_terms.popitem(last=False)
+            if not shown:
+                continue
+
+            already_shown.update(shown)
+            final_text = source["text"].lower()
+            retracted = [
+                {"term": term_obj["term"],
+                 "reason": "not_confirmed" if re.search(rf"\b{re.escape(term_lower)}\b", final_text) else "not_in_final_text"}
+                for term_lower, term_obj in shown.items() if term_lower not in accepted
+            ]
+            if retracted:
+                await self.send_retraction_notification(message, retracted, utterance_id)
+        return [term_obj for term_obj in accepted_terms if term_obj["term"].lower() not in already_shown]
+
+    def stats(self) -> Dict:
+        """Detection cache, batching, response parsing and Ollama timing counters."""
+        return {
+            "cache": self.detection_cache.stats(),
+            "batching": dict(self.batch_stats),
+            "parsing": dict(self.parse_stats),
+            "ollama": self.ollama_timings.stats(),
+        }
+
+    def _cache_source_results(self, sources: List[Dict], terms: List[Dict], user_role: Optional[str], domain: Optional[str]):
+        """
+        After a coalesced detection, caches each source sentence with its own terms: a manual
+        request or replay for one sentence then needs no LLM call. Existing entries are kept.
+        """
+        if len(sources) < 2:
+            return
+        domain = self._resolve_domain(domain)
+        for source in sources:
+            key = detection_cache_key(source["text"], domain, user_role)
+            if self.detection_cache.get(key) is None:
+                own_terms = [{key_: value for key_, value in term_obj.items() if key_ != "source_message_id"}
+                             for term_obj in terms if term_obj.get("source_message_id") == source["message_id"]]
+                self.detection_cache.put(key, own_terms)
+
+    def _passes_transcript_checks(self, text: str) -> bool:
+        """Checks one transcript for prompt contamination, silence repetition and Whisper hallucinations."""
+        text_lower = text.lower().strip()
+
+        # Check for prompt contamination patterns
+        prompt_indicators = [
+            "extract technical terms", "domain term extraction", "confidence float",
+            "json array", "timestamp int", "output format", "perfect response"
+        ]
+        if any(indicator in text_lower for indicator in prompt_indicators):
+            logger.debug(f"SmallModel: Detected prompt contamination, skipping: '{text}'")
+            return False
+
+        # Check for repetitive patterns that suggest transcription errors during silence
+        words = text_lower.split()
+        if len(set(words)) == 1 and len(words) > 3:  # Same word repeated
+            logger.debug(f"SmallModel: Detected repetitive pattern, likely silence error: '{text}'")
+            return False
+
+        # Check for common Whisper hallucination patterns (defense in depth)
+        verdict = context_aware_filter.check(text)
+        if verdict.blocked:
+            logger.warning(f"SmallModel: Blocked Whisper hallucination pattern ({verdict.reason}): '{text}'")
+            return False
+        return True
+
     async def process_message(self, message: UniversalMessage):
         """Processes a transcription, detects terms, and queues them for the MainModel."""
         if message.type != "stt.transcription":
             return  # Silently ignore messages it can't handle
 
+        filtered_terms = []
         try:
             transcribed_text = message.payload.get("text", "")
             logger.info(f"SmallModel: Processing transcript: '{transcribed_text}' for client {message.client_id}")
@@ -589,152 +1055,72 @@ Return a JSON **array of objects**. Each object must have these keys:
                 logger.debug(f"SmallModel: Skipped short transcription: '{transcribed_text}'")
                 return
 
-            # Check for prompt contamination patterns
-            prompt_indicators = [
-                "extract technical terms", "domain term extraction", "confidence float",
-                "json array", "timestamp int", "output format", "perfect response"
-            ]
-            if any(indicator in text_lower for indicator in prompt_indicators):
-                logger.debug(f"SmallModel: Detected prompt contamination, skipping: '{transcribed_text}'")
+            # The quality checks below apply to each transcript of a coalesced message on its own;
+            # blocked ones are left out of the detection request
+            sources = [source for source in self._transcript_sources(message)
+                       if self._passes_transcript_checks(source["text"])]
+            if not sources:
                 return
+            if len(sources) < len(self._transcript_sources(message)):
+                transcribed_text = " ".join(source["text"] for source in sources)
 
-            # Check for repetitive patterns that suggest transcription errors during silence
-            words = text_lower.split()
-            if len(set(words)) == 1 and len(words) > 3:  # Same word repeated
-                logger.debug(f"SmallModel: Detected repetitive pattern, likely silence error: '{transcribed_text}'")
-                return
-            
-            # Check for common Whisper hallucination patterns (defense in depth)
-            # Define patterns with different strictness levels
-            strict_patterns = [
-                "thanks for watching", "thank you for watching", 
-                "please like and subscribe", "don't forget to subscribe",
-                "hit that subscribe button", "smash that like button"
-            ]
-            
-            moderate_patterns = [
-                "see you next time", "that's all for today", "until next time",
-                "catch you later", "thanks for your attention", "thank you for your time",
-                "appreciate you watching", "goodbye", "bye bye"
-            ]
-            
-            simple_patterns = ["thanks", "thank you"]
-            
-            # Check for multiple patterns (even if individually they wouldn't be blocked)
-            pattern_count = 0
-            found_patterns = []
-            all_patterns = strict_patterns + moderate_patterns + simple_patterns
-            for pattern in all_patterns:
-                if pattern in text_lower:
-                    pattern_count += 1
-                    found_patterns.append(pattern)
-            
-            # If multiple patterns found, be more aggressive about blocking
-            if pattern_count >= 2:
-                # Calculate how much of the sentence is NOT pattern-related
-                clean_text = text_lower
-                for pattern in found_patterns:
-                    clean_text = clean_text.replace(pattern, "")
-                clean_text = clean_text.strip()
-                non_filler_words = [w for w in clean_text.split() if w not in ["for", "and", "the", "a", "to", "my", "your", "our", "everyone", "today", ","]]
-                if len(non_filler_words) < 3:
-                    logger.warning(f"SmallModel: Blocked Whisper hallucination pattern (multiple): '{transcribed_text}'")
+            # Terms accepted while the response was still streaming, already announced (by lowercase term)
+            streamed: Dict[str, Dict] = {}
+
+            async def on_streamed_term(term_obj: Dict):
+                source = self._source_of_term(term_obj["term"], sources)
+                term_obj["context"] = source["text"]
+                term_obj["source_message_id"] = source["message_id"]
+                term_lower = term_obj["term"].lower()
+                if term_lower in streamed or not self.should_pass_filters(term_obj["confidence"], term_obj["term"], source["text"]):
                     return
-            
-            # Check strict patterns - block even with some extra content, but allow clear technical context
-            for pattern in strict_patterns:
-                if pattern in text_lower:
-                    clean_text = text_lower.replace(pattern, "").strip()
-                    non_filler_words = [w for w in clean_text.split() if w not in ["for", "and", "the", "a", "to", "my", "your", "our", "everyone"]]
-                    
-                    # Allow if there's substantial technical content
-                    technical_indicators = ["algorithm", "neural", "network", "machine learning", "api", "database", "server", "technical", "system", "data", "code", "software", "engineering", "programming", "patterns", "metrics", "updates", "notifications"]
-                    has_tech_content = any(tech_word in clean_text for tech_word in technical_indicators)
-                    
-                    # Allow if there are business/professional words indicating legitimate context
-                    professional_indicators = ["newsletter", "notifications", "updates", "service", "company", "team", "colleagues", "business", "professional", "implementation", "explain"]
-                    has_professional_content = any(prof_word in clean_text for prof_word in professional_indicators)
-                    
-                    if not (has_tech_content or has_professional_content) and len(non_filler_words) < 3:  # Less than 3 meaningful words left
-                        logger.warning(f"SmallModel: Blocked Whisper hallucination pattern: '{transcribed_text}'")
-                        return
-            
-            # Check moderate patterns - block if they dominate
-            for pattern in moderate_patterns:
-                if pattern in text_lower:
-                    clean_text = text_lower.replace(pattern, "").strip()
-                    non_filler_words = [w for w in clean_text.split() if w not in ["for", "and", "the", "a", "to", "my", "your", "our", "everyone", "today"]]
-                    
-                    # Allow if there's substantial technical content
-                    technical_indicators = ["algorithm", "neural", "network", "machine learning", "api", "database", "server", "technical", "system", "data", "code", "software", "engineering", "programming", "patterns", "metrics", "updates", "notifications"]
-                    has_tech_content = any(tech_word in clean_text for tech_word in technical_indicators)
-                    
-                    # Allow if there are business/professional words indicating legitimate context
-                    professional_indicators = ["newsletter", "notifications", "updates", "service", "company", "team", "colleagues", "business", "professional", "implementation", "explain"]
-                    has_professional_content = any(prof_word in clean_text for prof_word in professional_indicators)
-                    
-                    if not (has_tech_content or has_professional_content) and len(non_filler_words) < 2:  # Less than 2 meaningful words left
-                        logger.warning(f"SmallModel: Blocked Whisper hallucination pattern: '{transcribed_text}'")
-                        return
-            
-            # Check simple patterns - block if entire sentence or very dominant, but allow technical context
-            for pattern in simple_patterns:
-                if pattern in text_lower:
-                    # Special case: if the entire sentence is just "thanks" or "thank you", block it
-                    if text_lower.strip() == pattern.strip():
-                        logger.warning(f"SmallModel: Blocked Whisper hallucination pattern: '{transcribed_text}'")
-                        return
-                    
-                    clean_text = text_lower.replace(pattern, "").strip()
-                    
-                    # Allow if there's clear technical context
-                    technical_indicators = ["algorithm", "neural", "network", "machine learning", "api", "database", "server", "technical", "system", "data", "code", "software", "engineering", "programming", "advances", "implementation", "process", "metrics", "updates", "notifications"]
-                    has_tech_content = any(tech_word in clean_text for tech_word in technical_indicators)
-                    
-                    # Allow if there are business/professional words indicating legitimate context
-                    professional_indicators = ["newsletter", "notifications", "updates", "service", "company", "team", "colleagues", "business", "professional", "implementation", "explain"]
-                    has_professional_content = any(prof_word in clean_text for prof_word in professional_indicators)
-                    
-                    # Special handling for "thanks" - only allow if it's clearly part of "thanks to X" construction with technical content
-                    if pattern == "thanks":
-                        if "to" in clean_text and (has_tech_content or has_professional_content):
-                            continue  # Allow "thanks to machine learning" etc.
-                        # If it's not "thanks to X" with tech content, and there's little else, block it
-                        if len(clean_text) < 5:  # Very little other content
-                            logger.warning(f"SmallModel: Blocked Whisper hallucination pattern: '{transcribed_text}'")
-                            return
-                    
-                    # For other simple patterns, only block if there's very little other content AND no technical context
-                    elif not (has_tech_content or has_professional_content) and len(clean_text) < 3:
-                        logger.warning(f"SmallModel: Blocked Whisper hallucination pattern: '{transcribed_text}'")
-                        return
+                streamed[term_lower] = term_obj
+                self.cooldown_map[term_lower] = time.time()
+                logger.info(f"Accepted streamed term: '{term_obj['term']}' (confidence: {term_obj['confidence']}) for client {message.client_id}")
+                if term_lower not in (self.speculative_terms.get(source.get("utterance_id")) or {}):
+                    await self.send_immediate_detection_notification(message, [term_obj])
 
             # Log before AI detection
             logger.info(f"SmallModel: Running AI detection on: '{transcribed_text}'")
             detected_terms = await self.detect_terms_with_ai(
                 transcribed_text,
                 message.payload.get("user_role"),
-                message.payload.get("domain")  # Pass domain context from transcription message
+                message.payload.get("domain"),  # Pass domain context from transcription message
+                on_term=on_streamed_term,
             )
-            if not detected_terms:
+            if not detected_terms and not streamed:
                 logger.info(f"No terms found in transcription for client {message.client_id}")
                 return
 
-            filtered_terms = []
             for term_obj in detected_terms:
-                # Always set context to actual transcript
-                term_obj["context"] = transcribed_text
-                if self.should_pass_filters(term_obj["confidence"], term_obj["term"], transcribed_text):
+                term_lower = term_obj["term"].lower()
+                if term_lower in streamed:
+                    continue
+                # Always set context to the actual transcript the term was said in
+                source = self._source_of_term(term_obj["term"], sources)
+                term_obj["context"] = source["text"]
+                term_obj["source_message_id"] = source["message_id"]
+                if self.should_pass_filters(term_obj["confidence"], term_obj["term"], source["text"]):
                     filtered_terms.append(term_obj)
-                    self.cooldown_map[term_obj["term"].lower()] = time.time()
+                    self.cooldown_map[term_lower] = time.time()
                     logger.info(f"Accepted term: '{term_obj['term']}' (confidence: {term_obj['confidence']}) for client {message.client_id}")
+            # Streamed terms are kept even if the complete response could not be used (fallback detection)
+            filtered_terms.extend(streamed.values())
+            self._cache_source_results(sources, list(detected_terms) + list(streamed.values()),
+                                       message.payload.get("user_role"), message.payload.get("domain"))
 
             if filtered_terms:
-                # IMMEDIATE FEEDBACK: Send detection notification to frontend right away
-                await self.send_immediate_detection_notification(message, filtered_terms)
+                # IMMEDIATE FEEDBACK: Send detection notification to frontend right away (terms
+                # already shown speculatively or while streaming are not announced twice)
+                to_announce = await self._reconcile_speculative_terms(message, filtered_terms)
+                await self.send_immediate_detection_notification(
+                    message, [term_obj for term_obj in to_announce if term_obj["term"].lower() not in streamed])
 
                 # BACKGROUND PROCESSING: Queue for detailed explanation generation
                 await self.write_detection_to_queue(message, filtered_terms)
 
         except Exception as e:
-            logger.error(f"SmallModel failed to process message {message.id}: {e}", exc_info=True)
\ No newline at end of file
+            logger.error(f"SmallModel failed to process message {message.id}: {e}", exc_info=True)
+        finally:
+            # Finals that end early (blocked, no terms) still retract the utterance's speculative terms
+            await self._reconcile_speculative_terms(message, filtered_terms)
\ No newline at end of file
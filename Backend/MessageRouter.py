@@ -3,12 +3,17 @@
 import asyncio
 import logging
 import time
+from collections import OrderedDict
 from typing import Optional
+from pydantic import ValidationError
 from .models.UniversalMessage import UniversalMessage, ErrorTypes, ProcessingPathEntry
 from .core.Queues import queues
 from .queues.QueueTypes import AbstractMessageQueue
 from .AI.SmallModel import SmallModel
-from .dependencies import get_session_manager_instance, get_websocket_manager_instance, get_settings_manager_instance
+from .core.transcript_coalescer import TranscriptCoalescer
+from .core.ollama_timings import OLLAMA_WARMUP
+from .dependencies import (get_session_manager_instance, get_websocket_manager_instance, get_settings_manager_instance,
+                           get_hosted_stt_service_instance)
 
 logger = logging.getLogger(__name__)
 
@@ -20,10 +25,21 @@ class MessageRouter:
         
         self._running = False
         self._router_task: Optional[asyncio.Task] = None
+        self._warm_up_task: Optional[asyncio.Task] = None
         self._small_model: SmallModel = SmallModel()
         self._session_manager = get_session_manager_instance()
         self._websocket_manager = get_websocket_manager_instance()
         self._settings_manager = get_settings_manager_instance()
+        self._hosted_stt = get_hosted_stt_service_instance()
+
+        # Highest transcription sequence number processed per STT stream; resent batches may
+        # repeat messages that already arrived before a connection dropped
+        self._transcription_seq: "OrderedDict[str, int]" = OrderedDict()
+        self._max_tracked_streams = 64
+        # Bursts of short finals from one client and session become one detection request
+        self._coalescer = TranscriptCoalescer(
+            on_flush=lambda message: asyncio.create_task(self._small_model.process_message(message))
+        )
 
         logger.info("MessageRouter initialized with all dependencies.")
 
@@ -32,12 +48,22 @@ class MessageRouter:
         if not self._running:
             self._running = True
             self._router_task = asyncio.create_task(self._run_message_loops())
+            if OLLAMA_WARMUP:
+                self._warm_up_task = asyncio.create_task(self._small_model.warm_up())
             logger.info("MessageRouter started with dual listeners.")
 
+    def detection_stats(self) -> dict:
+        """Counters of the SmallModel this router feeds (cache hits, batching, parsing, Ollama timings)."""
+        return self._small_model.stats()
+
     async def stop(self):
         """Stops the message routing process."""
         if self._running:
             self._running = False
+            self._coalescer.flush_all()
+            if self._warm_up_task and not self._warm_up_task.done():
+                self._warm_up_task.cancel()
+            await self._small_model.stop()
             if self._router_task:
                 self._router_task.cancel()
                 try:
@@ -94,15 +120,49 @@ class MessageRouter:
                     response = self._create_error_message(message, ErrorTypes.INVALID_INPUT, "Init message missing user_session_id.")
             
             elif message.type == 'stt.transcription':
-                # Block empty transcriptions before passing to SmallModel
-                transcribed_text = message.payload.get("text", "").strip()
-                if not transcribed_text:
-                    logger.warning(f"MessageRouter: Blocked empty transcription from client {message.client_id}")
-                    response = self._create_error_message(message, ErrorTypes.INVALID_INPUT, "Empty transcription text not allowed.")
-                else:
-                    asyncio.create_task(self._small_model.process_message(message))
-                    response = None  # Response will be handled asynchronously
+                response = self._route_transcription(message)
+
+            elif message.type == 'stt.transcription.interim':
+                # Utterance so far, superseded by the final: speculative detection only, no ack
+                asyncio.create_task(self._small_model.process_interim(message))
+                response = None
+
+            elif message.type == 'stt.transcription.batch':
+                # Transcriptions the STT module buffered while disconnected, oldest first
+                for item in message.payload.get("messages", []):
+                    try:
+                        transcription = UniversalMessage.model_validate(item)
+                    except ValidationError as e:
+                        # Skipped alone: the later transcriptions of the batch still count
+                        logger.warning(f"MessageRouter: Skipping invalid transcription in batch {message.id} "
+                                       f"from {message.client_id}: {e.errors()} - {str(item)[:200]}")
+                        continue
+                    transcription.client_id = message.client_id
+                    transcription.origin = message.origin
+                    error = self._route_transcription(transcription)
+                    if error:
+                        await self._websocket_out_queue.enqueue(error)
+                response = None
             
+            elif message.type == 'stt.stream.start':
+                # Client streams binary audio over its WebSocket; the backend transcribes it
+                payload = message.payload
+                if not self._hosted_stt or not message.client_id or not payload.get('user_session_id'):
+                    response = self._create_error_message(message, ErrorTypes.INVALID_INPUT, "stt.stream.start needs a user_session_id and backend-hosted STT.")
+                else:
+                    error = await self._hosted_stt.open_session(
+                        message.client_id, payload['user_session_id'],
+                        encoding=payload.get('encoding', 's16le'), sample_rate=payload.get('sample_rate', 16000),
+                    )
+                    response = (self._create_error_message(message, ErrorTypes.INVALID_INPUT, error) if error
+                                else self._create_ack_message(message, "Audio stream started."))
+
+            elif message.type == 'stt.stream.stop':
+                if self._hosted_stt and message.client_id:
+                    # Flushing waits for the last utterance; don't hold up other messages meanwhile
+                    asyncio.create_task(self._hosted_stt.close_session(message.client_id))
+                response = self._create_ack_message(message, "Audio stream stopping.")
+
             elif message.type == 'stt.heartbeat':
                 # Handle heartbeat keep-alive messages from STT service
                 logger.debug(f"MessageRouter: Received heartbeat from STT client {message.client_id}")
@@ -255,6 +315,31 @@ class MessageRouter:
             logger.error(f"Error routing service message {message.id}: {e}", exc_info=True)
 
     # ### Helper Methods ###
+    def _route_transcription(self, message: UniversalMessage) -> Optional[UniversalMessage]:
+        """Passes a transcription on to SmallModel (via the coalescer) unless it is empty or a resent duplicate."""
+        # Block empty transcriptions before passing to SmallModel
+        transcribed_text = message.payload.get("text", "").strip()
+        if not transcribed_text:
+            logger.warning(f"MessageRouter: Blocked empty transcription from client {message.client_id}")
+            return self._create_error_message(message, ErrorTypes.INVALID_INPUT, "Empty transcription text not allowed.")
+        if self._is_duplicate_transcription(message):
+            logger.info(f"MessageRouter: Dropped duplicate transcription #{message.payload.get('seq')} from client {message.client_id}")
+            return None
+        self._coalescer.add(message)
+        return None  # Response will be handled asynchronously
+
+    def _is_duplicate_transcription(self, message: UniversalMessage) -> bool:
+        stream_id, seq = message.payload.get("stream_id"), message.payload.get("seq")
+        if stream_id is None or seq is None:
+            return False
+        if seq <= self._transcription_seq.get(stream_id, 0):
+            return True
+        self._transcription_seq[stream_id] = seq
+        self._transcription_seq.move_to_end(stream_id)
+        while len(self._transcription_seq) > self._max_tracked_streams:
+            self._transcription_seq.popitem(last=False)
+        return False
+
     def _create_ack_message(self, origin_msg: UniversalMessage, text: str) -> UniversalMessage:
         return UniversalMessage(
             type='system.acknowledgement',
@@ -0,0 +1,115 @@
+# Backend/STT/audio_buffer.py
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Fixed-capacity float32 ring buffer that always holds the most recent samples.
+    Used for the VAD pre-roll so the start of a word is not cut off when speech begins.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._write_pos = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, samples: np.ndarray):
+        """Writes a block of samples, overwriting the oldest data once the buffer is full."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            # Only the newest `capacity` samples can survive, store them contiguously
+            self._data[:] = samples[-self.capacity:]
+            self._write_pos = 0
+            self._size = self.capacity
+            return
+
+        first = min(n, self.capacity - self._write_pos)
+        self._data[self._write_pos:self._write_pos + first] = samples[:first]
+        if first < n:
+            self._data[:n - first] = samples[first:]
+        self._write_pos = (self._write_pos + n) % self.capacity
+        self._size = min(self.capacity, self._size + n)
+
+    def snapshot(self) -> np.ndarray:
+        """Returns the buffered samples in chronological order (oldest first)."""
+        if self._size < self.capacity:
+            return self._data[:self._size]
+        if self._write_pos == 0:
+            return self._data
+        return np.concatenate((self._data[self._write_pos:], self._data[:self._write_pos]))
+
+    def clear(self):
+        self._write_pos = 0
+        self._size = 0
+
+
+class UtteranceBuffer:
+    """
+    Preallocated float32 store for the samples of the current utterance.
+
+    Appending copies each audio block exactly once into contiguous storage, so streaming
+    windows and the final utterance are returned as zero-copy views instead of being
+    rebuilt with np.concatenate on every call.
+
+    Two backing arrays are alternated between utterances: a background interim transcription
+    still holding a view of the previous utterance is never overwritten by the next one.
+    """
+
+    def __init__(self, capacity: int):
+        capacity = max(1, int(capacity))
+        self._stores = [np.zeros(capacity, dtype=np.float32), np.zeros(capacity, dtype=np.float32)]
+        self._active = 0
+        self._data = self._stores[0]
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data)
+
+    def append(self, samples: np.ndarray):
+        """Appends a block of samples, growing the storage geometrically if the utterance outgrows it."""
+        samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        n = len(samples)
+        if n == 0:
+            return
+        required = self._length + n
+        if required > len(self._data):
+            new_capacity = max(required, 2 * len(self._data))
+            grown = np.zeros(new_capacity, dtype=np.float32)
+            grown[:self._length] = self._data[:self._length]
+            self._data = grown
+            self._stores[self._active] = grown
+        self._data[self._length:required] = samples
+        self._length = required
+
+    def view(self, start: int = 0, end: int = None) -> np.ndarray:
+        """Returns a zero-copy view of samples [start, end) of the current utterance."""
+        end = self._length if end is None else min(end, self._length)
+        start = max(0, min(start, end))
+        return self._data[start:end]
+
+    def tail(self, num_samples: int) -> np.ndarray:
+        """Returns a zero-copy view of the newest `num_samples` samples."""
+        return self.view(max(0, self._length - int(num_samples)), self._length)
+
+    def reset(self):
+        """
+        Starts a new utterance, switching to the alternate backing store if the current one
+        holds samples. Resetting an already empty buffer keeps the current store, so the
+        back-to-back resets after a final and at the next speech onset do not switch back.
+        """
+        if self._length:
+            self._active = 1 - self._active
+            self._data = self._stores[self._active]
+        self._length = 0
@@ -0,0 +1,46 @@
+# Backend/STT/audio_codec.py
+
+from functools import lru_cache
+
+import numpy as np
+
+# Sample encodings of binary audio frames streamed to the backend-hosted STT, by bytes per sample:
+#   f32le  32-bit float, as captured (4 bytes)
+#   s16le  16-bit signed PCM (2 bytes), the default
+#   mulaw  8-bit mu-law companded (1 byte): half of s16le, enough for speech recognition
+ENCODINGS = {"f32le": 4, "s16le": 2, "mulaw": 1}
+DEFAULT_ENCODING = "s16le"
+
+_MU = 255.0
+
+
+@lru_cache(maxsize=1)
+def _mulaw_table() -> np.ndarray:
+    # Built on first use; decoding is a lookup per byte
+    y = np.arange(256, dtype=np.float32) / 255.0 * 2.0 - 1.0
+    return (np.sign(y) * ((1.0 + _MU) ** np.abs(y) - 1.0) / _MU).astype(np.float32)
+
+
+def encode_frame(samples: np.ndarray, encoding: str = DEFAULT_ENCODING) -> bytes:
+    """Encodes mono float32 samples in [-1, 1] as one binary frame."""
+    samples = np.clip(np.asarray(samples, dtype=np.float32).reshape(-1), -1.0, 1.0)
+    if encoding == "f32le":
+        return samples.astype("<f4").tobytes()
+    if encoding == "s16le":
+        return (samples * 32767.0).round().astype("<i2").tobytes()
+    if encoding == "mulaw":
+        y = np.sign(samples) * np.log1p(_MU * np.abs(samples)) / np.log1p(_MU)
+        return ((y + 1.0) / 2.0 * 255.0).round().astype(np.uint8).tobytes()
+    raise ValueError(f"Unknown audio encoding: {encoding!r}")
+
+
+def decode_frame(data: bytes, encoding: str = DEFAULT_ENCODING) -> np.ndarray:
+    """Decodes one binary frame into float32 samples. Trailing bytes of an incomplete sample are ignored."""
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Unknown audio encoding: {encoding!r}")
+    usable = len(data) - len(data) % ENCODINGS[encoding]
+    if encoding == "f32le":
+        return np.frombuffer(data, dtype="<f4", count=usable // 4).astype(np.float32)
+    if encoding == "s16le":
+        return np.frombuffer(data, dtype="<i2", count=usable // 2).astype(np.float32) / 32768.0
+    return _mulaw_table()[np.frombuffer(data, dtype=np.uint8)]
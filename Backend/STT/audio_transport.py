@@ -0,0 +1,137 @@
+# Backend/STT/audio_transport.py
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AudioFrameTransport:
+    """
+    Single-producer/single-consumer hand-off of audio blocks from the PortAudio callback
+    thread to the asyncio loop.
+
+    Blocks are copied into a preallocated slab of fixed-size slots. The producer only ever
+    advances `_head` and the consumer only ever advances `_tail`, so no lock is needed.
+    The consumer is woken with `loop.call_soon_threadsafe`, and only when it is actually
+    waiting, so the callback never touches asyncio primitives directly.
+
+    When the slab is full the incoming block is dropped (the consumer may still be reading
+    the oldest slot) and counted as an overrun.
+    """
+
+    def __init__(self, num_slots: int, block_size: int, channels: int = 1):
+        self.num_slots = max(2, int(num_slots))
+        self.block_size = max(1, int(block_size))
+        self.channels = channels
+        self._slab = np.zeros((self.num_slots, self.block_size), dtype=np.float32)
+        self._lengths = np.zeros(self.num_slots, dtype=np.int64)
+        self._head = 0  # Total slots written (producer-owned)
+        self._tail = 0  # Total slots released (consumer-owned)
+        self._pending_release = False
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._data_ready: Optional[asyncio.Event] = None
+        self._consumer_waiting = False
+
+        # Counters (written by the producer thread, read anywhere)
+        self.frames_written = 0
+        self.frames_read = 0
+        self.overruns = 0
+        self.dropped_frames = 0
+        self.stream_overflows = 0
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        """Binds the transport to the event loop that will consume the audio."""
+        self._loop = loop
+        self._data_ready = asyncio.Event()
+
+    @property
+    def consumer_waiting(self) -> bool:
+        """True while the consumer is blocked in read() waiting for the next block."""
+        return self._consumer_waiting
+
+    def depth(self) -> int:
+        """Number of blocks waiting to be read."""
+        return self._head - self._tail - (1 if self._pending_release else 0)
+
+    def push(self, indata: np.ndarray, input_overflow: bool = False):
+        """[Producer thread] Copies one callback block into the slab."""
+        if input_overflow:
+            self.stream_overflows += 1
+        samples = indata[:, 0] if indata.ndim == 2 else indata
+        total = len(samples)
+        offset = 0
+        while offset < total:
+            if self._head - self._tail >= self.num_slots:
+                dropped = total - offset
+                self.overruns += 1
+                self.dropped_frames += dropped
+                break
+            n = min(self.block_size, total - offset)
+            slot = self._head % self.num_slots
+            self._slab[slot, :n] = samples[offset:offset + n]
+            self._lengths[slot] = n
+            self._head += 1  # Publish the slot only after its data is written
+            self.frames_written += n
+            offset += n
+
+        if self._consumer_waiting and self._loop is not None:
+            self._consumer_waiting = False
+            try:
+                self._loop.call_soon_threadsafe(self._data_ready.set)
+            except RuntimeError:
+                # Loop already closed during shutdown
+                pass
+
+    async def read(self, timeout: Optional[float] = None) -> np.ndarray:
+        """
+        [Consumer] Returns the next block as a view into the slab.
+        The view stays valid until the next call to read(); callers that need to keep the
+        samples must copy them. Raises asyncio.TimeoutError if no block arrives in time.
+        """
+        self._release_previous()
+        if self._head == self._tail:
+            loop = asyncio.get_running_loop()
+            deadline = None if timeout is None else loop.time() + timeout
+            try:
+                # A wake-up scheduled for an earlier read can arrive while no block is
+                # published, so only leave once the producer has really advanced `_head`
+                while self._head == self._tail:
+                    self._data_ready.clear()
+                    self._consumer_waiting = True
+                    # Re-check after announcing we wait, to not miss a block pushed in between
+                    if self._head != self._tail:
+                        break
+                    remaining = None if deadline is None else deadline - loop.time()
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    await asyncio.wait_for(self._data_ready.wait(), timeout=remaining)
+            finally:
+                self._consumer_waiting = False
+
+        slot = self._tail % self.num_slots
+        n = int(self._lengths[slot])
+        self._pending_release = True
+        self.frames_read += n
+        return self._slab[slot, :n]
+
+    def _release_previous(self):
+        if self._pending_release:
+            self._pending_release = False
+            self._tail += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the transport counters for logging and the heartbeat payload."""
+        return {
+            "depth": self.depth(),
+            "capacity": self.num_slots,
+            "frames_written": self.frames_written,
+            "frames_read": self.frames_read,
+            "overruns": self.overruns,
+            "dropped_frames": self.dropped_frames,
+            "stream_overflows": self.stream_overflows,
+        }
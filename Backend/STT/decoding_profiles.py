@@ -0,0 +1,65 @@
+# Backend/STT/decoding_profiles.py
+
+import json
+from typing import Any, Dict, Optional, Tuple
+
+# Named sets of faster-whisper transcribe() options. Call sites pick a profile by role
+# (see Config.INTERIM_PROFILE etc. in transcribe.py) instead of relying on the library
+# defaults (beam search with 5 beams, timestamps, conditioning on previous text).
+DECODING_PROFILES: Dict[str, Dict[str, Any]] = {
+    # Streaming windows: superseded within seconds, so greedy and nothing extra
+    "interim-fast": {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0.0,
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+    },
+    # One utterance of at most MAX_CHUNK_DURATION_S: beam search with temperature fallback,
+    # but no segment timestamps since only the text is sent
+    "final-accurate": {
+        "beam_size": 5,
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+    },
+    # Utterances split into several chunks: keep context between Whisper's 30s windows
+    "long-form": {
+        "beam_size": 5,
+        "condition_on_previous_text": True,
+    },
+    # Long utterances whose overlapping chunks are decoded together in one batch: chunks can't
+    # see each other's text, and word timestamps are needed to merge the overlaps
+    "long-form-batched": {
+        "beam_size": 5,
+        "without_timestamps": True,
+        "word_timestamps": True,
+        "condition_on_previous_text": False,
+    },
+}
+
+
+def resolve_profile(name: str, overrides: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Returns the transcribe() options of a profile with any overrides for it applied."""
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{name}'. Available: {', '.join(DECODING_PROFILES)}")
+    options = dict(DECODING_PROFILES[name])
+    options.update((overrides or {}).get(name, {}))
+    return options
+
+
+def parse_decoding_option(text: str) -> Tuple[str, str, Any]:
+    """
+    Parses a CLI override of the form PROFILE.OPTION=VALUE, e.g. "interim-fast.beam_size=2".
+    VALUE is read as JSON where possible ("false", "2", "[0.0, 0.2]"), otherwise as a string.
+    """
+    key, sep, raw_value = text.partition("=")
+    profile, dot, option = key.partition(".")
+    if not sep or not dot or not profile or not option:
+        raise ValueError(f"Expected PROFILE.OPTION=VALUE, got '{text}'")
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{profile}'. Available: {', '.join(DECODING_PROFILES)}")
+    try:
+        value = json.loads(raw_value)
+    except json.JSONDecodeError:
+        value = raw_value
+    return profile, option, value
@@ -0,0 +1,102 @@
+# Backend/STT/latency.py
+
+import json
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Stages of one utterance as (name, from event, to event). Events are marked by STTService:
+#   speech_onset     VAD reported speech
+#   last_speech      last block the VAD classified as speech
+#   first_interim    first streaming window transcribed
+#   vad_end          silence exceeded VAD_SILENCE_DURATION_S (end of utterance detected)
+#   final_start      pending streaming windows drained, final transcription starts
+#   transcribed      final transcription done
+#   filtered         hallucination filter done
+#   send_start       message built, websocket.send called
+#   sent             websocket.send returned
+STAGES: Tuple[Tuple[str, str, str], ...] = (
+    ("utterance_ms", "speech_onset", "last_speech"),
+    ("onset_to_first_interim_ms", "speech_onset", "first_interim"),
+    ("endpoint_wait_ms", "last_speech", "vad_end"),
+    ("streaming_drain_ms", "vad_end", "final_start"),
+    ("final_transcribe_ms", "final_start", "transcribed"),
+    ("filter_ms", "transcribed", "filtered"),
+    ("send_ms", "send_start", "sent"),
+    ("vad_end_to_sent_ms", "vad_end", "sent"),
+    ("speech_end_to_sent_ms", "last_speech", "sent"),
+)
+
+
+class UtteranceTimeline:
+    """Monotonic timestamps of the processing stages of one utterance."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.events: Dict[str, float] = {}
+
+    def mark(self, event: str, at: Optional[float] = None):
+        self.events[event] = self._clock() if at is None else at
+
+    def mark_once(self, event: str):
+        if event not in self.events:
+            self.mark(event)
+
+    def durations_ms(self) -> Dict[str, float]:
+        return {
+            name: round((self.events[end] - self.events[start]) * 1000, 1)
+            for name, start, end in STAGES
+            if start in self.events and end in self.events
+        }
+
+    def to_payload(self) -> Dict[str, Dict[str, float]]:
+        """Event offsets from speech onset and stage durations, in milliseconds."""
+        origin = self.events.get("speech_onset", min(self.events.values(), default=0.0))
+        return {
+            "events_ms": {event: round((t - origin) * 1000, 1) for event, t in sorted(self.events.items(), key=lambda e: e[1])},
+            "durations_ms": self.durations_ms(),
+        }
+
+
+class LatencyMetrics:
+    """Rolling percentiles of the stage durations over the last `window` utterances."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self.utterances = 0
+
+    def observe(self, timeline: UtteranceTimeline):
+        self.utterances += 1
+        for name, value in timeline.durations_ms().items():
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: _summary(list(values)) for name, values in self._samples.items() if values}
+
+    def export(self, path):
+        """Writes the current percentiles to a JSON file (replaced atomically)."""
+        path = Path(path)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps({
+            "updated_at": time.time(), "utterances": self.utterances, "window": self.window,
+            "stages": self.snapshot(),
+        }, indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+
+
+def _summary(values: List[float]) -> Dict[str, float]:
+    values.sort()
+    return {
+        "count": len(values),
+        "p50": _percentile(values, 0.50),
+        "p95": _percentile(values, 0.95),
+        "p99": _percentile(values, 0.99),
+        "max": values[-1],
+    }
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
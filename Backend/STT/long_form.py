@@ -0,0 +1,49 @@
+# Backend/STT/long_form.py
+
+from typing import Iterable, List, Sequence, Tuple
+
+from Backend.STT.streaming import TimedWord, words_from_segments
+
+# faster-whisper's batched pipeline reports each segment's chunk offset in `seek`, counted in
+# 10ms feature frames
+FRAMES_PER_SECOND = 100
+
+
+def plan_chunks(duration_s: float, chunk_s: float, overlap_s: float) -> List[Tuple[float, float]]:
+    """Splits `duration_s` into (start, end) chunks of at most `chunk_s` seconds overlapping by `overlap_s`."""
+    chunks = []
+    start = 0.0
+    step = max(chunk_s - overlap_s, 1e-3)
+    while start < duration_s:
+        chunks.append((start, min(start + chunk_s, duration_s)))
+        if start + chunk_s >= duration_s:
+            break
+        start += step
+    return chunks
+
+
+def group_words_by_chunk(segments: Iterable, chunks: Sequence[Tuple[float, float]]) -> List[List[TimedWord]]:
+    """
+    Assigns the words of batched-pipeline segments (absolute timestamps, word_timestamps=True)
+    to the chunk that produced them, identified by the segment's `seek` offset.
+    """
+    grouped: List[List[TimedWord]] = [[] for _ in chunks]
+    for segment in segments:
+        offset_s = segment.seek / FRAMES_PER_SECOND
+        index = min(range(len(chunks)), key=lambda i: abs(chunks[i][0] - offset_s))
+        grouped[index].extend(words_from_segments([segment]))
+    return grouped
+
+
+def merge_chunk_words(chunks: Sequence[Tuple[float, float]], words_per_chunk: Sequence[List[TimedWord]]) -> List[TimedWord]:
+    """
+    Merges the words of overlapping chunks. Each overlap is split at its midpoint: words whose
+    centre lies before it are taken from the earlier chunk, the rest from the later one, so
+    speech in the overlap is kept once.
+    """
+    merged: List[TimedWord] = []
+    for i, words in enumerate(words_per_chunk):
+        lower = (chunks[i][0] + chunks[i - 1][1]) / 2 if i > 0 else float("-inf")
+        upper = (chunks[i + 1][0] + chunks[i][1]) / 2 if i + 1 < len(chunks) else float("inf")
+        merged.extend(w for w in words if lower <= (w.start + w.end) / 2 < upper)
+    return merged
@@ -0,0 +1,177 @@
+# Backend/STT/model_tuning.py
+
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from Backend.STT.replay import load_audio_file
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class TuningChoice:
+    model_size: str
+    cpu_threads: int
+    rtf: float
+    model: Any = field(default=None, repr=False, compare=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"model_size": self.model_size, "cpu_threads": self.cpu_threads, "rtf": round(self.rtf, 4)}
+
+
+def candidate_thread_counts(cpu_count: Optional[int] = None) -> List[int]:
+    """Thread counts worth trying: half and all of the cores (CTranslate2 intra-op threads)."""
+    cpus = cpu_count or os.cpu_count() or 1
+    return sorted({max(1, cpus // 2), cpus})
+
+
+def synthetic_calibration_clip(sample_rate: int, seconds: float = 10.0) -> np.ndarray:
+    """Voiced, syllable-modulated signal used when no recorded calibration clip is configured."""
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    phase = 2 * np.pi * np.cumsum(130 + 30 * np.sin(2 * np.pi * 0.7 * t)) / sample_rate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 15))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None)
+    return (0.1 * voiced * syllables).astype(np.float32)
+
+
+def load_calibration_clip(path: Optional[str], sample_rate: int) -> np.ndarray:
+    if path:
+        return load_audio_file(Path(path), sample_rate)
+    return synthetic_calibration_clip(sample_rate)
+
+
+def measure_rtf(model, clip: np.ndarray, sample_rate: int, **options) -> float:
+    """Real-time factor (processing time / audio duration) of one transcription, after a warm-up run."""
+    segments, _ = model.transcribe(clip[:sample_rate], **options)
+    list(segments)
+    started = time.perf_counter()
+    segments, _ = model.transcribe(clip, **options)
+    list(segments)
+    return (time.perf_counter() - started) / (len(clip) / sample_rate)
+
+
+def calibrate(model_factory: Callable[[str, int], Any], clip: np.ndarray, sample_rate: int, rtf_budget: float,
+              model_sizes: List[str], thread_counts: List[int], **options) -> Tuple[Optional[TuningChoice], List[Dict]]:
+    """
+    Benchmarks model sizes (smallest first) with each thread count and returns the largest
+    size whose fastest thread count stays within `rtf_budget`, plus all measurements.
+    Stops at the first size over budget, since larger ones are slower still. If even the
+    smallest size is over budget it is returned anyway. The chosen model is kept loaded.
+    """
+    best: Optional[TuningChoice] = None
+    results: List[Dict] = []
+    for size in model_sizes:
+        size_best: Optional[TuningChoice] = None
+        for threads in thread_counts:
+            try:
+                model = model_factory(size, threads)
+                rtf = measure_rtf(model, clip, sample_rate, **options)
+            except Exception as e:
+                logger.warning(f"Calibration of '{size}' with {threads} threads failed: {e}")
+                continue
+            results.append({"model_size": size, "cpu_threads": threads, "rtf": round(rtf, 4)})
+            logger.info(f"Calibration: model '{size}', {threads} threads -> RTF {rtf:.3f}")
+            if size_best is None or rtf < size_best.rtf:
+                size_best = TuningChoice(size, threads, rtf, model)
+        if size_best is None:
+            continue
+        if size_best.rtf <= rtf_budget or best is None:
+            best = size_best
+        if size_best.rtf > rtf_budget:
+            break
+    return best, results
+
+
+def load_cached_choice(cache_file: Optional[str], key: Dict[str, Any]) -> Optional[TuningChoice]:
+    """Returns the cached choice if it was calibrated on this machine with the same settings."""
+    if not cache_file or not Path(cache_file).is_file():
+        return None
+    try:
+        cached = json.loads(Path(cache_file).read_text(encoding="utf-8"))
+        if cached.get("key") != key:
+            return None
+        choice = cached["choice"]
+        return TuningChoice(choice["model_size"], choice["cpu_threads"], choice["rtf"])
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable tuning cache {cache_file}: {e}")
+        return None
+
+
+def save_cached_choice(cache_file: Optional[str], key: Dict[str, Any], choice: TuningChoice, results: List[Dict]):
+    if not cache_file:
+        return
+    try:
+        Path(cache_file).write_text(json.dumps({"key": key, "choice": choice.to_dict(), "results": results}, indent=2),
+                                    encoding="utf-8")
+    except OSError as e:
+        logger.warning(f"Could not write tuning cache {cache_file}: {e}")
+
+
+class RtfMonitor:
+    """
+    Tracks the real-time factor of final transcriptions online (exponential moving average)
+    and suggests a smaller model when it drifts above the budget, or a larger one when it
+    stays far below. After a suggestion it waits `cooldown_s` and `min_samples` new
+    measurements before suggesting again.
+    """
+
+    def __init__(self, rtf_budget: float, model_sizes: List[str], current_size: str, alpha: float = 0.2,
+                 min_samples: int = 5, downgrade_ratio: float = 1.25, upgrade_ratio: float = 0.4,
+                 cooldown_s: float = 120.0):
+        self.rtf_budget = rtf_budget
+        self.model_sizes = model_sizes
+        self.current_size = current_size
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.downgrade_ratio = downgrade_ratio
+        self.upgrade_ratio = upgrade_ratio
+        self.cooldown_s = cooldown_s
+        self._lock = threading.Lock()
+        self.rtf_ewma: Optional[float] = None
+        self._samples = 0
+        self._last_change = time.monotonic()
+
+    def observe(self, audio_s: float, run_s: float):
+        """[Any thread] Records one transcription of `audio_s` seconds that took `run_s`."""
+        if audio_s <= 0:
+            return
+        rtf = run_s / audio_s
+        with self._lock:
+            self.rtf_ewma = rtf if self.rtf_ewma is None else self.alpha * rtf + (1 - self.alpha) * self.rtf_ewma
+            self._samples += 1
+
+    def suggestion(self) -> Optional[str]:
+        """Returns the model size to switch to, or None. The caller performs the switch."""
+        with self._lock:
+            if (self.rtf_ewma is None or self._samples < self.min_samples or
+                    time.monotonic() - self._last_change < self.cooldown_s):
+                return None
+            if self.current_size not in self.model_sizes:
+                return None
+            index = self.model_sizes.index(self.current_size)
+            if self.rtf_ewma > self.rtf_budget * self.downgrade_ratio and index > 0:
+                target = self.model_sizes[index - 1]
+            elif self.rtf_ewma < self.rtf_budget * self.upgrade_ratio and index < len(self.model_sizes) - 1:
+                target = self.model_sizes[index + 1]
+            else:
+                return None
+            logger.info(f"Measured RTF {self.rtf_ewma:.3f} vs budget {self.rtf_budget}: suggesting model '{target}'")
+            self.current_size = target
+            self.rtf_ewma = None
+            self._samples = 0
+            self._last_change = time.monotonic()
+            return target
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model_size": self.current_size,
+            "rtf_ewma": round(self.rtf_ewma, 4) if self.rtf_ewma is not None else None,
+            "rtf_budget": self.rtf_budget,
+        }
@@ -0,0 +1,180 @@
+# Backend/STT/outbox.py
+
+import json
+import logging
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceOutbox:
+    """
+    Bounded buffer for transcription messages the backend has not received yet.
+
+    Messages are kept in send order and carry a per-stream sequence number
+    (payload["stream_id"], payload["seq"]) so the backend can drop messages it already
+    processed when a batch is resent. At most `max_in_memory` messages are held in
+    memory. With a journal attached (open_journal), every message is also appended to a
+    JSON-lines file and the overflow only lives there, so nothing is lost when the
+    process dies; without one the oldest messages are dropped once the cap is reached.
+
+    Journal lines are {"message": {...}} for buffered messages and {"acked": seq, "stream_id": ...}
+    once everything of that stream up to seq has been sent. The file is truncated whenever the outbox drains.
+    Behaves like a list of messages (len, iteration, indexing, append, clear).
+    """
+
+    def __init__(self, stream_id: str, max_in_memory: int = 256):
+        self.stream_id = stream_id
+        self.max_in_memory = max(1, int(max_in_memory))
+        self._memory: deque = deque()
+        self._spilled = 0  # Pending messages only in the journal, newer than everything in memory
+        self._next_seq = 1
+        self._journal_path: Optional[Path] = None
+        self._journal = None
+        self.dropped = 0
+        self.resent = 0
+
+    def stamp(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Assigns the next sequence number of this stream to a new message."""
+        message["payload"]["stream_id"] = self.stream_id
+        message["payload"]["seq"] = self._next_seq
+        self._next_seq += 1
+        return message
+
+    def open_journal(self, path) -> int:
+        """
+        Attaches the append-only journal at `path`, loading messages a previous process left
+        unsent ahead of anything buffered so far. Returns the number of pending messages.
+        """
+        if self._journal is not None:
+            return len(self)
+        self._journal_path = Path(path)
+        recovered = [m for m in self._read_journal() if not self._contains(m)]
+        buffered = list(self._memory)
+        self._memory.clear()
+        self._spilled = 0
+        self._rewrite_journal(recovered + buffered)
+        for message in recovered + buffered:
+            self._hold(message)
+        if recovered:
+            logger.info(f"Recovered {len(recovered)} unsent transcriptions from {self._journal_path}")
+        return len(self)
+
+    def append(self, message: Dict[str, Any]):
+        """Buffers a message that could not be sent."""
+        if self._journal is not None:
+            self._write({"message": message})
+        elif len(self._memory) >= self.max_in_memory:
+            dropped = self._memory.popleft()
+            self.dropped += 1
+            logger.warning(f"Outbox full ({self.max_in_memory} messages, no journal); dropped: {dropped['payload'].get('text')!r}")
+        self._hold(message)
+
+    def peek(self, count: int) -> List[Dict[str, Any]]:
+        """The oldest `count` pending messages, reloading spilled ones from the journal."""
+        if not self._memory and self._spilled:
+            self._refill()
+        return list(self._memory)[:count]
+
+    def ack(self, count: int):
+        """Marks the oldest `count` pending messages as sent."""
+        acked: Dict[str, int] = {}
+        count = min(count, len(self._memory))
+        for _ in range(count):
+            payload = self._memory.popleft()["payload"]
+            acked[payload.get("stream_id")] = payload.get("seq", 0)
+        self.resent += count
+        if not self:
+            self._rewrite_journal([])
+        elif self._journal is not None:
+            # Messages recovered from an earlier process belong to that process's stream
+            for stream_id, seq in acked.items():
+                self._write({"acked": seq, "stream_id": stream_id})
+
+    def clear(self):
+        """Discards all pending messages."""
+        self._memory.clear()
+        self._spilled = 0
+        self._rewrite_journal([])
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = self._memory[0]["timestamp"] if self._memory else None
+        return {
+            "depth": len(self),
+            "in_memory": len(self._memory),
+            "spilled": self._spilled,
+            "oldest_age_s": round(time.time() - oldest, 1) if oldest else None,
+            "dropped": self.dropped,
+            "resent": self.resent,
+            "durable": self._journal is not None,
+        }
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        yield from list(self._memory)
+        if self._spilled:
+            yield from self._read_journal()[-self._spilled:]
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def _hold(self, message: Dict[str, Any]):
+        if self._spilled or len(self._memory) >= self.max_in_memory:
+            self._spilled += 1
+        else:
+            self._memory.append(message)
+
+    def _refill(self):
+        pending = self._read_journal()
+        for message in pending[len(pending) - self._spilled:][:self.max_in_memory]:
+            self._memory.append(message)
+            self._spilled -= 1
+
+    def _contains(self, message: Dict[str, Any]) -> bool:
+        return any(m["id"] == message["id"] for m in self._memory)
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        """Pending messages in the journal: those after the last acknowledgement of their stream."""
+        if self._journal_path is None or not self._journal_path.is_file():
+            return []
+        pending: List[Dict[str, Any]] = []
+        with self._journal_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line after a crash mid-write
+                    logger.warning(f"Skipping unreadable outbox journal line in {self._journal_path}")
+                    continue
+                if "message" in record:
+                    pending.append(record["message"])
+                elif "acked" in record:
+                    pending = [m for m in pending if m["payload"].get("stream_id") != record.get("stream_id")
+                               or m["payload"].get("seq", 0) > record["acked"]]
+        return pending
+
+    def _rewrite_journal(self, messages: List[Dict[str, Any]]):
+        if self._journal_path is None:
+            return
+        self.close()
+        tmp_path = self._journal_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for message in messages:
+                f.write(json.dumps({"message": message}, ensure_ascii=False) + "\n")
+        tmp_path.replace(self._journal_path)
+        self._journal = self._journal_path.open("a", encoding="utf-8")
+
+    def _write(self, record: Dict[str, Any]):
+        # Flushed per record: survives a crash of this process (not of the machine)
+        self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._journal.flush()
@@ -0,0 +1,178 @@
+# Backend/STT/replay.py
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REPLAY_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".m4a"}
+
+
+def load_audio_file(path: Path, sample_rate: int) -> np.ndarray:
+    """Decodes an audio file to mono float32 at the given sample rate."""
+    # faster-whisper decodes any container PyAV understands and resamples on the way
+    from faster_whisper import decode_audio
+    return decode_audio(str(path), sampling_rate=sample_rate).astype(np.float32, copy=False)
+
+
+def collect_replay_files(input_file: Optional[str] = None, replay_dir: Optional[str] = None) -> List[Path]:
+    """Returns the files to replay, directory entries sorted by name."""
+    files: List[Path] = []
+    if input_file:
+        files.append(Path(input_file))
+    if replay_dir:
+        files.extend(sorted(p for p in Path(replay_dir).iterdir() if p.suffix.lower() in REPLAY_EXTENSIONS))
+    missing = [str(p) for p in files if not p.is_file()]
+    if missing:
+        raise FileNotFoundError(f"Replay input not found: {', '.join(missing)}")
+    return files
+
+
+class RecordingWebSocket:
+    """
+    Stands in for the backend WebSocket during replay, or wraps a real one.
+    Every message sent by the STT service is recorded with its wall-clock send time.
+    """
+
+    def __init__(self, inner=None):
+        self._inner = inner
+        self.sent: List[Dict] = []
+
+    @property
+    def open(self) -> bool:
+        return self._inner.open if self._inner is not None else True
+
+    async def send(self, data: str):
+        self.sent.append({"at": time.monotonic(), "message": json.loads(data)})
+        if self._inner is not None:
+            await self._inner.send(data)
+
+    def messages(self, message_type: str) -> List[Dict]:
+        return [m["message"] for m in self.sent if m["message"].get("type") == message_type]
+
+
+class ReplayRunner:
+    """
+    Feeds audio files through an STTService's regular VAD, streaming and finalization path
+    and measures how fast it keeps up.
+
+    Audio is pushed into the service's frame transport block by block, either paced at real
+    time or as fast as the audio loop consumes it. A silence tail is appended to every file
+    so its last utterance is finalized before the next file starts.
+    """
+
+    def __init__(self, service, sample_rate: int, block_size: int, silence_tail_s: float, realtime: bool = False):
+        self.service = service
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.silence_tail_s = silence_tail_s
+        self.realtime = realtime
+        self._utterances: List[Dict] = []
+
+        # Time every finalization without changing the service's behaviour
+        process_final = service._process_final_utterance
+
+        async def timed_process_final(websocket, utterance_audio, current_time):
+            started = time.monotonic()
+            finals_before = len(websocket.messages("stt.transcription")) if isinstance(websocket, RecordingWebSocket) else 0
+            await process_final(websocket, utterance_audio, current_time)
+            texts = []
+            if isinstance(websocket, RecordingWebSocket):
+                texts = [m["payload"]["text"] for m in websocket.messages("stt.transcription")[finals_before:]]
+            self._utterances.append({
+                "audio_end_s": round(service.audio_transport.frames_read / sample_rate, 3),
+                "duration_s": round(len(utterance_audio) / sample_rate, 3),
+                "finalize_latency_s": round(time.monotonic() - started, 4),
+                "text": " ".join(texts),
+            })
+
+        service._process_final_utterance = timed_process_final
+
+    async def _feed(self, audio: np.ndarray):
+        transport = self.service.audio_transport
+        block_duration = self.block_size / self.sample_rate
+        next_due = time.monotonic()
+        for start in range(0, len(audio), self.block_size):
+            # Backpressure: never overrun the transport in as-fast-as-possible mode
+            while transport.depth() >= transport.num_slots - 1:
+                await asyncio.sleep(0.005)
+            transport.push(audio[start:start + self.block_size])
+            if self.realtime:
+                next_due += block_duration
+                await asyncio.sleep(max(0.0, next_due - time.monotonic()))
+            else:
+                await asyncio.sleep(0)
+
+    async def _wait_until_idle(self):
+        transport = self.service.audio_transport
+        while transport.depth() > 0 or not transport.consumer_waiting:
+            await asyncio.sleep(0.01)
+
+    async def replay_file(self, path: Path, websocket: RecordingWebSocket) -> Dict:
+        audio = load_audio_file(path, self.sample_rate)
+        tail = np.zeros(int(self.silence_tail_s * self.sample_rate), dtype=np.float32)
+        first_utterance = len(self._utterances)
+        interims_before = len(websocket.messages("stt.transcription.interim"))
+
+        started = time.monotonic()
+        await self._feed(np.concatenate((audio, tail)))
+        await self._wait_until_idle()
+        wall_time = time.monotonic() - started
+
+        audio_duration = len(audio) / self.sample_rate
+        utterances = self._utterances[first_utterance:]
+        result = {
+            "file": str(path),
+            "audio_duration_s": round(audio_duration, 3),
+            "wall_time_s": round(wall_time, 3),
+            "real_time_factor": round(wall_time / audio_duration, 4) if audio_duration else None,
+            "utterances": utterances,
+            "interim_count": len(websocket.messages("stt.transcription.interim")) - interims_before,
+            "transcript": " ".join(u["text"] for u in utterances if u["text"]),
+        }
+        logger.info(f"Replayed {path.name}: {audio_duration:.1f}s audio in {wall_time:.1f}s (RTF {result['real_time_factor']})")
+        return result
+
+    async def run(self, files: List[Path], websocket: RecordingWebSocket) -> Dict:
+        """Replays all files through one audio loop and returns the JSON-serialisable report."""
+        self.service.audio_transport.bind_loop(asyncio.get_running_loop())
+        loop_task = asyncio.create_task(self.service._process_audio_loop(websocket))
+        try:
+            results = [await self.replay_file(path, websocket) for path in files]
+        finally:
+            self.service.is_recording.clear()
+            loop_task.cancel()
+            try:
+                await loop_task
+            except asyncio.CancelledError:
+                pass
+
+        latencies = sorted(u["finalize_latency_s"] for r in results for u in r["utterances"])
+        total_audio = sum(r["audio_duration_s"] for r in results)
+        total_wall = sum(r["wall_time_s"] for r in results)
+        return {
+            "mode": "realtime" if self.realtime else "fast",
+            "files": results,
+            "total": {
+                "files": len(results),
+                "audio_duration_s": round(total_audio, 3),
+                "wall_time_s": round(total_wall, 3),
+                "real_time_factor": round(total_wall / total_audio, 4) if total_audio else None,
+                "utterances": len(latencies),
+                "finalize_latency_p50_s": _percentile(latencies, 0.50),
+                "finalize_latency_p95_s": _percentile(latencies, 0.95),
+            },
+        }
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
@@ -0,0 +1,97 @@
+# Backend/STT/streaming.py
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, List
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+@dataclass
+class TimedWord:
+    """A transcribed word with start/end times in seconds relative to the utterance start."""
+    text: str
+    start: float
+    end: float
+
+    @property
+    def key(self) -> str:
+        return _NORMALIZE_RE.sub("", self.text.lower())
+
+
+def words_from_segments(segments: Iterable, offset_s: float = 0.0) -> List[TimedWord]:
+    """Flattens faster-whisper segments (transcribed with word_timestamps=True) into TimedWords."""
+    words = []
+    for segment in segments:
+        for word in (getattr(segment, "words", None) or []):
+            words.append(TimedWord(word.word, word.start + offset_s, word.end + offset_s))
+    return words
+
+
+def join_words(words: Iterable[TimedWord]) -> str:
+    # faster-whisper words carry their own leading whitespace
+    return "".join(w.text for w in words).strip()
+
+
+class CommittedPrefixTracker:
+    """
+    Local-agreement policy for streaming transcription of one utterance.
+
+    Each streaming window transcribes the audio from the current commit point to the end of
+    the buffer. Words on which two consecutive windows agree (longest common prefix) are
+    committed and the commit point advances to the end of the last committed word, so the
+    final pass only has to transcribe the uncommitted tail.
+
+    If consecutive windows keep disagreeing, words older than `force_commit_age_s` before the
+    window end are committed anyway once the uncommitted span exceeds `max_uncommitted_s`, which
+    bounds the tail (and therefore the finalization cost).
+    """
+
+    def __init__(self, max_uncommitted_s: float = 8.0, force_commit_age_s: float = 3.0):
+        self.max_uncommitted_s = max_uncommitted_s
+        self.force_commit_age_s = force_commit_age_s
+        self.reset()
+
+    def reset(self):
+        self.committed: List[TimedWord] = []
+        self.committed_end_s = 0.0
+        self.hypothesis: List[TimedWord] = []
+
+    @property
+    def committed_text(self) -> str:
+        return join_words(self.committed)
+
+    @property
+    def hypothesis_text(self) -> str:
+        return join_words(self.hypothesis)
+
+    def update(self, words: List[TimedWord], window_end_s: float) -> List[TimedWord]:
+        """
+        Feeds the words of a window that started at the commit point.
+        Returns the words newly committed by this window.
+        """
+        # Ignore anything that overlaps the committed region (e.g. a re-transcribed last word)
+        new_hypothesis = [w for w in words if w.end > self.committed_end_s + 0.01]
+
+        agreed = 0
+        for previous, current in zip(self.hypothesis, new_hypothesis):
+            if not previous.key or previous.key != current.key:
+                break
+            agreed += 1
+
+        newly_committed = new_hypothesis[:agreed]
+        remaining = new_hypothesis[agreed:]
+
+        if window_end_s - self.committed_end_s > self.max_uncommitted_s:
+            cutoff = window_end_s - self.force_commit_age_s
+            forced = 0
+            while forced < len(remaining) and remaining[forced].end <= cutoff:
+                forced += 1
+            newly_committed += remaining[:forced]
+            remaining = remaining[forced:]
+
+        if newly_committed:
+            self.committed.extend(newly_committed)
+            self.committed_end_s = newly_committed[-1].end
+        self.hypothesis = remaining
+        return newly_committed
@@ -1,6 +1,10 @@
 import asyncio
 import numpy as np
-import sounddevice as sd
+try:
+    import sounddevice as sd
+except OSError:
+    # PortAudio is missing (e.g. CI boxes without audio devices); only offline replay works then
+    sd = None
 import queue
 import threading
 import time
@@ -8,49 +12,148 @@ import logging
 import websockets
 import json
 import argparse
+import os
 from uuid import uuid4
 from faster_whisper import WhisperModel
-from collections import deque
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    # faster-whisper < 1.1: long utterances are transcribed chunk by chunk
+    BatchedInferencePipeline = None
 from typing import Optional
 from pathlib import Path
 
+from Backend.STT.audio_buffer import AudioRingBuffer, UtteranceBuffer
+from Backend.STT.audio_codec import DEFAULT_ENCODING, ENCODINGS, encode_frame
+from Backend.STT.audio_transport import AudioFrameTransport
+from Backend.STT.outbox import SentenceOutbox
+from Backend.STT.replay import ReplayRunner, RecordingWebSocket, collect_replay_files
+from Backend.STT.streaming import CommittedPrefixTracker, join_words, words_from_segments
+from Backend.STT.latency import LatencyMetrics, UtteranceTimeline
+from Backend.STT.long_form import group_words_by_chunk, merge_chunk_words, plan_chunks
+from Backend.STT.vad import create_vad
+from Backend.STT.decoding_profiles import DECODING_PROFILES, parse_decoding_option, resolve_profile
+from Backend.STT.model_tuning import (RtfMonitor, calibrate, candidate_thread_counts, load_cached_choice,
+                                      load_calibration_clip, save_cached_choice)
+from Backend.core.hallucination_filter import stt_filter
+from Backend.core.log_pipeline import QueueLogging, file_handler
+from Backend.STT.transcription_executor import InterimSuperseded, TranscriptionExecutor, TranscriptionPriority
+
 # --- CONFIGURATION ---
 # Using a more structured config for clarity and easier modification
 class Config:
     SAMPLE_RATE = 16000
     CHANNELS = 1
     MODEL_SIZE = "tiny"
+    CPU_THREADS = 0 # CTranslate2 intra-op threads, 0 = library default
     LANGUAGE = "en"
     WEBSOCKET_URI = "ws://localhost:8000/ws"
     MIN_WORDS_PER_SENTENCE = 1 # Reduced for better responsiveness
     
     # VAD (Voice Activity Detection) settings are key for responsiveness
-    VAD_ENERGY_THRESHOLD = 0.004 # Energy threshold to detect speech
+    VAD_MODE = "adaptive" # "adaptive" (noise-floor tracking, hysteresis) or "energy" (fixed threshold)
+    VAD_ENERGY_THRESHOLD = 0.004 # Energy threshold to detect speech ("energy" mode)
+    VAD_FRAME_MS = 20 # Frame size for per-frame speech probability
+    VAD_ONSET_PROB = 0.6 # Speech starts after VAD_ONSET_FRAMES frames above this probability
+    VAD_OFFSET_PROB = 0.3 # Speech pauses on the first frame below this probability
+    VAD_ONSET_FRAMES = 3
+    VAD_CALIBRATION_S = 0.3 # Initial noise-floor calibration, no speech reported
     VAD_SILENCE_DURATION_S = 1.5 # How long of a pause indicates end of sentence
     VAD_BUFFER_DURATION_S = 0.5 # Seconds of silence to keep before speech starts
     
+    # Transcriptions that could not be sent wait in an outbox, journaled to OUTBOX_FILE (None =
+    # memory only) so they survive a restart, and are resent in batches after reconnecting
+    OUTBOX_FILE = "stt_outbox.jsonl"
+    OUTBOX_MAX_IN_MEMORY = 256 # Older pending messages stay in the journal only
+    OUTBOX_BATCH_SIZE = 50
+
+    # Per-utterance latency: rolling p50/p95/p99 of each stage over the last LATENCY_WINDOW
+    # utterances, in the heartbeat and rewritten to LATENCY_METRICS_FILE (None = off) after each one
+    LATENCY_METRICS_FILE = "stt_latency_metrics.json"
+    LATENCY_WINDOW = 500
+
     # Heartbeat settings to prevent connection timeouts during silence
     HEARTBEAT_INTERVAL_S = 5.0 # Send heartbeat every 10 seconds during silence (30s default was too long)
     
     # STREAMING OPTIMIZATION SETTINGS
     STREAMING_ENABLED = True # Enable streaming transcription for long speech
     STREAMING_CHUNK_DURATION_S = 3.0 # Process chunks every N seconds during speech
-    STREAMING_OVERLAP_DURATION_S = 0.5 # Overlap between chunks for context
     STREAMING_MIN_BUFFER_S = 2.0 # Minimum buffer before starting streaming
+    # Local agreement: words two consecutive streaming windows agree on are committed, each window
+    # starts at the last committed word and finalization only transcribes the uncommitted tail
+    STREAMING_MAX_UNCOMMITTED_S = 8.0 # Force-commit older words once the uncommitted span exceeds this
+    STREAMING_MIN_TAIL_S = 0.1 # Shorter uncommitted tails are not transcribed on finalization
+
+    # Forward the streaming windows' text as stt.transcription.interim, so SmallModel can show
+    # speculative detections during speech (reconciled against the final of the same utterance_id)
+    SEND_INTERIMS = True
+
+    # Transcription jobs queued for the model beyond this drop the oldest interim windows
+    TRANSCRIPTION_MAX_PENDING = 4
+
+    # Decoding profile per call site (see decoding_profiles.py) and per-profile option
+    # overrides, e.g. {"final-accurate": {"beam_size": 3}}
+    INTERIM_PROFILE = "interim-fast"
+    FINAL_PROFILE = "final-accurate"
+    LONG_FORM_PROFILE = "long-form"
+    DECODING_OVERRIDES = {}
 
     # Maximum duration (seconds) for any single chunk that is transcribed/sent.
     MAX_CHUNK_DURATION_S = 20.0
 
+    # Longer utterances are split into chunks overlapping by LONG_FORM_OVERLAP_S. Up to
+    # LONG_FORM_BATCH_SIZE chunks are decoded together (faster-whisper's batched pipeline) and
+    # the overlaps merged by word timestamps; 0 transcribes the chunks one after another
+    LONG_FORM_OVERLAP_S = 1.0
+    LONG_FORM_BATCH_SIZE = 8
+    LONG_FORM_BATCHED_PROFILE = "long-form-batched"
+
+    # Seconds of audio preallocated for the utterance buffer (grows beyond this if needed)
+    UTTERANCE_PREALLOC_S = 60.0
+
+    # Audio hand-off from the recording thread: fixed callback block size and how many
+    # seconds of blocks the transport can hold while the loop is busy transcribing
+    AUDIO_BLOCK_SIZE = 1600 # 100ms at 16kHz
+    AUDIO_TRANSPORT_CAPACITY_S = 60.0
+
+    # Model auto-tuning: benchmark model sizes and thread counts at startup and use the largest
+    # model whose final transcriptions stay within the real-time-factor budget, then track the
+    # measured RTF and step the model size down/up when it drifts
+    AUTO_TUNE = False
+    AUTO_TUNE_RTF_BUDGET = 0.5 # Max processing seconds per second of audio
+    AUTO_TUNE_MODEL_SIZES = ["tiny", "base", "small", "medium"] # In order of increasing cost
+    AUTO_TUNE_CLIP = None # Recorded speech for calibration; a synthetic voiced signal if unset
+    AUTO_TUNE_CACHE_FILE = "stt_model_tuning.json" # Calibration result reused on the same machine
+    AUTO_TUNE_MIN_OBSERVED_S = 3.0 # Shorter finals are dominated by fixed cost and not tracked
+
+    # The model loads on a background thread while audio capture and the backend handshake
+    # proceed; audio captured meanwhile waits in the transport and transcriptions in the
+    # executor queue. One inference on silence after loading pays the one-time setup costs.
+    MODEL_WARMUP = True
+    MODEL_WARMUP_S = 1.0
+
 # --- LOGGING SETUP ---
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 transcription_logger = logging.getLogger('TranscriptionLog')
-transcription_logger.setLevel(logging.DEBUG)
-log_file = Path("transcription.log")
-log_file.touch()
-t_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-t_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-transcription_logger.addHandler(t_handler)
+log_pipeline = None
+transcription_log_pipeline = None
+
+
+def configure_logging():
+    """
+    Logging of the standalone STT client, called from main only: importing this module (e.g. for
+    the backend-hosted STT) must neither add handlers to the host's loggers nor truncate the
+    client's transcription.log. Handlers run on background threads behind bounded queues, so the
+    audio loop only enqueues records and never waits for the console or transcription.log (JSON
+    lines unless LOG_FORMAT=text).
+    """
+    global log_pipeline, transcription_log_pipeline
+    if not logging.getLogger().handlers:  # Like basicConfig: keep a setup that already exists
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        log_pipeline = QueueLogging([console_handler]).start(level=logging.INFO)
+    t_handler = file_handler("transcription.log", '%(asctime)s - %(message)s', mode='w')
+    transcription_log_pipeline = QueueLogging([t_handler]).start(transcription_logger, level=logging.DEBUG)
 
 
 class STTService:
@@ -58,13 +161,30 @@ class STTService:
     Encapsulates the entire Speech-to-Text functionality using a robust,
     VAD-based "record-then-transcribe" architecture for real-time responsiveness.
     """
-    def __init__(self, user_session_id: str):
+    def __init__(self, user_session_id: str, transcriber=None):
         self.user_session_id = user_session_id
         self.stt_client_id = f"stt_instance_{uuid4()}"
-        logger.info(f"Loading Whisper model '{Config.MODEL_SIZE}'...")
-        self.model = WhisperModel(Config.MODEL_SIZE, device="cpu", compute_type="int8")
-        logger.info("Whisper model loaded.")
-        self.audio_queue = asyncio.Queue()
+        self.model_size = Config.MODEL_SIZE
+        self.cpu_threads = Config.CPU_THREADS
+        # All model calls go through one worker thread that runs finals before interims. The
+        # model itself is set by start_model_loading() (or directly via the `model` property).
+        # A backend-hosted session passes its view of the shared executor instead, whose model
+        # is loaded by the host.
+        self._owns_transcriber = transcriber is None
+        self.transcriber = transcriber or TranscriptionExecutor(max_pending=Config.TRANSCRIPTION_MAX_PENDING,
+                                                                batched_factory=BatchedInferencePipeline)
+        self.model_ready = threading.Event()
+        self.model_load_s: Optional[float] = None
+        self._model_loader: Optional[threading.Thread] = None
+        self.rtf_monitor = None
+        self._model_switch_task: Optional[asyncio.Task] = None
+        self.audio_transport = AudioFrameTransport(
+            num_slots=int(Config.AUDIO_TRANSPORT_CAPACITY_S * Config.SAMPLE_RATE / Config.AUDIO_BLOCK_SIZE),
+            block_size=Config.AUDIO_BLOCK_SIZE,
+            channels=Config.CHANNELS,
+        )
+        self._reported_overruns = 0
+        self.vad = self._create_vad()
         self.is_recording = threading.Event()
         self.is_recording.set()
         
@@ -72,19 +192,37 @@ class STTService:
         self.streaming_processor = None
         self.streaming_active = False
         self.processed_chunks = []  # Store processed chunk results
-        self.unsent_sentences = []  # Buffer for unsent sentences
+        self.committed_prefix = CommittedPrefixTracker(
+            max_uncommitted_s=Config.STREAMING_MAX_UNCOMMITTED_S,
+            force_commit_age_s=Config.STREAMING_CHUNK_DURATION_S,
+        )
+        self._streaming_tasks = set()  # Streaming windows awaiting or applying their transcription
+        # Buffer for unsent sentences; journaled to disk once run() starts
+        self.unsent_sentences = SentenceOutbox(self.stt_client_id, max_in_memory=Config.OUTBOX_MAX_IN_MEMORY)
+        # Stage timestamps of the utterance in progress and their rolling percentiles
+        self._timeline: Optional[UtteranceTimeline] = None
+        # Shared by the interims and the final of one utterance
+        self._utterance_id: Optional[str] = None
+        self._last_interim_text = ""
+        self.latency = LatencyMetrics(window=Config.LATENCY_WINDOW)
+        self._latency_export_path: Optional[str] = None  # Set by run()
         logger.info(f"STTService initialized for session {self.user_session_id}")
         if Config.STREAMING_ENABLED:
             logger.info("Streaming transcription optimization enabled")
 
     def _record_audio_thread(self):
-        """[Thread Target] Captures audio from microphone into a thread-safe queue."""
+        """[Thread Target] Captures audio from microphone into the lock-free frame transport."""
         def callback(indata, frames, time_info, status):
             if status: logger.warning(f"Recording status: {status}")
-            if self.is_recording.is_set(): self.audio_queue.put_nowait(indata.copy())
+            if self.is_recording.is_set():
+                self.audio_transport.push(indata, input_overflow=bool(status and status.input_overflow))
             
+        if sd is None:
+            logger.critical("Audio recording unavailable: PortAudio library not found. Use --input-file/--replay-dir for offline replay.")
+            return
         try:
-            with sd.InputStream(samplerate=Config.SAMPLE_RATE, channels=Config.CHANNELS, callback=callback, dtype='float32') as stream:
+            with sd.InputStream(samplerate=Config.SAMPLE_RATE, channels=Config.CHANNELS, callback=callback,
+                                dtype='float32', blocksize=Config.AUDIO_BLOCK_SIZE) as stream:
                 logger.info(f"Recording active: {stream.samplerate}Hz, {stream.channels}ch")
                 while self.is_recording.is_set(): time.sleep(0.1)
         except Exception as e:
@@ -96,7 +234,8 @@ class STTService:
         """Formats and sends a transcribed sentence over the WebSocket."""
         
         if is_interim:
-            return  # Skip filtering for interim results
+            await self._send_interim(websocket, sentence)
+            return
         
         if not sentence or not sentence.strip():
             logger.warning("STTService: Blocked empty or whitespace-only transcription from being sent.")
@@ -106,71 +245,11 @@ class STTService:
         message_type = "stt.transcription.interim" if is_interim else "stt.transcription"
         
         # Filter out common Whisper hallucination patterns that occur during silence
-        sentence_lower = sentence.lower().strip()
-        
-        # Define patterns with different strictness levels
-        # Very strict patterns - block even with extra content
-        strict_patterns = [
-            "thanks for watching", "thank you for watching", 
-            "please like and subscribe", "don't forget to subscribe",
-            "hit that subscribe button", "smash that like button"
-        ]
-        
-        # Moderate patterns - block if they dominate the sentence
-        moderate_patterns = [
-            "see you next time", "that's all for today", "until next time",
-            "catch you later", "thanks for your attention", "thank you for your time",
-            "appreciate you watching", "goodbye", "bye bye"
-        ]
-        
-        # Simple patterns - only block if they're the entire sentence
-        simple_patterns = ["thanks", "thank you"]
-        
-        # Check for multiple patterns (even if individually they wouldn't be blocked)
-        pattern_count = 0
-        found_patterns = []
-        all_patterns = strict_patterns + moderate_patterns + simple_patterns
-        for pattern in all_patterns:
-            if pattern in sentence_lower:
-                pattern_count += 1
-                found_patterns.append(pattern)
-        
-        # If multiple patterns found, be more aggressive about blocking
-        if pattern_count >= 2:
-            # Calculate how much of the sentence is NOT pattern-related
-            clean_text = sentence_lower
-            for pattern in found_patterns:
-                clean_text = clean_text.replace(pattern, "")
-            clean_text = clean_text.strip()
-            non_filler_words = [w for w in clean_text.split() if w not in ["for", "and", "the", "a", "to", "my", "your", "our", "everyone", "today", ","]]
-            if len(non_filler_words) < 3:
-                logger.warning(f"STTService: Blocked likely Whisper hallucination (multiple patterns): '{sentence}'")
-                return
-        
-        # Check strict patterns - block even with some extra content
-        for pattern in strict_patterns:
-            if pattern in sentence_lower:
-                # Allow if it's clearly in a different context (has substantial other content)
-                clean_text = sentence_lower.replace(pattern, "").strip()
-                non_filler_words = [w for w in clean_text.split() if w not in ["for", "and", "the", "a", "to", "my", "your", "our"]]
-                if len(non_filler_words) < 3:  # Less than 3 meaningful words left
-                    logger.warning(f"STTService: Blocked likely Whisper hallucination: '{sentence}'")
-                    return
-        
-        # Check moderate patterns - block if they dominate
-        for pattern in moderate_patterns:
-            if pattern in sentence_lower:
-                clean_text = sentence_lower.replace(pattern, "").strip()
-                non_filler_words = [w for w in clean_text.split() if w not in ["for", "and", "the", "a", "to", "my", "your", "our", "everyone", "today"]]
-                if len(non_filler_words) < 2:  # Less than 2 meaningful words left
-                    logger.warning(f"STTService: Blocked likely Whisper hallucination: '{sentence}'")
-                    return
-        
-        # Check simple patterns - only block if entire sentence
-        for pattern in simple_patterns:
-            if sentence_lower.strip() == pattern:
-                logger.warning(f"STTService: Blocked likely Whisper hallucination: '{sentence}'")
-                return
+        verdict = stt_filter.check(sentence)
+        self._mark("filtered")
+        if verdict.blocked:
+            logger.warning(f"STTService: Blocked likely Whisper hallucination ({verdict.reason}): '{sentence}'")
+            return
 
         transcription_logger.info(sentence)
         message = {
@@ -178,11 +257,25 @@ class STTService:
             "payload": {
                 "text": sentence, "language": Config.LANGUAGE,
                 "user_session_id": self.user_session_id,
-                "is_interim": is_interim
+                "is_interim": is_interim,
+                "utterance_id": self._utterance_id,
             },
             "origin": "stt_module", "client_id": self.stt_client_id
         }
-        
+        if self._timeline is not None:
+            self._timeline.mark("send_start")
+            message["payload"]["latency"] = self._timeline.to_payload()
+        self.unsent_sentences.stamp(message)
+
+        if self.unsent_sentences:
+            # Keep transcripts in order: queue behind the backlog and try to drain it
+            self.unsent_sentences.append(message)
+            if websocket.open:
+                await self._drain_outbox(websocket)
+                if not self.unsent_sentences:
+                    self._mark("sent")
+            return
+
         # Check if websocket is still open before attempting to send
         if not websocket.open:
             
@@ -192,6 +285,7 @@ class STTService:
             
         try:
             await websocket.send(json.dumps(message))
+            self._mark("sent")
             logger.info(f"Sent {'interim' if is_interim else 'final'}: {sentence}")
         except websockets.exceptions.ConnectionClosed:
             # Connection closed - buffer for retry
@@ -202,10 +296,162 @@ class STTService:
             logger.warning(f"Failed to send sentence, unexpected error: {e}. Buffering for retry.")
             self.unsent_sentences.append(message)
 
-    async def _process_streaming_chunk(self, audio_chunk: np.ndarray, chunk_index: int):
+    def _mark(self, event: str):
+        """Records `event` on the timeline of the utterance in progress, if any."""
+        if self._timeline is not None:
+            self._timeline.mark(event)
+
+    async def _finish_timeline(self):
+        """Adds the finished utterance's stage durations to the rolling metrics and exports them."""
+        timeline, self._timeline = self._timeline, None
+        if timeline is None:
+            return
+        self.latency.observe(timeline)
+        logger.debug(f"Utterance latency: {timeline.durations_ms()}")
+        if self._latency_export_path:
+            try:
+                await asyncio.to_thread(self.latency.export, self._latency_export_path)
+            except OSError as e:
+                logger.warning(f"Could not write latency metrics to {self._latency_export_path}: {e}")
+
+    @staticmethod
+    def _create_model(model_size: str, cpu_threads: int, num_workers: int = 1):
+        # As many workers as the transcription executor runs transcriptions at once
+        return WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads, num_workers=num_workers)
+
+    def _load_model(self):
+        """Loads the configured Whisper model, or the one chosen by RTF calibration when AUTO_TUNE is set."""
+        if not Config.AUTO_TUNE:
+            logger.info(f"Loading Whisper model '{self.model_size}'...")
+            return self._create_model(self.model_size, self.cpu_threads)
+
+        cache_key = {
+            "cpu_count": os.cpu_count(), "model_sizes": Config.AUTO_TUNE_MODEL_SIZES,
+            "rtf_budget": Config.AUTO_TUNE_RTF_BUDGET, "clip": Config.AUTO_TUNE_CLIP, "profile": Config.FINAL_PROFILE,
+        }
+        choice = load_cached_choice(Config.AUTO_TUNE_CACHE_FILE, cache_key)
+        if choice is not None:
+            logger.info(f"Using calibrated model '{choice.model_size}' with {choice.cpu_threads} threads from {Config.AUTO_TUNE_CACHE_FILE}")
+            model = self._create_model(choice.model_size, choice.cpu_threads)
+        else:
+            logger.info(f"Calibrating Whisper model size for RTF budget {Config.AUTO_TUNE_RTF_BUDGET}...")
+            clip = load_calibration_clip(Config.AUTO_TUNE_CLIP, Config.SAMPLE_RATE)
+            choice, results = calibrate(
+                self._create_model, clip, Config.SAMPLE_RATE, Config.AUTO_TUNE_RTF_BUDGET,
+                Config.AUTO_TUNE_MODEL_SIZES, candidate_thread_counts(),
+                language=Config.LANGUAGE, **self._decoding_options(Config.FINAL_PROFILE)
+            )
+            if choice is None:
+                logger.error(f"Calibration failed for all candidates; falling back to '{self.model_size}'")
+                return self._create_model(self.model_size, self.cpu_threads)
+            save_cached_choice(Config.AUTO_TUNE_CACHE_FILE, cache_key, choice, results)
+            model = choice.model
+            logger.info(f"Calibration chose model '{choice.model_size}' with {choice.cpu_threads} threads (RTF {choice.rtf:.3f})")
+        self.model_size, self.cpu_threads = choice.model_size, choice.cpu_threads
+        return model
+
+    def start_model_loading(self) -> Optional[threading.Thread]:
+        """
+        Loads (and warms up) the Whisper model on a background thread, unless a model is
+        already set or loading. Transcriptions submitted meanwhile wait in the executor.
+        """
+        if not self._owns_transcriber or self.transcriber.model is not None or self._model_loader is not None:
+            return None
+        self._model_loader = threading.Thread(target=self._load_model_in_background, name="whisper-loader", daemon=True)
+        self._model_loader.start()
+        return self._model_loader
+
+    def _load_model_in_background(self):
+        """[Loader Thread]"""
+        started = time.monotonic()
+        try:
+            model = self._load_model()
+            if Config.MODEL_WARMUP:
+                self._warm_up_model(model)
+        except Exception as e:
+            logger.critical(f"Loading the Whisper model failed: {e}", exc_info=True)
+            # Fail queued and future transcriptions instead of letting them wait forever
+            self.transcriber.close(error=RuntimeError(f"Whisper model unavailable: {e}"))
+            return
+        if Config.AUTO_TUNE:
+            self.rtf_monitor = RtfMonitor(Config.AUTO_TUNE_RTF_BUDGET, Config.AUTO_TUNE_MODEL_SIZES, self.model_size)
+            self.transcriber.observer = self._observe_transcription
+        self.model_load_s = time.monotonic() - started
+        self.model = model
+        logger.info(f"Whisper model '{self.model_size}' loaded and ready after {self.model_load_s:.2f}s.")
+
+    def _warm_up_model(self, model):
+        """Runs one transcription on silence so the first utterance doesn't pay one-time setup costs."""
+        started = time.monotonic()
+        silence = np.zeros(int(Config.MODEL_WARMUP_S * Config.SAMPLE_RATE), dtype=np.float32)
+        segments, _ = model.transcribe(silence, language=Config.LANGUAGE, **self._decoding_options(Config.INTERIM_PROFILE))
+        list(segments)
+        logger.info(f"Whisper warm-up took {time.monotonic() - started:.2f}s")
+
+    def _observe_transcription(self, priority: TranscriptionPriority, samples: int, run_s: float):
+        """[Transcription thread] Feeds the RTF of long enough finals to the online monitor."""
+        audio_s = samples / Config.SAMPLE_RATE
+        if priority == TranscriptionPriority.FINAL and audio_s >= Config.AUTO_TUNE_MIN_OBSERVED_S:
+            self.rtf_monitor.observe(audio_s, run_s)
+
+    def _maybe_switch_model(self):
+        """Starts loading a different model size in the background if the measured RTF drifted."""
+        if self.rtf_monitor is None or self._model_switch_task is not None:
+            return
+        target = self.rtf_monitor.suggestion()
+        if target:
+            self._model_switch_task = asyncio.create_task(self._switch_model(target))
+
+    async def _switch_model(self, model_size: str):
+        previous = self.model_size
+        try:
+            logger.info(f"Loading Whisper model '{model_size}' to replace '{previous}'...")
+            model = await asyncio.to_thread(self._create_model, model_size, self.cpu_threads)
+            # The executor picks the new model up with its next job
+            self.transcriber.model = model
+            self.model_size = model_size
+            logger.info(f"Switched Whisper model from '{previous}' to '{model_size}'")
+        except Exception as e:
+            logger.warning(f"Could not switch to model '{model_size}', keeping '{previous}': {e}")
+            self.rtf_monitor.current_size = previous
+        finally:
+            self._model_switch_task = None
+
+    def _create_vad(self):
+        return create_vad(
+            Config.VAD_MODE, Config.SAMPLE_RATE, Config.VAD_ENERGY_THRESHOLD,
+            frame_ms=Config.VAD_FRAME_MS, onset_prob=Config.VAD_ONSET_PROB, offset_prob=Config.VAD_OFFSET_PROB,
+            onset_frames=Config.VAD_ONSET_FRAMES, calibration_s=Config.VAD_CALIBRATION_S,
+        )
+
+    @property
+    def model(self):
+        """The Whisper model, owned by the transcription executor."""
+        return self.transcriber.model
+
+    @model.setter
+    def model(self, model):
+        self.transcriber.model = model
+        self.model_ready.set()
+
+    @staticmethod
+    def _decoding_options(profile: str) -> dict:
+        return resolve_profile(profile, Config.DECODING_OVERRIDES)
+
+    async def _transcribe_interim(self, audio: np.ndarray) -> list:
+        """Transcribes a streaming window; a newer window replaces it while it is still queued."""
+        options = self._decoding_options(Config.INTERIM_PROFILE)
+        options["word_timestamps"] = True  # Needed for local agreement, whatever the profile
+        return await self.transcriber.transcribe(
+            audio, priority=TranscriptionPriority.INTERIM, coalesce_key="interim",
+            language=Config.LANGUAGE, **options
+        )
+
+    async def _process_streaming_chunk(self, audio_chunk: np.ndarray, chunk_index: int, offset_s: float = 0.0):
         """Process a streaming audio chunk in the background.
         Returns a list of chunk_info dicts. Each returned chunk_info corresponds to
-        at most Config.MAX_CHUNK_DURATION_S seconds of audio.
+        at most Config.MAX_CHUNK_DURATION_S seconds of audio. Word timestamps in
+        chunk_info['words'] are shifted by offset_s (the chunk's start in the utterance).
         """
         try:
             total_samples = len(audio_chunk)
@@ -218,9 +464,7 @@ class STTService:
             
             if total_samples <= max_samples:
                 start_time = time.monotonic()
-                segments, _ = await asyncio.to_thread(
-                    self.model.transcribe, audio_chunk, language=Config.LANGUAGE
-                )
+                segments = await self._transcribe_interim(audio_chunk)
                 processing_time = time.monotonic() - start_time
                 
                 result_text = "".join(s.text for s in segments).strip()
@@ -228,6 +472,7 @@ class STTService:
                 chunk_info = {
                     'index': chunk_index,
                     'text': result_text,
+                    'words': words_from_segments(segments, offset_s),
                     'duration': chunk_duration,
                     'processing_time': processing_time,
                     'timestamp': time.time()
@@ -248,9 +493,7 @@ class STTService:
                 part_duration = len(part_audio) / Config.SAMPLE_RATE
                 
                 start_time = time.monotonic()
-                segments, _ = await asyncio.to_thread(
-                    self.model.transcribe, part_audio, language=Config.LANGUAGE
-                )
+                segments = await self._transcribe_interim(part_audio)
                 processing_time = time.monotonic() - start_time
                 
                 part_text = "".join(s.text for s in segments).strip()
@@ -258,6 +501,7 @@ class STTService:
                 part_info = {
                     'index': f"{chunk_index}.{part_idx}",
                     'text': part_text,
+                    'words': words_from_segments(segments, offset_s + start_sample / Config.SAMPLE_RATE),
                     'duration': part_duration,
                     'processing_time': processing_time,
                     'timestamp': time.time()
@@ -271,51 +515,50 @@ class STTService:
             
             return results
             
+        except InterimSuperseded as e:
+            logger.debug(f"Streaming chunk {chunk_index} skipped: {e}")
+            return None
         except Exception as e:
             logger.error(f"Error processing streaming chunk {chunk_index}: {e}", exc_info=True)
             return None
 
-    async def _start_streaming_processing(self, websocket, initial_buffer):
+    def _start_streaming_processing(self):
         """Start streaming processing for long speech segments."""
         if not Config.STREAMING_ENABLED or self.streaming_active:
             return
             
         self.streaming_active = True
         self.processed_chunks = []
+        self.committed_prefix.reset()
         
         logger.info("Starting streaming transcription processing")
-        
-        try:
-            # Process initial chunk
-            chunk_audio = np.concatenate([chunk.flatten() for chunk in initial_buffer])
-            chunk_infos = await self._process_streaming_chunk(chunk_audio, 0)
-            
-            if chunk_infos:
-                for ci in chunk_infos:
-                    if ci and ci.get('text'):
-                        self.processed_chunks.append(ci)
-                        # Send interim result for each sub-chunk
-                        await self._send_sentence(websocket, ci['text'], is_interim=True)
-                
-        except Exception as e:
-            logger.error(f"Error starting streaming processing: {e}", exc_info=True)
-            self.streaming_active = False
 
-    async def _process_streaming_buffer_chunk(self, websocket, buffer_chunk, chunk_index):
-        """Process additional streaming chunks while speech continues."""
+    async def _process_streaming_buffer_chunk(self, websocket, chunk_audio: np.ndarray, chunk_index, window_start_s: float = 0.0):
+        """
+        Transcribes one streaming window (last committed word to end of buffer), commits the
+        words this window agrees on with the previous one and sends the utterance so far as interim.
+        """
         if not self.streaming_active:
             return
             
         try:
-            chunk_audio = np.concatenate([chunk.flatten() for chunk in buffer_chunk])
-            chunk_infos = await self._process_streaming_chunk(chunk_audio, chunk_index)
+            chunk_infos = await self._process_streaming_chunk(chunk_audio, chunk_index, offset_s=window_start_s)
             
             if chunk_infos:
-                for ci in chunk_infos:
-                    if ci and ci.get('text'):
-                        self.processed_chunks.append(ci)
-                        # Send interim result for each sub-chunk
-                        await self._send_sentence(websocket, ci['text'], is_interim=True)
+                words = [w for ci in chunk_infos for w in ci['words']]
+                window_end_s = window_start_s + len(chunk_audio) / Config.SAMPLE_RATE
+                newly_committed = self.committed_prefix.update(words, window_end_s)
+                if newly_committed:
+                    logger.debug(f"Committed {len(newly_committed)} words up to {self.committed_prefix.committed_end_s:.2f}s")
+                self.processed_chunks.extend(ci for ci in chunk_infos if ci and ci.get('text'))
+
+                interim_text = " ".join(
+                    part for part in (self.committed_prefix.committed_text, self.committed_prefix.hypothesis_text) if part
+                )
+                if interim_text:
+                    if self._timeline is not None:
+                        self._timeline.mark_once("first_interim")
+                    await self._send_sentence(websocket, interim_text, is_interim=True)
                 
         except Exception as e:
             logger.error(f"Error processing streaming buffer chunk: {e}", exc_info=True)
@@ -342,7 +585,13 @@ class STTService:
             "id": str(uuid4()), "type": "stt.heartbeat", "timestamp": time.time(),
             "payload": {
                 "message": "keep-alive", 
-                "user_session_id": self.user_session_id
+                "user_session_id": self.user_session_id,
+                "audio_transport": self.audio_transport.stats(),
+                "transcription": self.transcriber.stats(),
+                "vad": self.vad.stats(),
+                "model": self._model_stats(),
+                "outbox": self.unsent_sentences.stats(),
+                "latency": self.latency.snapshot(),
             },
             "origin": "stt_module", "client_id": self.stt_client_id
         }
@@ -356,10 +605,20 @@ class STTService:
             # Only log warnings for unexpected errors, not connection closure
             logger.warning(f"Failed to send heartbeat, unexpected error: {e}")
 
+    def _model_stats(self) -> dict:
+        stats = {"model_size": self.model_size, "cpu_threads": self.cpu_threads, "ready": self.model_ready.is_set()}
+        if self.model_load_s is not None:
+            stats["load_s"] = round(self.model_load_s, 3)
+        if self.rtf_monitor is not None:
+            stats.update(self.rtf_monitor.stats())
+        return stats
+
     async def _process_audio_loop(self, websocket):
         """[Async Task] Implements the VAD-based 'record-then-transcribe' logic with streaming optimization."""
         logger.info("Entered _process_audio_loop")
-        audio_buffer = []
+        # Preallocated sample store for the current utterance; streaming windows and the
+        # final utterance are zero-copy views into it.
+        utterance = UtteranceBuffer(int(Config.UTTERANCE_PREALLOC_S * Config.SAMPLE_RATE))
         is_speaking = False
         silence_start_time = None
         last_heartbeat_time = time.monotonic()
@@ -369,100 +628,96 @@ class STTService:
         speech_start_time = None
         last_streaming_process_time = None
         streaming_chunk_index = 0
+        chunk_samples = int(Config.STREAMING_CHUNK_DURATION_S * Config.SAMPLE_RATE)
         
         # Keep a small buffer of recent silence to catch the start of speech
         silence_buffer_size = int(Config.VAD_BUFFER_DURATION_S * Config.SAMPLE_RATE)
-        silence_buffer = deque(maxlen=silence_buffer_size)
+        silence_buffer = AudioRingBuffer(silence_buffer_size)
 
         while self.is_recording.is_set():
             logger.debug("Audio loop: Waiting for audio chunk...")
             current_time = time.monotonic()
             
             try:
-                # Get a chunk of audio from the queue
-                audio_chunk = await asyncio.wait_for(self.audio_queue.get(), timeout=1.0)
-                
-                # Mark the task as done after processing
-                self.audio_queue.task_done()
+                # Get the next block from the recording thread (a view, valid until the next read)
+                samples = await self.audio_transport.read(timeout=1.0)
                 
                 logger.debug("Audio loop: Got an audio chunk.")
-                frame_energy = np.sqrt(np.mean(np.square(audio_chunk)))
+                # VAD and streaming decisions run on the audio clock (samples consumed), so they
+                # stay correct when the loop lags behind or audio is replayed faster than real time
+                audio_time = self.audio_transport.frames_read / Config.SAMPLE_RATE
+                if self.audio_transport.overruns != self._reported_overruns:
+                    self._reported_overruns = self.audio_transport.overruns
+                    logger.warning(f"Audio transport overrun: {self.audio_transport.stats()}")
+                vad_result = self.vad.process(samples)
                 
                 if is_speaking:
-                    audio_buffer.append(audio_chunk)
-                    buffer_duration = len(audio_buffer) * len(audio_chunk) / Config.SAMPLE_RATE
+                    utterance.append(samples)
+                    buffer_duration = len(utterance) / Config.SAMPLE_RATE
                     
-                    if frame_energy < Config.VAD_ENERGY_THRESHOLD:
+                    if not vad_result.is_speech:
                         if silence_start_time is None:
-                            silence_start_time = time.monotonic()
+                            silence_start_time = audio_time
                         # If silence duration is exceeded, end of sentence is detected
-                        elif time.monotonic() - silence_start_time > Config.VAD_SILENCE_DURATION_S:
+                        elif audio_time - silence_start_time > Config.VAD_SILENCE_DURATION_S:
                             is_speaking = False
-                            # Process streaming results if any
-                            if self.streaming_active:
-                                await self._finalize_streaming_results(websocket, audio_buffer)
+                            self._mark("vad_end")
                     else:
                         silence_start_time = None # Reset silence timer if speech is detected
+                        self._mark("last_speech")
                         
-                        # STREAMING OPTIMIZATION: Process chunks while speaking continues
+                        # STREAMING OPTIMIZATION: Process windows while speaking continues
                         if (Config.STREAMING_ENABLED and 
-                            buffer_duration >= Config.STREAMING_MIN_BUFFER_S):
+                            buffer_duration >= Config.STREAMING_MIN_BUFFER_S and
+                            len(utterance) >= chunk_samples):
                             
-                            # Check if it's time to process a streaming chunk
-                            if last_streaming_process_time is None:
-                                # Start streaming processing
-                                chunk_samples = int(Config.STREAMING_CHUNK_DURATION_S * Config.SAMPLE_RATE)
-                                chunk_size = chunk_samples // len(audio_chunk)
-                                
-                                if len(audio_buffer) >= chunk_size:
-                                    initial_buffer = audio_buffer[:chunk_size]
-                                    await self._start_streaming_processing(websocket, initial_buffer)
-                                    last_streaming_process_time = current_time
-                                    
-                            elif (current_time - last_streaming_process_time >= Config.STREAMING_CHUNK_DURATION_S):
-                                # Process next streaming chunk with overlap
-                                chunk_samples = int(Config.STREAMING_CHUNK_DURATION_S * Config.SAMPLE_RATE)
-                                overlap_samples = int(Config.STREAMING_OVERLAP_DURATION_S * Config.SAMPLE_RATE)
-                                
-                                chunk_size = chunk_samples // len(audio_chunk)
-                                overlap_size = overlap_samples // len(audio_chunk)
-                                
-                                # Calculate buffer slice for next chunk (with overlap)
-                                start_idx = max(0, len(audio_buffer) - chunk_size - overlap_size)
-                                end_idx = len(audio_buffer)
+                            if (last_streaming_process_time is None or
+                                    audio_time - last_streaming_process_time >= Config.STREAMING_CHUNK_DURATION_S):
+                                self._start_streaming_processing()
+                                # Each window runs from the last committed word to the end of the buffer
+                                window_start = int(self.committed_prefix.committed_end_s * Config.SAMPLE_RATE)
+                                window = utterance.view(window_start, len(utterance))
                                 
-                                if end_idx - start_idx >= chunk_size:
-                                    buffer_chunk = audio_buffer[start_idx:end_idx]
-                                    streaming_chunk_index += 1
-                                    
-                                    # Process in background (fire and forget for responsiveness)
-                                    asyncio.create_task(
-                                        self._process_streaming_buffer_chunk(
-                                            websocket, buffer_chunk, streaming_chunk_index
-                                        )
+                                # Process in background; if the previous window is still queued
+                                # for the model, this one replaces it
+                                task = asyncio.create_task(
+                                    self._process_streaming_buffer_chunk(
+                                        websocket, window, streaming_chunk_index,
+                                        window_start / Config.SAMPLE_RATE
                                     )
-                                    last_streaming_process_time = current_time
+                                )
+                                self._streaming_tasks.add(task)
+                                task.add_done_callback(self._streaming_tasks.discard)
+                                streaming_chunk_index += 1
+                                last_streaming_process_time = audio_time
                         
                 else:
-                    silence_buffer.extend(audio_chunk.flatten())
-                    if frame_energy > Config.VAD_ENERGY_THRESHOLD:
+                    silence_buffer.write(samples)
+                    if vad_result.is_speech:
                         logger.info("Speech detected.")
+                        self._timeline = UtteranceTimeline()
+                        self._timeline.mark("speech_onset")
+                        self._timeline.mark("last_speech")
+                        self._utterance_id = str(uuid4())
+                        self._last_interim_text = ""
                         is_speaking = True
                         silence_start_time = None
-                        speech_start_time = current_time
+                        speech_start_time = audio_time
                         last_streaming_process_time = None
                         streaming_chunk_index = 0
                         self.streaming_active = False
                         self.processed_chunks = []
+                        self.committed_prefix.reset()
                         last_activity_time = current_time  # Update activity time
-                        # Prepend the silence buffer to capture the start of the word
-                        audio_buffer = [np.array(list(silence_buffer))]
-                        audio_buffer.append(audio_chunk)
+                        # Prepend the silence buffer (which already holds this chunk) to capture the start of the word
+                        utterance.reset()
+                        utterance.append(silence_buffer.snapshot())
+                        silence_buffer.clear()
 
                 # If speech has ended, process the collected audio buffer
-                if not is_speaking and audio_buffer:
-                    await self._process_final_utterance(websocket, audio_buffer, current_time)
-                    audio_buffer.clear()
+                if not is_speaking and len(utterance):
+                    await self._process_final_utterance(websocket, utterance.view(), current_time)
+                    utterance.reset()
                     last_activity_time = current_time
 
                 # Send heartbeat if needed (no recent activity and sufficient time has passed)
@@ -489,32 +744,38 @@ class STTService:
                 # If speech was in progress and the queue is now empty, it's the end of an utterance
                 if is_speaking:
                     is_speaking = False
-                    if audio_buffer:
-                        await self._process_final_utterance(websocket, audio_buffer, current_time)
-                        audio_buffer.clear()
+                    self._mark("vad_end")
+                    if len(utterance):
+                        await self._process_final_utterance(websocket, utterance.view(), current_time)
+                        utterance.reset()
                         last_activity_time = current_time
                 continue
             except Exception as e:
                 logger.error(f"CRITICAL ERROR in transcription loop: {e}", exc_info=True)
                 # Reset state on error
-                audio_buffer.clear()
+                utterance.reset()
                 is_speaking = False
+                self._timeline = None
+                for task in list(self._streaming_tasks):
+                    task.cancel()
                 self.streaming_active = False
                 self.processed_chunks = []
+                self.committed_prefix.reset()
                 await asyncio.sleep(1)
 
-    async def _finalize_streaming_results(self, websocket, audio_buffer):
-        """Finalize streaming results and send consolidated transcription."""
+    async def _finalize_streaming_results(self, websocket, utterance_audio: np.ndarray):
+        """Finalize streaming results: committed words plus a transcription of the uncommitted tail only."""
         try:
             if self.processed_chunks:
-                # Optionally process any remaining audio not covered by streaming.
-                # This is the most crucial part.
-                remaining_audio = np.concatenate([chunk.flatten() for chunk in audio_buffer]) if audio_buffer else np.array([])
-                
-                # Use the new, safe helper function to transcribe the entire utterance.
-                # This handles both short and long audio gracefully by chunking it.
-                logger.info("Finalizing transcription for the complete utterance...")
-                final_transcription = await self._transcribe_long_audio(remaining_audio)
+                committed_text = self.committed_prefix.committed_text
+                tail_audio = utterance_audio[int(self.committed_prefix.committed_end_s * Config.SAMPLE_RATE):]
+                logger.info(f"Finalizing transcription: {len(self.committed_prefix.committed)} committed words, "
+                            f"transcribing {len(tail_audio) / Config.SAMPLE_RATE:.2f}s uncommitted tail...")
+                tail_text = ""
+                if len(tail_audio) >= int(Config.STREAMING_MIN_TAIL_S * Config.SAMPLE_RATE):
+                    tail_text = await self._transcribe_long_audio(tail_audio)
+                self._mark("transcribed")
+                final_transcription = " ".join(part for part in (committed_text, tail_text) if part)
                 
                 if len(final_transcription.split()) >= Config.MIN_WORDS_PER_SENTENCE:
                     await self._send_sentence(websocket, final_transcription, is_interim=False)
@@ -525,114 +786,124 @@ class STTService:
             # Reset streaming state for the next utterance
             self.streaming_active = False
             self.processed_chunks = []
+            self.committed_prefix.reset()
             
         except Exception as e:
             logger.error(f"Error finalizing streaming results: {e}", exc_info=True)
     
-    async def _process_final_utterance(self, websocket, audio_buffer, current_time):
+    async def _process_final_utterance(self, websocket, utterance_audio: np.ndarray, current_time):
         """Process final utterance using the new chunking transcription method."""
+        if self._streaming_tasks:
+            # Queued windows are stale now. A running one is let finish: the final would wait
+            # for the model anyway, its commits shrink the tail, and it must not send an
+            # interim after the final.
+            self.transcriber.cancel_pending(TranscriptionPriority.INTERIM)
+            await asyncio.gather(*self._streaming_tasks, return_exceptions=True)
+        self._mark("final_start")
         if self.streaming_active and self.processed_chunks:
             # We have streaming results, finalize them
-            await self._finalize_streaming_results(websocket, audio_buffer)
+            await self._finalize_streaming_results(websocket, utterance_audio)
         else:
-            # Traditional processing for short utterances or when streaming is disabled
-            full_utterance = np.concatenate([chunk.flatten() for chunk in audio_buffer])
-            
+            # Traditional processing for short utterances or when streaming is disabled.
             # Use the new, safe helper function to transcribe
             # This handles both short and long audio gracefully
-            full_sentence = await self._transcribe_long_audio(full_utterance)
+            full_sentence = await self._transcribe_long_audio(utterance_audio)
+            self._mark("transcribed")
             
             if len(full_sentence.split()) >= Config.MIN_WORDS_PER_SENTENCE:
                 await self._send_sentence(websocket, full_sentence, is_interim=False)
             else:
                 logger.info(f"Skipping short sentence: '{full_sentence}'")
+        await self._finish_timeline()
+        self._maybe_switch_model()
 
 
     async def _transcribe_long_audio(self, audio_data: np.ndarray) -> str:
         """
-        Transcribes audio data, splitting it into manageable chunks if it exceeds
-        a maximum duration to avoid long blocking calls.
+        Transcribes audio data, splitting it into overlapping chunks if it exceeds
+        Config.MAX_CHUNK_DURATION_S to avoid long blocking calls.
         """
-        MAX_CHUNK_DURATION_S = 20.0
-        OVERLAP_DURATION_S = 1.0  # 1-second overlap for context between chunks
-
-        total_samples = len(audio_data)
-        total_duration_s = total_samples / Config.SAMPLE_RATE
+        total_duration_s = len(audio_data) / Config.SAMPLE_RATE
 
         # If the audio is short enough, transcribe it directly
-        if total_duration_s <= MAX_CHUNK_DURATION_S:
+        if total_duration_s <= Config.MAX_CHUNK_DURATION_S:
             logger.info(f"Transcribing short utterance ({total_duration_s:.2f}s) in a single pass.")
-            segments, _ = await asyncio.to_thread(
-                self.model.transcribe, audio_data, language=Config.LANGUAGE
+            segments = await self.transcriber.transcribe(
+                audio_data, priority=TranscriptionPriority.FINAL, language=Config.LANGUAGE,
+                **self._decoding_options(Config.FINAL_PROFILE)
             )
             return "".join(s.text for s in segments).strip()
 
-        # --- Logic for splitting long audio ---
-        logger.info(f"Audio duration ({total_duration_s:.2f}s) exceeds max chunk size. Splitting into chunks...")
-        
+        chunks = plan_chunks(total_duration_s, Config.MAX_CHUNK_DURATION_S, Config.LONG_FORM_OVERLAP_S)
+        logger.info(f"Audio duration ({total_duration_s:.2f}s) exceeds max chunk size. Split into {len(chunks)} chunks.")
+        if Config.LONG_FORM_BATCH_SIZE > 0 and self.transcriber.batched_factory is not None:
+            try:
+                return await self._transcribe_chunks_batched(audio_data, chunks)
+            except Exception as e:
+                logger.warning(f"Batched transcription failed ({e}); transcribing the chunks one after another.")
+        return await self._transcribe_chunks_sequentially(audio_data, chunks)
+
+    async def _transcribe_chunks_batched(self, audio_data: np.ndarray, chunks) -> str:
+        """Decodes all chunks in batches and keeps each overlapping word once, by its timestamps."""
+        options = self._decoding_options(Config.LONG_FORM_BATCHED_PROFILE)
+        options["word_timestamps"] = True  # Required to merge the overlaps
+        segments = await self.transcriber.transcribe(
+            audio_data, priority=TranscriptionPriority.FINAL, batched=True, language=Config.LANGUAGE,
+            vad_filter=False, clip_timestamps=[{"start": start, "end": end} for start, end in chunks],
+            batch_size=Config.LONG_FORM_BATCH_SIZE, **options
+        )
+        words = merge_chunk_words(chunks, group_words_by_chunk(segments, chunks))
+        text = join_words(words)
+        logger.info(f"Batched transcription of {len(chunks)} chunks: '{text}'")
+        return text
+
+    async def _transcribe_chunks_sequentially(self, audio_data: np.ndarray, chunks) -> str:
         transcribed_parts = []
-        
-        # Convert durations to sample counts
-        max_samples_per_chunk = int(MAX_CHUNK_DURATION_S * Config.SAMPLE_RATE)
-        overlap_samples = int(OVERLAP_DURATION_S * Config.SAMPLE_RATE)
-        
-        start_sample = 0
-        chunk_index = 0
-        while start_sample < total_samples:
-            end_sample = min(start_sample + max_samples_per_chunk, total_samples)
-            
-            chunk_audio = audio_data[start_sample:end_sample]
+        options = self._decoding_options(Config.LONG_FORM_PROFILE)
+
+        for chunk_index, (start_s, end_s) in enumerate(chunks):
+            chunk_audio = audio_data[int(start_s * Config.SAMPLE_RATE):int(end_s * Config.SAMPLE_RATE)]
             chunk_duration = len(chunk_audio) / Config.SAMPLE_RATE
-            
+
             logger.info(f"Transcribing chunk {chunk_index} ({chunk_duration:.2f}s)...")
-            
-            segments, _ = await asyncio.to_thread(
-                self.model.transcribe, chunk_audio, language=Config.LANGUAGE
+
+            # Chunks are separate calls, so carry the context over as the prompt
+            if options.get("condition_on_previous_text") and transcribed_parts:
+                options["initial_prompt"] = transcribed_parts[-1]
+            segments = await self.transcriber.transcribe(
+                chunk_audio, priority=TranscriptionPriority.FINAL, language=Config.LANGUAGE, **options
             )
-            
+
             chunk_text = "".join(s.text for s in segments).strip()
             transcribed_parts.append(chunk_text)
-            
+
             logger.info(f"Chunk {chunk_index} result: '{chunk_text}'")
-            
-            # Move to the next chunk
-            start_sample += max_samples_per_chunk - overlap_samples
-            chunk_index += 1
-            
+
         return " ".join(part for part in transcribed_parts if part)
 
     async def run(self):
         """Main service loop that manages WebSocket connection and tasks."""
         logger.info("Starting STTService.run()")
         websocket_uri = f"{Config.WEBSOCKET_URI}/{self.stt_client_id}"
+        self.audio_transport.bind_loop(asyncio.get_running_loop())
+        # The model loads while capture starts and the handshake runs; audio recorded in the
+        # meantime is buffered in the transport and transcribed once the model is ready
+        self.start_model_loading()
         threading.Thread(target=self._record_audio_thread, daemon=True).start()
+        if Config.OUTBOX_FILE:
+            self.unsent_sentences.open_journal(Config.OUTBOX_FILE)
+        self._latency_export_path = Config.LATENCY_METRICS_FILE
 
         while self.is_recording.is_set():
             logger.info("Main loop: Attempting to connect to WebSocket...")
             try:
                 async with websockets.connect(websocket_uri, ping_interval=5, ping_timeout=30) as websocket:
                     logger.info(f"STT: ✅ WebSocket connection established to {websocket_uri}")
-                    initial_message = {
-                        "id": str(uuid4()), "type": "stt.init", "timestamp": time.time(),
-                        "payload": {"message": "STT service connected", "user_session_id": self.user_session_id},
-                        "origin": "stt_module", "client_id": self.stt_client_id,
-                    }
-                    await websocket.send(json.dumps(initial_message))
+                    await websocket.send(json.dumps(self._build_init_message()))
                     logger.info(f"STT: 📤 Sent handshake init message for session {self.user_session_id}")
 
-                    # Retry any unsent sentences from previous connection failures
-                    if self.unsent_sentences:
-                        logger.info(f"Retrying {len(self.unsent_sentences)} unsent sentences after reconnect.")
-                        for msg in self.unsent_sentences:
-                            try:
-                                await websocket.send(json.dumps(msg))
-                                logger.info(f"Retried and sent buffered sentence: {msg['payload']['text']}")
-                            except websockets.exceptions.ConnectionClosed:
-                                logger.info("Cannot resend buffered sentence - connection closed during retry.")
-                                break  # Stop trying to send more if connection is closed
-                            except Exception as e:
-                                logger.warning(f"Failed to resend buffered sentence: {e}")
-                        self.unsent_sentences.clear()
+                    # Resend sentences buffered during the outage (or by a previous process)
+                    await self._drain_outbox(websocket)
 
                     await self._process_audio_loop(websocket)
             except websockets.exceptions.ConnectionClosed as e:
@@ -644,26 +915,223 @@ class STTService:
                 logger.error(f"STT: ❌ WebSocket connection to {websocket_uri} failed: {e}. Retrying in 3s...", exc_info=True)
                 await asyncio.sleep(3)
 
+    async def _send_interim(self, websocket, sentence: str):
+        """
+        Sends the utterance so far as stt.transcription.interim. Interims are best effort: they
+        are superseded by the next one and by the final, so they are neither numbered nor
+        buffered when the connection is down, and an unchanged text is not sent again.
+        """
+        sentence = sentence.strip()
+        if not Config.SEND_INTERIMS or not sentence or sentence == self._last_interim_text:
+            return
+        if not websocket.open:
+            return
+        verdict = stt_filter.check(sentence)
+        if verdict.blocked:
+            logger.debug(f"STTService: Not sending interim blocked as hallucination ({verdict.reason}): '{sentence}'")
+            return
+        self._last_interim_text = sentence
+        transcription_logger.info(f"[INTERIM] {sentence}")
+        message = {
+            "id": str(uuid4()), "type": "stt.transcription.interim", "timestamp": time.time(),
+            "payload": {
+                "text": sentence, "language": Config.LANGUAGE,
+                "user_session_id": self.user_session_id,
+                "is_interim": True,
+                "utterance_id": self._utterance_id,
+            },
+            "origin": "stt_module", "client_id": self.stt_client_id
+        }
+        try:
+            await websocket.send(json.dumps(message))
+            logger.debug(f"Sent interim: {sentence}")
+        except Exception as e:
+            logger.debug(f"Dropped interim, send failed: {e}")
+
+    async def _drain_outbox(self, websocket) -> int:
+        """Resends buffered transcriptions oldest first, in batches. Returns how many were sent."""
+        if self.unsent_sentences:
+            logger.info(f"Resending {len(self.unsent_sentences)} unsent sentences in batches of {Config.OUTBOX_BATCH_SIZE}.")
+        sent = 0
+        while self.unsent_sentences:
+            batch = self.unsent_sentences.peek(Config.OUTBOX_BATCH_SIZE)
+            message = {
+                "id": str(uuid4()), "type": "stt.transcription.batch", "timestamp": time.time(),
+                "payload": {"messages": batch, "user_session_id": self.user_session_id},
+                "origin": "stt_module", "client_id": self.stt_client_id
+            }
+            try:
+                await websocket.send(json.dumps(message))
+            except websockets.exceptions.ConnectionClosed:
+                logger.info("Cannot resend buffered sentences - connection closed during retry.")
+                break
+            except Exception as e:
+                logger.warning(f"Failed to resend buffered sentences: {e}")
+                break
+            self.unsent_sentences.ack(len(batch))
+            sent += len(batch)
+        return sent
+
+    async def run_audio_stream(self, encoding: str = DEFAULT_ENCODING):
+        """
+        Client mode for the backend-hosted STT: streams the microphone to the backend as binary
+        `encoding` frames after an stt.stream.start message. VAD and transcription run in the
+        backend, so no model is loaded here.
+        """
+        websocket_uri = f"{Config.WEBSOCKET_URI}/{self.stt_client_id}"
+        self.audio_transport.bind_loop(asyncio.get_running_loop())
+        threading.Thread(target=self._record_audio_thread, daemon=True).start()
+        start_message = {
+            "id": str(uuid4()), "type": "stt.stream.start", "timestamp": time.time(),
+            "payload": {"user_session_id": self.user_session_id, "encoding": encoding,
+                        "sample_rate": Config.SAMPLE_RATE, "channels": Config.CHANNELS},
+            "origin": "stt_module", "client_id": self.stt_client_id,
+        }
+
+        while self.is_recording.is_set():
+            try:
+                async with websockets.connect(websocket_uri, ping_interval=5, ping_timeout=30) as websocket:
+                    await websocket.send(json.dumps(self._build_init_message()))
+                    await websocket.send(json.dumps(start_message))
+                    logger.info(f"STT: 📤 Streaming {encoding} audio to {websocket_uri}")
+                    # Acknowledgements are not needed, but must be read so the connection keeps flowing
+                    discard = asyncio.create_task(_discard_incoming(websocket))
+                    try:
+                        while self.is_recording.is_set():
+                            try:
+                                samples = await self.audio_transport.read(timeout=1.0)
+                            except asyncio.TimeoutError:
+                                continue
+                            await websocket.send(encode_frame(samples, encoding))
+                    finally:
+                        discard.cancel()
+            except websockets.exceptions.ConnectionClosed as e:
+                logger.warning(f"STT: 🔌 Audio stream to {websocket_uri} closed ({getattr(e, 'code', 'Unknown')}). Reconnecting in 3s...")
+                await asyncio.sleep(3)
+            except Exception as e:
+                logger.error(f"STT: ❌ Audio stream to {websocket_uri} failed: {e}. Retrying in 3s...", exc_info=True)
+                await asyncio.sleep(3)
+
+    def _build_init_message(self) -> dict:
+        return {
+            "id": str(uuid4()), "type": "stt.init", "timestamp": time.time(),
+            "payload": {"message": "STT service connected", "user_session_id": self.user_session_id},
+            "origin": "stt_module", "client_id": self.stt_client_id,
+        }
+
+    async def run_replay(self, files, realtime: bool = False, connect_backend: bool = False) -> dict:
+        """
+        Replays audio files through the regular VAD/streaming/finalization path instead of
+        the microphone and returns a benchmark report. Sends go to a recording stub unless
+        connect_backend is set, in which case they are also forwarded to the backend.
+        """
+        # Wait for the model so load time doesn't skew the replay timings; it is reported separately
+        loader = self.start_model_loading()
+        if loader is not None:
+            await asyncio.to_thread(loader.join)
+        runner = ReplayRunner(
+            self, Config.SAMPLE_RATE, Config.AUDIO_BLOCK_SIZE,
+            silence_tail_s=Config.VAD_SILENCE_DURATION_S + 0.5, realtime=realtime
+        )
+        if not connect_backend:
+            report = await runner.run(files, RecordingWebSocket())
+        else:
+            websocket_uri = f"{Config.WEBSOCKET_URI}/{self.stt_client_id}"
+            async with websockets.connect(websocket_uri, ping_interval=5, ping_timeout=30) as websocket:
+                await websocket.send(json.dumps(self._build_init_message()))
+                report = await runner.run(files, RecordingWebSocket(websocket))
+        report["model"] = self._model_stats()
+        report["decoding_profiles"] = {
+            "interim": Config.INTERIM_PROFILE, "final": Config.FINAL_PROFILE, "long_form": Config.LONG_FORM_PROFILE,
+            "long_form_batched": Config.LONG_FORM_BATCHED_PROFILE, "long_form_batch_size": Config.LONG_FORM_BATCH_SIZE,
+        }
+        report["transcription"] = self.transcriber.stats()
+        report["latency"] = self.latency.snapshot()
+        return report
+
     def stop(self):
         """Stops the recording and shuts down the service."""
         self.is_recording.clear()
         self.streaming_active = False
         self.processed_chunks = []
+        self.committed_prefix.reset()
+        self.transcriber.close()
+        self.unsent_sentences.close()
         logger.info("Shutdown signal received. Stopping STT service.")
         logger.info("STTService.stop() method completed.")
 
+async def _discard_incoming(websocket):
+    async for _ in websocket:
+        pass
+
+
 # --- MAIN EXECUTION BLOCK ---
 if __name__ == "__main__":
+    configure_logging()
     parser = argparse.ArgumentParser(description="STT Module for Context Translator.")
-    parser.add_argument("--user-session-id", required=True, help="The unique ID for the user session.")
+    parser.add_argument("--user-session-id", help="The unique ID for the user session (required for live capture).")
+    parser.add_argument("--stream-audio", nargs="?", const=DEFAULT_ENCODING, choices=sorted(ENCODINGS), metavar="ENCODING",
+                        help=f"Stream the microphone to the backend-hosted STT instead of transcribing locally "
+                             f"({', '.join(sorted(ENCODINGS))}; default {DEFAULT_ENCODING}).")
+    replay_group = parser.add_argument_group("offline replay", "Feed audio files instead of the microphone and report timings as JSON.")
+    replay_group.add_argument("--input-file", help="Audio file (WAV/FLAC/...) to replay.")
+    replay_group.add_argument("--replay-dir", help="Directory whose audio files are replayed in name order.")
+    replay_group.add_argument("--realtime", action="store_true", help="Pace the replay at real time instead of as fast as possible.")
+    replay_group.add_argument("--replay-backend", action="store_true", help="Also send transcriptions to the backend WebSocket instead of only a stub.")
+    replay_group.add_argument("--report-file", help="Write the JSON report to this file instead of stdout.")
+    model_group = parser.add_argument_group("model", "Whisper model size and CPU tuning.")
+    model_group.add_argument("--model-size", help=f"Whisper model size (default: {Config.MODEL_SIZE}).")
+    model_group.add_argument("--cpu-threads", type=int, help="CTranslate2 threads (default: library default).")
+    model_group.add_argument("--auto-tune", action="store_true", help="Pick model size and threads by benchmarking against --rtf-budget.")
+    model_group.add_argument("--rtf-budget", type=float, help=f"Real-time-factor budget for --auto-tune (default: {Config.AUTO_TUNE_RTF_BUDGET}).")
+    model_group.add_argument("--calibration-clip", help="Speech recording to calibrate with (default: synthetic signal).")
+    decoding_group = parser.add_argument_group("decoding", "Whisper decoding profiles per call site.")
+    decoding_group.add_argument("--interim-profile", choices=sorted(DECODING_PROFILES), help=f"Profile for streaming windows (default: {Config.INTERIM_PROFILE}).")
+    decoding_group.add_argument("--final-profile", choices=sorted(DECODING_PROFILES), help=f"Profile for final utterances (default: {Config.FINAL_PROFILE}).")
+    decoding_group.add_argument("--long-form-profile", choices=sorted(DECODING_PROFILES), help=f"Profile for utterances split into chunks (default: {Config.LONG_FORM_PROFILE}).")
+    decoding_group.add_argument("--long-form-batch-size", type=int, metavar="N",
+                                help=f"Chunks of a long utterance decoded together, 0 = one after another (default: {Config.LONG_FORM_BATCH_SIZE}).")
+    decoding_group.add_argument("--decoding-option", action="append", default=[], metavar="PROFILE.OPTION=VALUE",
+                                help="Override a transcribe() option of a profile, e.g. interim-fast.beam_size=2 (repeatable).")
     
     service = None
     try:
         args = parser.parse_args()
-        service = STTService(user_session_id=args.user_session_id)
-        asyncio.run(service.run())
+        replay_mode = bool(args.input_file or args.replay_dir)
+        Config.MODEL_SIZE = args.model_size or Config.MODEL_SIZE
+        Config.CPU_THREADS = args.cpu_threads if args.cpu_threads is not None else Config.CPU_THREADS
+        Config.AUTO_TUNE = args.auto_tune or Config.AUTO_TUNE
+        Config.AUTO_TUNE_RTF_BUDGET = args.rtf_budget or Config.AUTO_TUNE_RTF_BUDGET
+        Config.AUTO_TUNE_CLIP = args.calibration_clip or Config.AUTO_TUNE_CLIP
+        Config.INTERIM_PROFILE = args.interim_profile or Config.INTERIM_PROFILE
+        Config.FINAL_PROFILE = args.final_profile or Config.FINAL_PROFILE
+        Config.LONG_FORM_PROFILE = args.long_form_profile or Config.LONG_FORM_PROFILE
+        Config.LONG_FORM_BATCH_SIZE = args.long_form_batch_size if args.long_form_batch_size is not None else Config.LONG_FORM_BATCH_SIZE
+        for option in args.decoding_option:
+            try:
+                profile, key, value = parse_decoding_option(option)
+            except ValueError as e:
+                parser.error(str(e))
+            Config.DECODING_OVERRIDES.setdefault(profile, {})[key] = value
+        if not replay_mode and not args.user_session_id:
+            parser.error("--user-session-id is required unless --input-file or --replay-dir is given.")
+
+        service = STTService(user_session_id=args.user_session_id or f"replay_{uuid4()}")
+        if replay_mode:
+            files = collect_replay_files(args.input_file, args.replay_dir)
+            report = asyncio.run(service.run_replay(files, realtime=args.realtime, connect_backend=args.replay_backend))
+            report_json = json.dumps(report, indent=2, ensure_ascii=False)
+            if args.report_file:
+                Path(args.report_file).write_text(report_json, encoding='utf-8')
+                logger.info(f"Replay report written to {args.report_file}")
+            else:
+                print(report_json)
+        elif args.stream_audio:
+            asyncio.run(service.run_audio_stream(args.stream_audio))
+        else:
+            asyncio.run(service.run())
     except SystemExit:
-        logger.critical("Argument parsing failed. Please provide --user-session-id.")
+        logger.critical("Argument parsing failed. Please provide --user-session-id or a replay input.")
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received. Shutting down.")
     except Exception as e:
@@ -672,6 +1140,5 @@ if __name__ == "__main__":
         if service:
             service.stop()
         
-        transcription_logger.removeHandler(t_handler)
-        t_handler.close()
+        transcription_log_pipeline.stop()
         logger.info("Cleanup complete. STT module has shut down.")
\ No newline at end of file
@@ -0,0 +1,301 @@
+# Backend/STT/transcription_executor.py
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionPriority(IntEnum):
+    FINAL = 0
+    INTERIM = 1
+
+
+class InterimSuperseded(Exception):
+    """Raised to the submitter of an interim job that was replaced or dropped before it ran."""
+
+
+@dataclass
+class _Job:
+    priority: int
+    seq: int
+    audio: Any
+    options: Dict[str, Any]
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    submitted_at: float
+    coalesce_key: Optional[str] = None
+    batched: bool = False
+    session: str = ""
+    cancelled: bool = False
+
+
+class TranscriptionExecutor:
+    """
+    Owns the Whisper model and runs all transcriptions on dedicated worker threads (one by
+    default).
+
+    Jobs are ordered by priority (finals before interims), then by submission order. An
+    interim job submitted with a `coalesce_key` replaces any queued job of the same session
+    with the same key that has not started yet, and when a session has more than
+    `max_pending` jobs queued its oldest interims are dropped. Finals are never dropped.
+    Replaced or dropped jobs raise InterimSuperseded to their submitter.
+
+    With a single worker a running interim is never preempted, but a final never waits
+    behind more than that one job. The model may be set after jobs were submitted (e.g.
+    while it is still loading); they wait in the queue until it is.
+
+    Several sessions (e.g. the streams of a backend-hosted STT, see for_session()) can share
+    one executor and model. Among jobs of equal priority the session served least recently
+    goes first, so a long utterance of one speaker does not hold up everyone else. With
+    `num_workers` > 1 that many jobs run concurrently; the model must allow it (faster-whisper's
+    WhisperModel(num_workers=...)).
+
+    Jobs submitted with `batched=True` run on `batched_factory(model)` (e.g. faster-whisper's
+    BatchedInferencePipeline), created once per model.
+    """
+
+    def __init__(self, model=None, max_pending: int = 4, name: str = "whisper-transcriber",
+                 batched_factory: Optional[Callable[[Any], Any]] = None, num_workers: int = 1):
+        self._model = model
+        self.batched_factory = batched_factory
+        self._batched_pipeline: Optional[tuple] = None  # (model, pipeline)
+        self.max_pending = max(1, int(max_pending))
+        self.num_workers = max(1, int(num_workers))
+        self._jobs: List[_Job] = []
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._running: List[_Job] = []
+        self._last_served: Dict[str, int] = {}  # Session -> seq of the job it last started
+        self._closed = False
+        self._error: Optional[Exception] = None
+        # Called as observer(priority, audio_samples, run_s) after each successful job
+        self.observer: Optional[Callable[[TranscriptionPriority, int, float], None]] = None
+
+        self.completed = {TranscriptionPriority.FINAL: 0, TranscriptionPriority.INTERIM: 0}
+        self.superseded = 0
+        self.dropped = 0
+        self.last_wait_s = {TranscriptionPriority.FINAL: 0.0, TranscriptionPriority.INTERIM: 0.0}
+        self.run_time_s = {TranscriptionPriority.FINAL: 0.0, TranscriptionPriority.INTERIM: 0.0}
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=name if self.num_workers == 1 else f"{name}-{i}", daemon=True)
+            for i in range(self.num_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def model(self):
+        return self._model
+
+    @model.setter
+    def model(self, model):
+        """Sets or swaps the model; the worker uses it from its next job on."""
+        with self._cond:
+            self._model = model
+            self._cond.notify_all()
+
+    def for_session(self, session: str) -> "SessionTranscriber":
+        """A view of this executor whose jobs belong to `session`."""
+        return SessionTranscriber(self, session)
+
+    async def transcribe(self, audio, priority: TranscriptionPriority = TranscriptionPriority.FINAL,
+                         coalesce_key: Optional[str] = None, batched: bool = False, session: str = "",
+                         **options) -> list:
+        """Queues a model.transcribe(audio, **options) call and returns its segments as a list."""
+        loop = asyncio.get_running_loop()
+        job = _Job(int(priority), next(self._seq), audio, options, loop.create_future(), loop,
+                   time.monotonic(), coalesce_key, batched, session)
+        with self._cond:
+            if self._closed:
+                raise self._error or RuntimeError("TranscriptionExecutor is closed")
+            if batched and self.batched_factory is None:
+                raise RuntimeError("No batched pipeline available")
+            if coalesce_key is not None:
+                for queued in self._pending(session):
+                    if queued.coalesce_key == coalesce_key:
+                        self._cancel(queued, InterimSuperseded("Superseded by a newer window"))
+                        self.superseded += 1
+            self._jobs.append(job)
+            self._enforce_bound(session)
+            self._cond.notify()
+        return await job.future
+
+    def cancel_pending(self, priority: TranscriptionPriority = TranscriptionPriority.INTERIM,
+                       session: Optional[str] = None) -> int:
+        """Drops all queued (not yet running) jobs of the given priority (and session). Returns how many."""
+        with self._cond:
+            stale = [j for j in self._pending(session) if j.priority == priority]
+            for job in stale:
+                self._cancel(job, InterimSuperseded("Cancelled before it ran"))
+            self.superseded += len(stale)
+            return len(stale)
+
+    def close_session(self, session: str, error: Optional[Exception] = None):
+        """Fails all queued jobs of `session`; the executor keeps serving the others."""
+        with self._cond:
+            for job in self._pending(session):
+                self._cancel(job, error or RuntimeError(f"Transcription session {session} closed"))
+            self._last_served.pop(session, None)
+
+    def close(self, error: Optional[Exception] = None):
+        """
+        Stops the worker after the running job. Queued and later jobs fail with `error`
+        (e.g. the model could not be loaded), or a RuntimeError.
+        """
+        with self._cond:
+            self._closed = True
+            self._error = error
+            for job in self._pending():
+                self._cancel(job, error or RuntimeError("TranscriptionExecutor closed"))
+            self._jobs.clear()
+            self._cond.notify_all()
+
+    def _pending(self, session: Optional[str] = None) -> List[_Job]:
+        return [j for j in self._jobs if not j.cancelled and (session is None or j.session == session)]
+
+    def _enforce_bound(self, session: str):
+        pending = self._pending(session)
+        interims = sorted((j for j in pending if j.priority == TranscriptionPriority.INTERIM), key=lambda j: j.seq)
+        excess = len(pending) - self.max_pending
+        for job in interims[:max(0, excess)]:
+            self._cancel(job, InterimSuperseded("Transcription queue full"))
+            self.dropped += 1
+        if excess > len(interims):
+            logger.warning(f"Transcription queue holds {len(pending)} jobs (bound {self.max_pending}); finals are never dropped")
+
+    def _next_job(self) -> _Job:
+        """[Worker Thread, lock held] Removes the next job: by priority, then least recently served session."""
+        self._jobs = self._pending()
+        job = min(self._jobs, key=lambda j: (j.priority, self._last_served.get(j.session, -1), j.seq))
+        self._jobs.remove(job)
+        self._last_served[job.session] = job.seq
+        return job
+
+    @staticmethod
+    def _cancel(job: _Job, exc: Exception):
+        job.cancelled = True
+        _resolve(job, exc=exc)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._pending() or self._model is None):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                job = self._next_job()
+                self._running.append(job)
+                model = self._model
+
+            priority = TranscriptionPriority(job.priority)
+            started = time.monotonic()
+            self.last_wait_s[priority] = started - job.submitted_at
+            try:
+                if job.batched:
+                    model = self._batched_pipeline_for(model)
+                segments, _ = model.transcribe(job.audio, **job.options)
+                # Segments are a lazy generator; decoding happens while it is consumed
+                result = list(segments)
+                if self.observer is not None:
+                    self.observer(priority, len(job.audio), time.monotonic() - started)
+                _resolve(job, result=result)
+            except Exception as e:
+                _resolve(job, exc=e)
+            finally:
+                with self._cond:
+                    self._running.remove(job)
+                    self.completed[priority] += 1
+                    self.run_time_s[priority] += time.monotonic() - started
+
+    def _batched_pipeline_for(self, model):
+        """[Worker Thread] The batched pipeline wrapping `model`, rebuilt after a model swap."""
+        with self._cond:
+            if self._batched_pipeline is None or self._batched_pipeline[0] is not model:
+                self._batched_pipeline = (model, self.batched_factory(model))
+            return self._batched_pipeline[1]
+
+    def stats(self, session: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Returns queue counters for logging and the heartbeat payload. With `session`, the
+        queue lengths are those of that session; the other counters cover all sessions.
+        """
+        with self._cond:
+            pending = self._pending(session)
+            return {
+                "queued_final": sum(1 for j in pending if j.priority == TranscriptionPriority.FINAL),
+                "queued_interim": sum(1 for j in pending if j.priority == TranscriptionPriority.INTERIM),
+                "running": bool(self._running),
+                "workers": self.num_workers,
+                "completed_final": self.completed[TranscriptionPriority.FINAL],
+                "completed_interim": self.completed[TranscriptionPriority.INTERIM],
+                "superseded": self.superseded,
+                "dropped": self.dropped,
+                "last_final_wait_s": round(self.last_wait_s[TranscriptionPriority.FINAL], 4),
+                "last_interim_wait_s": round(self.last_wait_s[TranscriptionPriority.INTERIM], 4),
+                "avg_final_run_s": _average(self.run_time_s[TranscriptionPriority.FINAL], self.completed[TranscriptionPriority.FINAL]),
+                "avg_interim_run_s": _average(self.run_time_s[TranscriptionPriority.INTERIM], self.completed[TranscriptionPriority.INTERIM]),
+            }
+
+
+class SessionTranscriber:
+    """
+    One session's view of a shared TranscriptionExecutor, usable wherever an executor is:
+    jobs are tagged with the session, and cancel_pending(), close() and stats() only touch
+    its own queued jobs.
+    """
+
+    def __init__(self, executor: TranscriptionExecutor, session: str):
+        self.executor = executor
+        self.session = session
+
+    @property
+    def model(self):
+        return self.executor.model
+
+    @model.setter
+    def model(self, model):
+        self.executor.model = model
+
+    @property
+    def batched_factory(self):
+        return self.executor.batched_factory
+
+    async def transcribe(self, audio, priority: TranscriptionPriority = TranscriptionPriority.FINAL,
+                         coalesce_key: Optional[str] = None, batched: bool = False, **options) -> list:
+        return await self.executor.transcribe(audio, priority, coalesce_key, batched, session=self.session, **options)
+
+    def cancel_pending(self, priority: TranscriptionPriority = TranscriptionPriority.INTERIM) -> int:
+        return self.executor.cancel_pending(priority, session=self.session)
+
+    def close(self, error: Optional[Exception] = None):
+        self.executor.close_session(self.session, error)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.executor.stats(session=self.session)
+
+
+def _average(total: float, count: int) -> Optional[float]:
+    return round(total / count, 4) if count else None
+
+
+def _resolve(job: _Job, result=None, exc: Optional[Exception] = None):
+    def _set():
+        if job.future.done():
+            return
+        if exc is not None:
+            job.future.set_exception(exc)
+        else:
+            job.future.set_result(result)
+    try:
+        job.loop.call_soon_threadsafe(_set)
+    except RuntimeError:
+        # Loop already closed during shutdown
+        pass
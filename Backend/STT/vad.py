@@ -0,0 +1,157 @@
+# Backend/STT/vad.py
+
+import logging
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+from numpy import fft
+
+logger = logging.getLogger(__name__)
+
+_EPS = 1e-10
+
+
+@dataclass
+class VadResult:
+    """Outcome of one audio block: the speech state after it and the per-frame detail."""
+    is_speech: bool
+    speech_prob: np.ndarray  # Per-frame speech probability
+    energy: float  # RMS of the block
+
+
+class EnergyVAD:
+    """The original detector: block RMS against a fixed threshold."""
+
+    mode = "energy"
+
+    def __init__(self, sample_rate: int, threshold: float, frame_ms: float = 20.0):
+        self.threshold = threshold
+        self.frame_len = max(1, int(sample_rate * frame_ms / 1000))
+
+    def process(self, samples: np.ndarray) -> VadResult:
+        energy = float(np.sqrt(np.mean(np.square(samples))))
+        n_frames = len(samples) // self.frame_len
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        frame_rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        return VadResult(energy > self.threshold, (frame_rms > self.threshold).astype(np.float32), energy)
+
+    def stats(self) -> Dict:
+        return {"mode": self.mode, "threshold": self.threshold}
+
+
+class AdaptiveVAD:
+    """
+    Frame-level VAD that adapts to the room.
+
+    Each block is split into frames and, vectorized over all frames, scored on
+    - energy above a tracked noise floor (SNR in dB), and
+    - spectral flatness in the speech band (voiced speech is tonal, fans and hiss are flat).
+    These give a per-frame speech probability. The detector enters speech after
+    `onset_frames` consecutive frames above `onset_prob` and leaves it on the first frame
+    below `offset_prob` (hysteresis); how long a pause must last to end an utterance is
+    still decided by the caller.
+
+    The noise floor follows non-speech frames, drops quickly when the room gets quieter and
+    creeps up slowly even during speech, so a fan switched on mid-utterance does not keep
+    the utterance open forever. No speech is reported during the first `calibration_s`.
+    """
+
+    mode = "adaptive"
+
+    def __init__(self, sample_rate: int, frame_ms: float = 20.0, onset_prob: float = 0.6,
+                 offset_prob: float = 0.3, onset_frames: int = 3, calibration_s: float = 0.3,
+                 snr_mid_db: float = 6.0, snr_scale_db: float = 2.0, flatness_mid: float = 0.5,
+                 min_floor_db: float = -60.0, initial_floor_db: float = -60.0):
+        self.sample_rate = sample_rate
+        self.frame_len = max(1, int(sample_rate * frame_ms / 1000))
+        self.onset_prob = onset_prob
+        self.offset_prob = offset_prob
+        self.onset_frames = onset_frames
+        self.calibration_frames = int(calibration_s * 1000 / frame_ms)
+        self.snr_mid_db = snr_mid_db
+        self.snr_scale_db = snr_scale_db
+        self.flatness_mid = flatness_mid
+        self.min_floor_db = min_floor_db
+        self.initial_floor_db = initial_floor_db
+
+        self._window = np.hanning(self.frame_len).astype(np.float32)
+        # rfft bins covering 100 Hz - 4 kHz, where voiced speech carries its energy
+        self._band = slice(-(-100 * self.frame_len // sample_rate), 4000 * self.frame_len // sample_rate + 1)
+
+        self.reset()
+
+    def reset(self):
+        self.noise_floor_db = self.initial_floor_db
+        self.in_speech = False
+        self._onset_run = 0
+        self._frames_seen = 0
+        self._carry = np.zeros(0, dtype=np.float32)
+
+    def _features(self, frames: np.ndarray):
+        """Returns per-frame energy (dBFS) and spectral flatness for a (n_frames, frame_len) array."""
+        energy_db = 10.0 * np.log10(np.mean(np.square(frames), axis=1) + _EPS)
+        power = np.square(np.abs(fft.rfft(frames * self._window, axis=1)))[:, self._band] + _EPS
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, flatness
+
+    def process(self, samples: np.ndarray) -> VadResult:
+        energy = float(np.sqrt(np.mean(np.square(samples)))) if len(samples) else 0.0
+        if len(self._carry):
+            samples = np.concatenate((self._carry, samples))
+        n_frames = len(samples) // self.frame_len
+        self._carry = samples[n_frames * self.frame_len:].copy()
+        if n_frames == 0:
+            return VadResult(self.in_speech, np.zeros(0, dtype=np.float32), energy)
+
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, self.frame_len)
+        energy_db, flatness = self._features(frames)
+
+        # Sequential part: noise floor and hysteresis depend on the previous frame
+        probs = np.empty(n_frames, dtype=np.float32)
+        for i in range(n_frames):
+            snr = energy_db[i] - self.noise_floor_db
+            p_energy = 1.0 / (1.0 + np.exp(-(snr - self.snr_mid_db) / self.snr_scale_db))
+            p_tonal = 1.0 / (1.0 + np.exp(-(self.flatness_mid - flatness[i]) / 0.1))
+            # Flat high-energy frames (fricatives) still count half, so they don't end speech
+            prob = p_energy * (0.5 + 0.5 * p_tonal)
+            self._frames_seen += 1
+            calibrating = self._frames_seen <= self.calibration_frames
+            if calibrating:
+                prob = 0.0
+            probs[i] = prob
+
+            if self.in_speech:
+                if prob < self.offset_prob:
+                    self.in_speech = False
+            elif prob >= self.onset_prob:
+                self._onset_run += 1
+                if self._onset_run >= self.onset_frames:
+                    self.in_speech = True
+            else:
+                self._onset_run = 0
+            if self.in_speech:
+                self._onset_run = 0
+
+            if calibrating or energy_db[i] < self.noise_floor_db:
+                rate = 0.3
+            elif self.in_speech or prob >= self.offset_prob:
+                rate = 0.002
+            else:
+                rate = 0.05
+            self.noise_floor_db = max(self.min_floor_db, self.noise_floor_db + rate * (energy_db[i] - self.noise_floor_db))
+
+        return VadResult(self.in_speech, probs, energy)
+
+    def stats(self) -> Dict:
+        return {"mode": self.mode, "noise_floor_db": round(float(self.noise_floor_db), 1), "in_speech": self.in_speech}
+
+
+def create_vad(mode: str, sample_rate: int, energy_threshold: float, **options):
+    """Returns the VAD for `mode` ("adaptive" or "energy")."""
+    if mode == "energy":
+        # The fixed-threshold detector has no tuning beyond its frame size
+        return EnergyVAD(sample_rate, energy_threshold, frame_ms=options.get("frame_ms", 20.0))
+    if mode == "adaptive":
+        return AdaptiveVAD(sample_rate, **options)
+    raise ValueError(f"Unknown VAD mode: {mode}")
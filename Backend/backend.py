@@ -8,6 +8,7 @@ from starlette.websockets import WebSocketDisconnect, WebSocketState
 from .dependencies import set_session_manager_instance, set_settings_manager_instance
 from .core.session_manager import SessionManager
 from .core.settings_manager import SettingsManager
+from .core.log_pipeline import QueueLogging, file_handler
 
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
@@ -33,6 +34,8 @@ from .queues.QueueTypes import AbstractMessageQueue
 
 from .core.Queues import queues # Zugriff auf die vorinitialisierten Queues
 from .queues.MessageQueue import MessageQueue # Für Type Hinting (ebenfalls relativ, falls im selben Verzeichnis)
+from .queues.DetectionPipeline import DetectionPipeline, create_detection_pipeline # SmallModel → MainModel (DETECTION_PIPELINE=memory)
+from .queues.SqliteWorkQueue import DurableQueues, create_durable_queues # Dauerhafte Queues (WORK_QUEUE_BACKEND=sqlite)
 from .MessageRouter import MessageRouter # Importiere die MessageRouter-Klasse (Annahme: sie ist in Backend/)
 
 # Importiere WebSocketManager
@@ -40,6 +43,10 @@ from .services.WebSocketManager import WebSocketManager
 
 # Importiere ExplanationDeliveryService
 from .services.ExplanationDeliveryService import ExplanationDeliveryService
+from .services.QueueCompactionService import QueueCompactionService
+
+# Importiere HostedSTTService (STT im Backend, nur mit STT_HOSTED=1 aktiv)
+from .services.HostedSTTService import HostedSTTService
 
 # Importiere die Funktionen zum Setzen und Holen von Instanzen aus dependencies.py
 from .dependencies import (
@@ -49,16 +56,22 @@ from .dependencies import (
     get_explanation_delivery_service_instance,
     set_settings_manager_instance,
     get_settings_manager_instance,
+    set_hosted_stt_service_instance,
+    set_detection_pipeline_instance,
+    set_durable_queues_instance,
+    set_queue_compaction_service_instance,
+    get_queue_compaction_service_instance,
 )
 
 # --- ANWENDUNGSWEITE LOGGING-KONFIGURATION ---
-logging.basicConfig(
-    level=logging.DEBUG, # Für Entwicklung bei DEBUG lassen, für Produktion auf INFO setzen
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('backend.log')
-    ]
+# Log-Aufrufe stellen Records nur in eine Queue; Konsole und backend.log (JSON-Zeilen, mit
+# LOG_FORMAT=text wie bisher) schreibt ein Hintergrund-Thread, damit langsame Platten den
+# Event-Loop nicht blockieren. DEBUG-Meldungen aus Hot Paths werden pro Aufrufstelle gedrosselt.
+_LOG_TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(logging.Formatter(_LOG_TEXT_FORMAT))
+log_pipeline = QueueLogging([_console_handler, file_handler('backend.log', _LOG_TEXT_FORMAT)]).start(
+    level=logging.DEBUG # Für Entwicklung bei DEBUG lassen, für Produktion auf INFO setzen
 )
 logger = logging.getLogger(__name__)
 
@@ -92,6 +105,10 @@ queue_status_sender_task: Optional[asyncio.Task] = None
 websocket_manager_instance: Optional[WebSocketManager] = None
 message_router_instance: Optional[MessageRouter] = None
 explanation_delivery_service_instance: Optional[ExplanationDeliveryService] = None
+hosted_stt_service_instance: Optional[HostedSTTService] = None
+detection_pipeline_instance: Optional[DetectionPipeline] = None
+durable_queues_instance: Optional[DurableQueues] = None
+queue_compaction_service_instance: Optional[QueueCompactionService] = None
 
 main_model_instance: Optional[MainModel] = None
 main_model_task: Optional[asyncio.Task] = None
@@ -102,7 +119,17 @@ async def startup_event():
     logger.info("Application startup event triggered.")
     global websocket_manager_instance, message_router_instance
     global queue_status_sender_task, explanation_delivery_service_instance
-    global main_model_instance, main_model_task
+    global main_model_instance, main_model_task, hosted_stt_service_instance
+    global detection_pipeline_instance, durable_queues_instance, queue_compaction_service_instance
+
+    # Dauerhafte SQLite-Queues für Erkennungen und Erklärungen (None: JSON-Dateien)
+    durable_queues_instance = create_durable_queues()
+    set_durable_queues_instance(durable_queues_instance)
+
+    # In-Process-Pipeline zwischen SmallModel und MainModel (None: detections_queue.json).
+    # Muss vor dem MainModel-Task gesetzt sein, der sie beim Start abfragt.
+    detection_pipeline_instance = create_detection_pipeline()
+    set_detection_pipeline_instance(detection_pipeline_instance)
 
     # Initialize MainModel and start its continuous processing loop
     main_model_instance = MainModel()
@@ -115,6 +142,11 @@ async def startup_event():
         outgoing_queue=queues.websocket_out,
     )
     set_websocket_manager_instance(websocket_manager_instance)
+    # Backend-hosted STT: binary audio frames of a client go to its transcription session
+    hosted_stt_service_instance = HostedSTTService(incoming_queue=queues.incoming)
+    set_hosted_stt_service_instance(hosted_stt_service_instance)
+    websocket_manager_instance.binary_handler = hosted_stt_service_instance.feed
+    websocket_manager_instance.on_disconnect = hosted_stt_service_instance.close_session
     session_manager_instance = SessionManager()
     set_session_manager_instance(session_manager_instance)
     
@@ -137,10 +169,16 @@ async def startup_event():
     )
     set_explanation_delivery_service_instance(explanation_delivery_service_instance)
 
+    # Räumt zugestellte Erklärungen und verarbeitete Erkennungen aus den JSON-Queues (Archiv + Rotation)
+    queue_compaction_service_instance = QueueCompactionService()
+    set_queue_compaction_service_instance(queue_compaction_service_instance)
+
     # Step 4: Start all background tasks.
     await websocket_manager_instance.start()
     await message_router_instance.start()
     await explanation_delivery_service_instance.start()
+    await queue_compaction_service_instance.start()
+    await hosted_stt_service_instance.start()
     queue_status_sender_task = asyncio.create_task(send_queue_status_to_frontend())
 
     logger.info("Application startup complete. All services started.")
@@ -159,6 +197,11 @@ async def send_queue_status_to_frontend():
                 "from_frontend_q_size": queues.incoming.qsize(),
                 "to_frontend_q_size": queues.websocket_out.qsize()
             }
+            compaction_service = get_queue_compaction_service_instance()
+            if compaction_service:
+                status_payload["file_queues"] = compaction_service.stats()
+            if message_router_instance:
+                status_payload["detection"] = message_router_instance.detection_stats()
 
             # Iterate over a copy of the client IDs
             for client_id in list(websocket_manager.connections.keys()):
@@ -185,7 +228,8 @@ async def shutdown_event():
     # Zugriff auf die relevanten globalen Instanzen
     global websocket_manager_instance
     global queue_status_sender_task, message_router_instance, explanation_delivery_service_instance
-    global main_model_task
+    global main_model_task, hosted_stt_service_instance, detection_pipeline_instance, durable_queues_instance
+    global queue_compaction_service_instance
 
     # 1. Hintergrund-Tasks abbrechen (z.B. der Queue-Status-Sender und MainModel-Task)
     if main_model_task and not main_model_task.done():
@@ -218,6 +262,17 @@ async def shutdown_event():
         except Exception as e:
             logger.error(f"Error during ExplanationDeliveryService shutdown: {e}", exc_info=True)
 
+    if queue_compaction_service_instance:
+        logger.info(f"Stopping QueueCompactionService: {queue_compaction_service_instance.stats()}")
+        await queue_compaction_service_instance.stop()
+
+    if hosted_stt_service_instance:
+        logger.info("Stopping HostedSTTService...")
+        try:
+            await hosted_stt_service_instance.stop()
+        except Exception as e:
+            logger.error(f"Error during HostedSTTService shutdown: {e}", exc_info=True)
+
     # 3. WebSocketManager als LETZTES stoppen
     # Dies stellt sicher, dass alle vorherigen Dienste die Möglichkeit hatten,
     # letzte Nachrichten an die Clients zu senden.
@@ -229,6 +284,15 @@ async def shutdown_event():
         except Exception as e:
             logger.error(f"Error during WebSocketManager shutdown: {e}", exc_info=True)
 
+    # Queues zuletzt schließen: erst jetzt schreibt kein Producer oder Consumer mehr hinein
+    if detection_pipeline_instance:
+        logger.info(f"Closing DetectionPipeline: {detection_pipeline_instance.stats()}")
+        detection_pipeline_instance.close()
+
+    if durable_queues_instance:
+        logger.info(f"Closing durable work queues: {durable_queues_instance.stats()}")
+        durable_queues_instance.close()
+
     logger.info("Application shutdown complete.")
 
 
@@ -0,0 +1,114 @@
+# Backend/core/detection_cache.py
+
+import asyncio
+import copy
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Detection results per (normalized sentence, domain, user_role); 0 entries or TTL = no cache
+DETECTION_CACHE_SIZE = int(os.getenv("SMALLMODEL_CACHE_SIZE", "512"))
+DETECTION_CACHE_TTL_S = float(os.getenv("SMALLMODEL_CACHE_TTL", "600"))
+
+CacheKey = Tuple[str, str, str]
+
+
+def detection_cache_key(sentence: str, domain: Optional[str], user_role: Optional[str]) -> CacheKey:
+    """Case, inner whitespace and trailing punctuation do not change what the LLM detects."""
+    normalized = re.sub(r"\s+", " ", sentence or "").strip().lower().rstrip(".!?,;: ")
+    return normalized, (domain or "").strip().lower(), (user_role or "").strip().lower()
+
+
+class DetectionCache:
+    """
+    LRU cache of detected terms with a time-to-live, plus single-flight: a request for a key
+    that is already being detected waits for that detection instead of starting its own.
+    Results are copied in and out, since callers annotate the term dicts they get.
+    """
+
+    def __init__(self, max_entries: int = DETECTION_CACHE_SIZE, ttl_s: float = DETECTION_CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[CacheKey, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_s > 0
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, terms = entry
+        if time.monotonic() - stored_at > self.ttl_s:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(terms)
+
+    def put(self, key: CacheKey, terms: List[Dict[str, Any]]):
+        if not self.enabled:
+            return
+        self._entries[key] = (time.monotonic(), copy.deepcopy(terms))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_detect(self, key: CacheKey,
+                            detect: Callable[[], Awaitable[Tuple[List[Dict[str, Any]], bool]]]) -> List[Dict[str, Any]]:
+        """
+        The cached terms for `key`, else those of a detection already running for it, else the
+        result of `detect()`, which returns the terms and whether they may be cached (not a
+        fallback after an LLM failure).
+        """
+        if not self.enabled:
+            return (await detect())[0]
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.joined += 1
+            return copy.deepcopy(await asyncio.shield(in_flight))
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            terms, cacheable = await detect()
+            if cacheable:
+                self.put(key, terms)
+            future.set_result(copy.deepcopy(terms))
+            return terms
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved: no warning if nobody joined
+            raise
+        finally:
+            del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.joined
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "joined": self.joined,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.joined) / lookups, 3) if lookups else None,
+        }
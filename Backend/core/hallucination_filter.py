@@ -0,0 +1,168 @@
+# Backend/core/hallucination_filter.py
+
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Phrases Whisper tends to produce during silence, by strictness
+# Very strict patterns - block even with extra content
+STRICT_PATTERNS = (
+    "thanks for watching", "thank you for watching",
+    "please like and subscribe", "don't forget to subscribe",
+    "hit that subscribe button", "smash that like button",
+)
+# Moderate patterns - block if they dominate the sentence
+MODERATE_PATTERNS = (
+    "see you next time", "that's all for today", "until next time",
+    "catch you later", "thanks for your attention", "thank you for your time",
+    "appreciate you watching", "goodbye", "bye bye",
+)
+# Simple patterns - only block if they're (nearly) the entire sentence
+SIMPLE_PATTERNS = ("thanks", "thank you")
+ALL_PATTERNS = STRICT_PATTERNS + MODERATE_PATTERNS + SIMPLE_PATTERNS
+
+# Words that don't count as meaningful content next to a pattern
+_FILLERS = frozenset(["for", "and", "the", "a", "to", "my", "your", "our"])
+_FILLERS_MULTIPLE = _FILLERS | {"everyone", "today", ","}
+_FILLERS_MODERATE = _FILLERS | {"everyone", "today"}
+_FILLERS_STRICT_IN_CONTEXT = _FILLERS | {"everyone"}
+
+# Context that makes a pattern legitimate speech (context-aware filter only)
+_TECHNICAL_INDICATORS = (
+    "algorithm", "neural", "network", "machine learning", "api", "database", "server", "technical",
+    "system", "data", "code", "software", "engineering", "programming", "metrics", "updates", "notifications",
+)
+_PATTERN_TECHNICAL_INDICATORS = _TECHNICAL_INDICATORS + ("patterns",)
+_SIMPLE_TECHNICAL_INDICATORS = _TECHNICAL_INDICATORS + ("advances", "implementation", "process")
+_PROFESSIONAL_INDICATORS = (
+    "newsletter", "notifications", "updates", "service", "company", "team", "colleagues",
+    "business", "professional", "implementation", "explain",
+)
+
+
+def _substring_regex(phrases) -> "re.Pattern":
+    """Compiles phrases into one regex, factored by common prefixes ("tha(?:nks|t's ...)")."""
+    trie: Dict[str, dict] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile(build(trie))
+
+
+@dataclass(frozen=True)
+class FilterVerdict:
+    """Outcome of checking one sentence. `rule` and `pattern` say why it was blocked."""
+    blocked: bool
+    rule: Optional[str] = None  # "multiple", "strict", "moderate" or "simple"
+    pattern: Optional[str] = None
+    matched: Tuple[str, ...] = ()  # All hallucination phrases found, in pattern order
+
+    @property
+    def reason(self) -> str:
+        if not self.blocked:
+            return "allowed"
+        if self.rule == "multiple":
+            return f"multiple hallucination patterns: {list(self.matched)}"
+        return f"{self.rule} hallucination pattern: {self.pattern}"
+
+
+ALLOWED = FilterVerdict(blocked=False)
+
+
+class HallucinationFilter:
+    """
+    Detects Whisper hallucinations ("Thanks for watching!" and the like) in transcribed sentences.
+
+    All phrases are compiled once into a single prefix-factored regex, so a sentence without
+    any phrase (the common case) costs one scan. Only sentences with a hit are inspected
+    further, and the rules reuse module-level word sets and compiled indicator regexes.
+
+    With `context_aware` (the SmallModel layer) a phrase next to technical or professional
+    vocabulary is kept, e.g. "Thanks to machine learning advances".
+    """
+
+    def __init__(self, context_aware: bool = False):
+        self.context_aware = context_aware
+        self._any_phrase = _substring_regex(ALL_PATTERNS)
+        self._strict_technical = _substring_regex(_PATTERN_TECHNICAL_INDICATORS)
+        self._simple_technical = _substring_regex(_SIMPLE_TECHNICAL_INDICATORS)
+        self._professional = _substring_regex(_PROFESSIONAL_INDICATORS)
+
+    def find_patterns(self, text_lower: str) -> List[str]:
+        """All hallucination phrases occurring in `text_lower`, in ALL_PATTERNS order."""
+        if not self._any_phrase.search(text_lower):
+            return []
+        # Phrases overlap ("thanks" in "thanks for watching"), so collect all of them
+        return [p for p in ALL_PATTERNS if p in text_lower]
+
+    def check(self, sentence: str) -> FilterVerdict:
+        """Checks one sentence."""
+        text = sentence.lower().strip()
+        found = self.find_patterns(text)
+        if not found:
+            return ALLOWED
+
+        # Several phrases together: block unless enough other content remains
+        if len(found) >= 2:
+            clean_text = text
+            for pattern in found:
+                clean_text = clean_text.replace(pattern, "")
+            if _count_meaningful(clean_text, _FILLERS_MULTIPLE) < 3:
+                return FilterVerdict(True, "multiple", found[0], tuple(found))
+
+        for pattern in found:
+            if pattern not in STRICT_PATTERNS:
+                continue
+            clean_text = text.replace(pattern, "").strip()
+            fillers = _FILLERS_STRICT_IN_CONTEXT if self.context_aware else _FILLERS
+            if _count_meaningful(clean_text, fillers) < 3 and not self._has_context(clean_text, self._strict_technical):
+                return FilterVerdict(True, "strict", pattern, tuple(found))
+
+        for pattern in found:
+            if pattern not in MODERATE_PATTERNS:
+                continue
+            clean_text = text.replace(pattern, "").strip()
+            if _count_meaningful(clean_text, _FILLERS_MODERATE) < 2 and not self._has_context(clean_text, self._strict_technical):
+                return FilterVerdict(True, "moderate", pattern, tuple(found))
+
+        for pattern in found:
+            if pattern not in SIMPLE_PATTERNS:
+                continue
+            if text == pattern:
+                return FilterVerdict(True, "simple", pattern, tuple(found))
+            if not self.context_aware:
+                continue
+            clean_text = text.replace(pattern, "").strip()
+            has_context = self._has_context(clean_text, self._simple_technical)
+            if pattern == "thanks":
+                # "Thanks to machine learning ..." is legitimate
+                if "to" in clean_text and has_context:
+                    continue
+                if len(clean_text) < 5:
+                    return FilterVerdict(True, "simple", pattern, tuple(found))
+            elif not has_context and len(clean_text) < 3:
+                return FilterVerdict(True, "simple", pattern, tuple(found))
+
+        return FilterVerdict(False, matched=tuple(found))
+
+    def _has_context(self, clean_text: str, technical: "re.Pattern") -> bool:
+        return self.context_aware and bool(technical.search(clean_text) or self._professional.search(clean_text))
+
+
+def _count_meaningful(text: str, fillers: FrozenSet[str]) -> int:
+    return sum(1 for word in text.split() if word not in fillers)
+
+
+# Shared instances: the STT module blocks before sending, SmallModel re-checks with context
+stt_filter = HallucinationFilter(context_aware=False)
+context_aware_filter = HallucinationFilter(context_aware=True)
@@ -0,0 +1,54 @@
+# Backend/core/json_stream.py
+
+import json
+import logging
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class JsonObjectStream:
+    """
+    Incremental parser for text arriving in chunks (e.g. LLM tokens): feed() returns every JSON
+    object completed by the chunk as soon as its closing brace arrives, nested ones before the
+    object containing them. So each {"term": ...} of a streamed array, or of the "terms" array of
+    a wrapping object, is available before the response ends. Text outside objects (brackets,
+    commas, prose) is skipped.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._starts: List[int] = []  # Buffer offsets of the open objects' braces
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        objects = []
+        for char in chunk:
+            if not self._starts:
+                if char == "{":
+                    self._buffer = [char]
+                    self._starts = [0]
+                continue
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._starts.append(len(self._buffer) - 1)
+            elif char == "}":
+                text = "".join(self._buffer[self._starts.pop():])
+                try:
+                    parsed = json.loads(text)
+                except json.JSONDecodeError:
+                    logger.debug(f"JsonObjectStream: Skipping malformed object: {text[:100]}")
+                    continue
+                if isinstance(parsed, dict):
+                    objects.append(parsed)
+        return objects
@@ -0,0 +1,159 @@
+# Backend/core/log_pipeline.py
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Sequence
+
+# "json" (default) or "text" for log files; the console always gets text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+
+# Attributes every LogRecord has; anything else was passed via `extra=` and goes into the JSON
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including fields passed via `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `burst` records per call site (file and line) through every `interval_s`
+    seconds, for records at or below `max_level`. The first record after a suppressed stretch
+    says how many were dropped (and carries it as `suppressed` for the JSON output).
+    """
+
+    def __init__(self, burst: int = 20, interval_s: float = 10.0, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.burst = burst
+        self.interval_s = interval_s
+        self.max_level = max_level
+        self._sites: Dict[tuple, List[float]] = {}  # site -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            window = self._sites.setdefault((record.pathname, record.lineno), [now, 0, 0])
+            if now - window[0] >= self.interval_s:
+                suppressed = window[2]
+                window[:] = [now, 0, 0]
+            else:
+                suppressed = 0
+            if window[1] >= self.burst:
+                window[2] += 1
+                self.suppressed += 1
+                return False
+            window[1] += 1
+        if suppressed:
+            record.msg = f"{record.getMessage()} [{suppressed} similar messages suppressed]"
+            record.args = None
+            record.suppressed = suppressed
+        return True
+
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """Enqueues without waiting; records are dropped (and counted) while the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback here (the objects may change or be gone by the time the
+        # writer gets to it), but leave the layout to the handlers' formatters
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Waits for room: on shutdown the queue may still be full
+        self.queue.put(self._sentinel)
+
+
+class QueueLogging:
+    """
+    Routes a logger's records through a bounded in-memory queue to `handlers`, which run on a
+    background thread. Logging calls from the asyncio loop only format the message and enqueue
+    it, so slow disks never stall the loop. Hot-path debug records are rate limited per call
+    site before they are queued.
+    """
+
+    def __init__(self, handlers: Sequence[logging.Handler], max_queue: int = 10000,
+                 rate_limit: Optional[RateLimitFilter] = None):
+        self.queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.handler = _NonBlockingQueueHandler(self.queue)
+        self.rate_limit = rate_limit if rate_limit is not None else RateLimitFilter()
+        self.handler.addFilter(self.rate_limit)
+        self.listener = _Listener(self.queue, *handlers, respect_handler_level=True)
+        self._logger: Optional[logging.Logger] = None
+
+    def start(self, logger: Optional[logging.Logger] = None, level: int = logging.INFO) -> "QueueLogging":
+        """Attaches the queue to `logger` (default: root) and starts the writer thread."""
+        self._logger = logger or logging.getLogger()
+        self._logger.addHandler(self.handler)
+        self._logger.setLevel(level)
+        self.listener.start()
+        # Records still queued at interpreter exit are written out
+        atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """Writes out queued records, then closes the handlers. Safe to call twice."""
+        if self._logger is None:
+            return
+        self._logger.removeHandler(self.handler)
+        self._logger = None
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self.queue.qsize(), "dropped": self.handler.dropped, "suppressed": self.rate_limit.suppressed}
+
+
+def file_handler(path, text_format: str, mode: str = "a") -> logging.FileHandler:
+    """A FileHandler writing JSON lines, or `text_format` lines with LOG_FORMAT=text."""
+    handler = logging.FileHandler(path, mode=mode, encoding="utf-8")
+    handler.setFormatter(JsonFormatter() if LOG_FORMAT == "json" else logging.Formatter(text_format))
+    return handler
@@ -0,0 +1,58 @@
+# Backend/core/ollama_timings.py
+
+import logging
+import os
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+# How long Ollama keeps a model (and the KV cache of its last prompt) loaded after a request
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# Send one request per model at startup, so the first transcript does not pay for loading it
+OLLAMA_WARMUP = os.getenv("OLLAMA_WARMUP", "1").lower() in ("1", "true", "yes")
+SUMMARY_EVERY_CALLS = 50
+
+
+class OllamaTimings:
+    """
+    Per-call timings from the metrics Ollama returns with every response: model load, prompt
+    evaluation and generation. Tokens of a prompt prefix still in the KV cache are not evaluated
+    again, so prompt_eval_count drops when the fixed prefix is reused.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.totals = {"load_ms": 0.0, "prompt_eval_ms": 0.0, "eval_ms": 0.0, "prompt_tokens": 0, "eval_tokens": 0}
+        self.last: Dict[str, Any] = {}
+
+    def record(self, response: Dict[str, Any], label: str = "call") -> Dict[str, Any]:
+        """Records the metrics of one response (the final chunk when streaming)."""
+        timing = {
+            "load_ms": response.get("load_duration", 0) / 1e6,
+            "prompt_eval_ms": response.get("prompt_eval_duration", 0) / 1e6,
+            "eval_ms": response.get("eval_duration", 0) / 1e6,
+            "prompt_tokens": response.get("prompt_eval_count", 0),
+            "eval_tokens": response.get("eval_count", 0),
+        }
+        self.calls += 1
+        for key, value in timing.items():
+            self.totals[key] += value
+        self.last = timing
+        logger.debug(f"{self.name} Ollama {label}: prompt eval {timing['prompt_eval_ms']:.0f}ms "
+                     f"({timing['prompt_tokens']} tokens), generation {timing['eval_ms']:.0f}ms "
+                     f"({timing['eval_tokens']} tokens), load {timing['load_ms']:.0f}ms")
+        if self.calls % SUMMARY_EVERY_CALLS == 0:
+            logger.info(f"{self.name} Ollama timings: {self.stats()}")
+        return timing
+
+    def stats(self) -> Dict[str, Any]:
+        calls = max(self.calls, 1)
+        prompt_ms, eval_ms = self.totals["prompt_eval_ms"], self.totals["eval_ms"]
+        return {
+            "calls": self.calls,
+            "avg_prompt_eval_ms": round(prompt_ms / calls, 1),
+            "avg_eval_ms": round(eval_ms / calls, 1),
+            "avg_prompt_tokens": round(self.totals["prompt_tokens"] / calls, 1),
+            "prompt_eval_share": round(prompt_ms / (prompt_ms + eval_ms), 3) if prompt_ms + eval_ms else None,
+        }
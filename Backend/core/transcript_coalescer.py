@@ -0,0 +1,107 @@
+# Backend/core/transcript_coalescer.py
+
+import asyncio
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models.UniversalMessage import UniversalMessage
+
+logger = logging.getLogger(__name__)
+
+# Final transcripts of one client and session are merged into one detection request. A
+# transcript waits at most COALESCE_MAX_DELAY_S (0 = no coalescing) for others to join it; a
+# group is sent at once when it reaches COALESCE_TARGET_WORDS, enough context for the LLM.
+# The short default only catches back-to-back finals; every final waits up to this long before
+# detection starts, so longer windows trade latency for fewer requests.
+COALESCE_MAX_DELAY_S = float(os.getenv("TRANSCRIPT_COALESCE_MAX_DELAY", "0.3"))
+COALESCE_TARGET_WORDS = int(os.getenv("TRANSCRIPT_COALESCE_TARGET_WORDS", "12"))
+
+
+class _Group:
+    def __init__(self, timer: asyncio.TimerHandle):
+        self.messages: List[UniversalMessage] = []
+        self.words = 0
+        self.timer = timer
+
+
+def merge_transcripts(messages: List[UniversalMessage]) -> UniversalMessage:
+    """
+    One stt.transcription with the joined text of `messages` (in order). Its `sources` list keeps
+    each transcript's message id, text and utterance_id, so detected terms can be traced back
+    to the sentence they were said in.
+    """
+    last = messages[-1]
+    payload = {key: value for key, value in last.payload.items()
+               if key not in ("utterance_id", "latency")}
+    payload["text"] = " ".join(m.payload.get("text", "").strip() for m in messages)
+    payload["sources"] = [
+        {
+            "message_id": m.id,
+            "text": m.payload.get("text", "").strip(),
+            "utterance_id": m.payload.get("utterance_id"),
+            "timestamp": m.timestamp,
+        }
+        for m in messages
+    ]
+    return UniversalMessage(type="stt.transcription", payload=payload, client_id=last.client_id, origin=last.origin)
+
+
+class TranscriptCoalescer:
+    """
+    Collects consecutive final transcripts per (client_id, user_session_id) and hands them to
+    `on_flush` as one message, so a burst of short sentences costs one detection request instead
+    of one each. A single transcript is passed on unchanged.
+    """
+
+    def __init__(self, on_flush: Callable[[UniversalMessage], None], max_delay_s: float = COALESCE_MAX_DELAY_S,
+                 target_words: int = COALESCE_TARGET_WORDS):
+        self.on_flush = on_flush
+        self.max_delay_s = max_delay_s
+        self.target_words = target_words
+        self._groups: Dict[Tuple[Optional[str], Optional[str]], _Group] = {}
+        self.received = 0
+        self.requests = 0
+
+    def add(self, message: UniversalMessage):
+        self.received += 1
+        if self.max_delay_s <= 0:
+            self._emit([message])
+            return
+        key = (message.client_id, message.payload.get("user_session_id"))
+        group = self._groups.get(key)
+        if group is None:
+            timer = asyncio.get_running_loop().call_later(self.max_delay_s, self.flush, key)
+            group = self._groups[key] = _Group(timer)
+        group.messages.append(message)
+        group.words += len(message.payload.get("text", "").split())
+        if group.words >= self.target_words:
+            self.flush(key)
+
+    def flush(self, key: Tuple[Optional[str], Optional[str]]):
+        group = self._groups.pop(key, None)
+        if group is not None:
+            group.timer.cancel()
+            self._emit(group.messages)
+
+    def flush_all(self):
+        for key in list(self._groups):
+            self.flush(key)
+
+    def _emit(self, messages: List[UniversalMessage]):
+        self.requests += 1
+        if len(messages) > 1:
+            logger.debug(f"TranscriptCoalescer: Merged {len(messages)} transcripts from client {messages[-1].client_id}")
+        try:
+            self.on_flush(messages[0] if len(messages) == 1 else merge_transcripts(messages))
+        except Exception as e:
+            logger.error(f"TranscriptCoalescer: Error handing over transcripts: {e}", exc_info=True)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "received": self.received,
+            "requests": self.requests,
+            "pending": sum(len(group.messages) for group in self._groups.values()),
+            "max_delay_s": self.max_delay_s,
+            "target_words": self.target_words,
+        }
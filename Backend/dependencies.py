@@ -48,3 +48,55 @@ def get_explanation_delivery_service_instance() -> Optional['ExplanationDelivery
     return _global_explanation_delivery_service_instance
 
 
+
+# Global instance for HostedSTTService
+if TYPE_CHECKING:
+    from .services.HostedSTTService import HostedSTTService
+
+_global_hosted_stt_service_instance: Optional['HostedSTTService'] = None
+
+def set_hosted_stt_service_instance(instance: 'HostedSTTService'):
+    global _global_hosted_stt_service_instance
+    _global_hosted_stt_service_instance = instance
+
+def get_hosted_stt_service_instance() -> Optional['HostedSTTService']:
+    return _global_hosted_stt_service_instance
+
+# Global instance for the in-process DetectionPipeline (None: detections_queue.json is used)
+if TYPE_CHECKING:
+    from .queues.DetectionPipeline import DetectionPipeline
+
+_global_detection_pipeline_instance: Optional['DetectionPipeline'] = None
+
+def set_detection_pipeline_instance(instance: Optional['DetectionPipeline']):
+    global _global_detection_pipeline_instance
+    _global_detection_pipeline_instance = instance
+
+def get_detection_pipeline_instance() -> Optional['DetectionPipeline']:
+    return _global_detection_pipeline_instance
+
+# Global instance for the durable SQLite work queues (None: the JSON file queues are used)
+if TYPE_CHECKING:
+    from .queues.SqliteWorkQueue import DurableQueues
+
+_global_durable_queues_instance: Optional['DurableQueues'] = None
+
+def set_durable_queues_instance(instance: Optional['DurableQueues']):
+    global _global_durable_queues_instance
+    _global_durable_queues_instance = instance
+
+def get_durable_queues_instance() -> Optional['DurableQueues']:
+    return _global_durable_queues_instance
+
+# Global instance for the QueueCompactionService
+if TYPE_CHECKING:
+    from .services.QueueCompactionService import QueueCompactionService
+
+_global_queue_compaction_service_instance: Optional['QueueCompactionService'] = None
+
+def set_queue_compaction_service_instance(instance: 'QueueCompactionService'):
+    global _global_queue_compaction_service_instance
+    _global_queue_compaction_service_instance = instance
+
+def get_queue_compaction_service_instance() -> Optional['QueueCompactionService']:
+    return _global_queue_compaction_service_instance
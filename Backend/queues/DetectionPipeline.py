@@ -0,0 +1,181 @@
+# Backend/queues/DetectionPipeline.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Hand-off of detections from SmallModel to MainModel: "file" (detections_queue.json, polled)
+# or "memory" (this in-process pipeline)
+DETECTION_PIPELINE = os.getenv("DETECTION_PIPELINE", "file").lower()
+DETECTION_PIPELINE_CAPACITY = int(os.getenv("DETECTION_PIPELINE_CAPACITY", "256"))
+DETECTION_PIPELINE_PUT_TIMEOUT_S = float(os.getenv("DETECTION_PIPELINE_PUT_TIMEOUT", "5"))
+# Append-only journal for crash recovery; empty = memory only (like the file queue, which is
+# flushed at startup)
+DETECTION_PIPELINE_JOURNAL = os.getenv("DETECTION_PIPELINE_JOURNAL", "")
+
+
+class DetectionPipeline:
+    """
+    Bounded in-process queue of detection entries between SmallModel (producer) and MainModel
+    (consumer), replacing the read-modify-write of detections_queue.json and its 1s polling.
+
+    put() waits while `capacity` entries are queued (backpressure) and gives up after
+    `put_timeout_s`. The consumer takes entries with get_batch() and acknowledges them with
+    task_done(), or hands them back with requeue() if processing failed. With a journal, every
+    entry is appended to a JSON-lines file ({"put": entry}, {"done": id}) and entries not
+    acknowledged by a previous process are queued again by open_journal(). The journal is
+    truncated whenever the pipeline is idle.
+    """
+
+    def __init__(self, capacity: int = DETECTION_PIPELINE_CAPACITY, put_timeout_s: float = DETECTION_PIPELINE_PUT_TIMEOUT_S):
+        self.capacity = max(1, int(capacity))
+        self.put_timeout_s = put_timeout_s
+        self._items: deque = deque()
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self._changed = asyncio.Condition()
+        self._journal_path: Optional[Path] = None
+        self._journal = None
+        self.put_count = 0
+        self.done_count = 0
+        self.rejected = 0
+        self.requeued = 0
+        self.max_depth = 0
+
+    def open_journal(self, path) -> int:
+        """Attaches the journal at `path` and queues the entries it holds unacknowledged. Returns their number."""
+        self._journal_path = Path(path)
+        self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        recovered = self._read_journal()
+        self._rewrite_journal(recovered)
+        self._items.extend(recovered)
+        if recovered:
+            logger.info(f"DetectionPipeline: Recovered {len(recovered)} unprocessed detections from {self._journal_path}")
+        return len(recovered)
+
+    async def put(self, entries: List[Dict[str, Any]]) -> bool:
+        """Queues `entries` together. False if there was no room within put_timeout_s."""
+        if not entries:
+            return True
+        async with self._changed:
+            try:
+                # A batch larger than the capacity still fits into an empty pipeline
+                await asyncio.wait_for(
+                    self._changed.wait_for(lambda: len(self._items) + len(entries) <= self.capacity or not self._items),
+                    timeout=self.put_timeout_s,
+                )
+            except asyncio.TimeoutError:
+                self.rejected += len(entries)
+                logger.warning(f"DetectionPipeline: Full ({len(self._items)}/{self.capacity}) for {self.put_timeout_s}s; "
+                               f"rejected {len(entries)} detections.")
+                return False
+            for entry in entries:
+                self._write({"put": entry})
+            self._items.extend(entries)
+            self.put_count += len(entries)
+            self.max_depth = max(self.max_depth, len(self._items))
+            self._changed.notify_all()
+        return True
+
+    async def get_batch(self, max_items: int = 16) -> List[Dict[str, Any]]:
+        """Waits for queued entries and takes up to `max_items` of them, oldest first."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: bool(self._items))
+            batch = [self._items.popleft() for _ in range(min(max_items, len(self._items)))]
+            for entry in batch:
+                self._in_flight[entry["id"]] = entry
+            self._changed.notify_all()  # Room for waiting producers
+        return batch
+
+    async def requeue(self, entries: List[Dict[str, Any]]):
+        """Puts entries taken with get_batch() back at the head, unacknowledged (processing failed)."""
+        async with self._changed:
+            entries = [entry for entry in entries if self._in_flight.pop(entry["id"], None) is not None]
+            self._items.extendleft(reversed(entries))
+            self.requeued += len(entries)
+            self._changed.notify_all()
+
+    def task_done(self, entries: List[Dict[str, Any]]):
+        """Acknowledges entries taken with get_batch() as processed."""
+        for entry in entries:
+            if self._in_flight.pop(entry["id"], None) is not None:
+                self.done_count += 1
+                self._write({"done": entry["id"]})
+        if not self._items and not self._in_flight:
+            self._rewrite_journal([])
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def stats(self) -> Dict[str, Any]:
+        oldest = self._items[0].get("timestamp") if self._items else None
+        return {
+            "depth": len(self._items),
+            "in_flight": len(self._in_flight),
+            "capacity": self.capacity,
+            "max_depth": self.max_depth,
+            "put": self.put_count,
+            "done": self.done_count,
+            "rejected": self.rejected,
+            "requeued": self.requeued,
+            "oldest_age_s": round(time.time() - oldest, 1) if isinstance(oldest, (int, float)) else None,
+            "durable": self._journal is not None,
+        }
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        if self._journal_path is None or not self._journal_path.is_file():
+            return []
+        pending: Dict[str, Dict[str, Any]] = {}
+        with self._journal_path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line after a crash mid-write
+                    logger.warning(f"Skipping unreadable detection journal line in {self._journal_path}")
+                    continue
+                if "put" in record:
+                    pending[record["put"]["id"]] = record["put"]
+                elif "done" in record:
+                    pending.pop(record["done"], None)
+        return list(pending.values())
+
+    def _rewrite_journal(self, entries: List[Dict[str, Any]]):
+        if self._journal_path is None:
+            return
+        self.close()
+        tmp_path = self._journal_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps({"put": entry}, ensure_ascii=False) + "\n")
+        tmp_path.replace(self._journal_path)
+        self._journal = self._journal_path.open("a", encoding="utf-8")
+
+    def _write(self, record: Dict[str, Any]):
+        if self._journal is not None:
+            # Flushed per record: survives a crash of this process (not of the machine)
+            self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._journal.flush()
+
+
+def create_detection_pipeline() -> Optional[DetectionPipeline]:
+    """The pipeline configured by DETECTION_PIPELINE, or None for the file queue."""
+    if DETECTION_PIPELINE != "memory":
+        return None
+    pipeline = DetectionPipeline()
+    if DETECTION_PIPELINE_JOURNAL:
+        pipeline.open_journal(DETECTION_PIPELINE_JOURNAL)
+    logger.info(f"Using the in-process detection pipeline (capacity {pipeline.capacity}, "
+                f"journal: {DETECTION_PIPELINE_JOURNAL or 'off'}).")
+    return pipeline
@@ -0,0 +1,22 @@
+# Backend/queues/FileQueueLocks.py
+
+import asyncio
+import os
+import weakref
+from typing import Dict
+
+# Per event loop: asyncio locks must not be shared between loops (e.g. one per test)
+_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Lock]]" = weakref.WeakKeyDictionary()
+
+
+def queue_file_lock(path) -> asyncio.Lock:
+    """
+    The lock shared by everything that reads, modifies and writes back the queue file at `path`
+    (SmallModel, MainModel, ExplanationDeliveryService, QueueCompactionService). Outside a running
+    event loop a private lock is returned.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.Lock()
+    return _locks.setdefault(loop, {}).setdefault(os.path.abspath(path), asyncio.Lock())
@@ -0,0 +1,216 @@
+# Backend/queues/SqliteWorkQueue.py
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Backend of the detection and explanation queues: "file" (detections_queue.json and
+# explanations_queue.json, flushed at startup) or "sqlite" (durable, survives restarts)
+WORK_QUEUE_BACKEND = os.getenv("WORK_QUEUE_BACKEND", "file").lower()
+WORK_QUEUE_DB = os.getenv("WORK_QUEUE_DB", "Backend/AI/work_queue.db")
+# Claimed entries whose consumer did not finish within this are handed out again
+WORK_QUEUE_VISIBILITY_TIMEOUT_S = float(os.getenv("WORK_QUEUE_VISIBILITY_TIMEOUT", "300"))
+# Entries in a terminal state are deleted this long after their last update
+WORK_QUEUE_RETENTION_S = float(os.getenv("WORK_QUEUE_RETENTION", "86400"))
+COMPACT_INTERVAL_S = 600.0
+
+# Status machine: detections pending -> processing -> processed; explanations
+# ready_for_delivery -> delivering -> delivered
+TERMINAL_STATUSES = ("processed", "delivered")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS work_items (
+    queue TEXT NOT NULL,
+    id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    data TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    claimed_until REAL,
+    PRIMARY KEY (queue, id)
+);
+CREATE INDEX IF NOT EXISTS idx_work_items_status ON work_items (queue, status, created_at);
+"""
+
+
+class SqliteWorkQueue:
+    """
+    One named work queue in a SQLite database in WAL mode, which several processes can share.
+
+    Entries are the same dicts the file queues hold; the status lives in its own indexed
+    column. claim() atomically moves the oldest entries of one status to a working status
+    with a deadline; entries still in the working status after their deadline (the consumer
+    died) are claimed again. Calls run in a worker thread and do not block the event loop.
+    """
+
+    def __init__(self, path, name: str, visibility_timeout_s: float = WORK_QUEUE_VISIBILITY_TIMEOUT_S):
+        self.path = Path(path)
+        self.name = name
+        self.visibility_timeout_s = visibility_timeout_s
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection per queue, serialized by a lock; WAL lets readers and one writer overlap
+        self._conn = sqlite3.connect(str(self.path), timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.reclaimed = 0
+        self.purged = 0
+
+    async def add(self, entries: List[Dict[str, Any]]):
+        await asyncio.to_thread(self._add, entries)
+
+    async def claim(self, from_status: str, to_status: str, limit: int = 16,
+                    visibility_timeout_s: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Moves up to `limit` of the oldest entries in `from_status` (or expired in `to_status`) to `to_status`."""
+        timeout = self.visibility_timeout_s if visibility_timeout_s is None else visibility_timeout_s
+        return await asyncio.to_thread(self._claim, from_status, to_status, limit, timeout)
+
+    async def set_status(self, ids: Iterable[str], status: str, **fields):
+        """Sets the status of entries (releasing their claim) and stores `fields` in them."""
+        await asyncio.to_thread(self._set_status, list(ids), status, fields)
+
+    async def purge(self, statuses: Iterable[str] = TERMINAL_STATUSES, older_than_s: float = WORK_QUEUE_RETENTION_S) -> int:
+        """Deletes entries in `statuses` not updated for `older_than_s`. Returns their number."""
+        return await asyncio.to_thread(self._purge, list(statuses), older_than_s)
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM work_items WHERE queue = ? GROUP BY status", (self.name,)
+            ).fetchall()
+        return dict(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"counts": self.counts(), "reclaimed": self.reclaimed, "purged": self.purged}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _add(self, entries: List[Dict[str, Any]]):
+        now = time.time()
+        rows = [(entry["id"], self.name, entry.get("status", "pending"), json.dumps(entry, ensure_ascii=False), now, now)
+                for entry in entries]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO work_items (id, queue, status, data, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _claim(self, from_status: str, to_status: str, limit: int, timeout: float) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front: no other process can claim the same rows
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, status, data FROM work_items WHERE queue = ? AND "
+                    "(status = ? OR (status = ? AND claimed_until < ?)) ORDER BY created_at LIMIT ?",
+                    (self.name, from_status, to_status, now, limit),
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE work_items SET status = ?, claimed_until = ?, updated_at = ? WHERE queue = ? AND id = ?",
+                    [(to_status, now + timeout, now, self.name, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        expired = sum(1 for row in rows if row[1] == to_status)
+        if expired:
+            self.reclaimed += expired
+            logger.warning(f"SqliteWorkQueue '{self.name}': Reclaimed {expired} entries whose claim expired.")
+        claimed = []
+        for _, _, data in rows:
+            entry = json.loads(data)
+            entry["status"] = to_status
+            claimed.append(entry)
+        return claimed
+
+    def _set_status(self, ids: List[str], status: str, fields: Dict[str, Any]):
+        if not ids:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for entry_id in ids:
+                    row = self._conn.execute(
+                        "SELECT data FROM work_items WHERE queue = ? AND id = ?", (self.name, entry_id)
+                    ).fetchone()
+                    if row is None:
+                        continue
+                    entry = json.loads(row[0])
+                    entry.update(fields, status=status)
+                    self._conn.execute(
+                        "UPDATE work_items SET status = ?, data = ?, claimed_until = NULL, updated_at = ? WHERE queue = ? AND id = ?",
+                        (status, json.dumps(entry, ensure_ascii=False), now, self.name, entry_id),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _purge(self, statuses: List[str], older_than_s: float) -> int:
+        placeholders = ",".join("?" * len(statuses))
+        with self._lock:
+            deleted = self._conn.execute(
+                f"DELETE FROM work_items WHERE queue = ? AND status IN ({placeholders}) AND updated_at < ?",
+                (self.name, *statuses, time.time() - older_than_s),
+            ).rowcount
+            if deleted:
+                # Give the space back: fold the WAL into the database and truncate it
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.purged += deleted
+        return deleted
+
+
+class DurableQueues:
+    """The detection and explanation queues in one SQLite database, with periodic retention."""
+
+    def __init__(self, path=WORK_QUEUE_DB, retention_s: float = WORK_QUEUE_RETENTION_S):
+        self.detections = SqliteWorkQueue(path, "detections")
+        # Delivery is quick; an unfinished one is retried after 30s instead of 5 minutes
+        self.explanations = SqliteWorkQueue(path, "explanations", visibility_timeout_s=30.0)
+        self.retention_s = retention_s
+        self._last_compact = 0.0
+
+    async def maybe_compact(self):
+        """Deletes expired terminal entries, at most every COMPACT_INTERVAL_S."""
+        if time.monotonic() - self._last_compact < COMPACT_INTERVAL_S:
+            return
+        self._last_compact = time.monotonic()
+        await self.compact()
+
+    async def compact(self) -> int:
+        deleted = 0
+        for queue in (self.detections, self.explanations):
+            deleted += await queue.purge(older_than_s=self.retention_s)
+        if deleted:
+            logger.info(f"DurableQueues: Deleted {deleted} processed/delivered entries older than {self.retention_s}s.")
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        return {"detections": self.detections.stats(), "explanations": self.explanations.stats()}
+
+    def close(self):
+        self.detections.close()
+        self.explanations.close()
+
+
+def create_durable_queues() -> Optional[DurableQueues]:
+    """The SQLite queues if WORK_QUEUE_BACKEND=sqlite, else None for the JSON file queues."""
+    if WORK_QUEUE_BACKEND != "sqlite":
+        return None
+    queues = DurableQueues()
+    logger.info(f"Using durable SQLite work queues at {WORK_QUEUE_DB}: {queues.stats()}")
+    return queues
@@ -8,7 +8,9 @@ from typing import Dict, List, Optional, Set
 
 import aiofiles
 
+from ..dependencies import get_durable_queues_instance
 from ..models.UniversalMessage import UniversalMessage
+from ..queues.FileQueueLocks import queue_file_lock
 from ..queues.QueueTypes import AbstractMessageQueue
 
 logger = logging.getLogger(__name__)
@@ -26,7 +28,8 @@ class ExplanationDeliveryService:
         self.explanations_file = Path("Backend/AI/explanations_queue.json")
         
         # A lock is essential to prevent race conditions when updating the shared queue file.
-        self.queue_lock = asyncio.Lock()
+        # It is the one MainModel holds while appending explanations.
+        self.queue_lock = queue_file_lock(self.explanations_file)
         
         # In-memory set to track delivered IDs for the current session to prevent duplicates.
         self.delivered_explanations: Set[str] = set()
@@ -101,6 +104,9 @@ class ExplanationDeliveryService:
                 await self._deliver_explanation(explanation)
                 self.delivered_explanations.add(explanation_id)
                 delivered_ids_in_batch.append(explanation_id)
+            elif explanation_id:
+                # Delivered before but not marked (e.g. interrupted): mark it, or it is loaded forever
+                delivered_ids_in_batch.append(explanation_id)
         
         if delivered_ids_in_batch:
             await self._mark_batch_as_delivered(delivered_ids_in_batch)
@@ -124,6 +130,15 @@ class ExplanationDeliveryService:
 
     async def _load_ready_explanations(self) -> List[Dict]:
         """Asynchronously load explanations with status 'ready_for_delivery'."""
+        durable_queues = get_durable_queues_instance()
+        if durable_queues is not None:
+            # Claimed as 'delivering': another backend process sharing the database skips them
+            try:
+                return await durable_queues.explanations.claim("ready_for_delivery", "delivering", limit=50)
+            except Exception as e:
+                logger.error(f"Error loading explanations from the durable queue: {e}")
+                return []
+
         async with self.queue_lock:
             try:
                 async with aiofiles.open(self.explanations_file, 'r', encoding='utf-8') as f:
@@ -184,6 +199,15 @@ class ExplanationDeliveryService:
         if not delivered_ids:
             return
 
+        durable_queues = get_durable_queues_instance()
+        if durable_queues is not None:
+            try:
+                await durable_queues.explanations.set_status(delivered_ids, "delivered", delivered_at=time.time())
+                await durable_queues.maybe_compact()
+            except Exception as e:
+                logger.error(f"Error marking explanations as delivered in the durable queue: {e}")
+            return
+
         delivered_id_set = set(delivered_ids)
         async with self.queue_lock:
             try:
@@ -0,0 +1,199 @@
+# Backend/services/HostedSTTService.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..models.UniversalMessage import UniversalMessage
+from ..queues.QueueTypes import AbstractMessageQueue
+from ..STT.audio_codec import DEFAULT_ENCODING, ENCODINGS, decode_frame
+
+logger = logging.getLogger(__name__)
+
+# Backend-hosted STT is opt-in: clients (transcribe.py --stream-audio) stream audio and one
+# shared model transcribes every session
+HOSTED_STT_ENABLED = os.getenv("STT_HOSTED", "0").lower() in ("1", "true", "yes")
+HOSTED_STT_WORKERS = int(os.getenv("STT_HOSTED_WORKERS", "2"))  # Transcriptions running at once
+HOSTED_STT_MODEL_SIZE = os.getenv("STT_HOSTED_MODEL_SIZE")  # Default: the STT module's Config.MODEL_SIZE
+HOSTED_STT_MAX_SESSIONS = int(os.getenv("STT_HOSTED_MAX_SESSIONS", "16"))
+SESSION_FLUSH_TIMEOUT_S = 30.0  # Longest wait for the last utterance when a stream stops
+
+
+class _QueueSocket:
+    """
+    Stands in for the backend WebSocket of an STTService running inside the backend: its
+    messages go straight into the incoming queue, as if the STT module had sent them.
+    """
+
+    open = True
+
+    def __init__(self, client_id: str, incoming_queue: AbstractMessageQueue):
+        self.client_id = client_id
+        self.incoming_queue = incoming_queue
+
+    async def send(self, data: str):
+        message = UniversalMessage.model_validate(json.loads(data))
+        if message.type == "stt.heartbeat":
+            return  # Keep-alives are for network connections; stats are in HostedSTTService.stats()
+        message.client_id = self.client_id
+        message.origin = "hosted_stt"
+        await self.incoming_queue.enqueue(message)
+
+
+class _HostedSession:
+    def __init__(self, client_id: str, encoding: str, service, task: asyncio.Task):
+        self.client_id = client_id
+        self.encoding = encoding
+        self.service = service
+        self.task = task
+        self.started_at = time.time()
+        self.frames = 0
+        self.bytes = 0
+
+
+class HostedSTTService:
+    """
+    Runs the STT pipeline inside the backend for clients that stream binary audio frames over
+    their /ws/{client_id} connection instead of running transcribe.py with a model of their own.
+
+    A client starts a stream with an `stt.stream.start` message ({"user_session_id",
+    "encoding", "sample_rate"}), then sends binary frames of mono 16 kHz samples in that
+    encoding (see audio_codec.ENCODINGS) and ends it with `stt.stream.stop` or by disconnecting.
+    Every stream gets its own STTService (VAD, streaming windows, finalization), whose
+    transcriptions enter the incoming queue like those of a standalone STT module. All sessions
+    share one Whisper model and TranscriptionExecutor with `workers` worker threads, which
+    serves finals first and otherwise the session served least recently.
+    """
+
+    def __init__(self, incoming_queue: AbstractMessageQueue, enabled: bool = HOSTED_STT_ENABLED,
+                 workers: int = HOSTED_STT_WORKERS, model_size: Optional[str] = HOSTED_STT_MODEL_SIZE,
+                 max_sessions: int = HOSTED_STT_MAX_SESSIONS):
+        self.incoming_queue = incoming_queue
+        self.enabled = enabled
+        self.workers = workers
+        self.model_size = model_size
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, _HostedSession] = {}
+        self.executor = None
+        self._load_task: Optional[asyncio.Task] = None
+        self.unknown_frames = 0  # Binary frames from clients without a started stream
+
+    async def start(self, model=None):
+        """Creates the shared executor and loads the model in the background (or uses `model`)."""
+        if not self.enabled or self.executor is not None:
+            return
+        # Imported here: the STT stack (faster-whisper) is only needed when hosting is enabled
+        from ..STT.transcribe import BatchedInferencePipeline, Config
+        from ..STT.transcription_executor import TranscriptionExecutor
+
+        self.executor = TranscriptionExecutor(max_pending=Config.TRANSCRIPTION_MAX_PENDING, name="hosted-whisper",
+                                              batched_factory=BatchedInferencePipeline, num_workers=self.workers)
+        if model is not None:
+            self.executor.model = model
+        else:
+            self._load_task = asyncio.create_task(self._load_model())
+        logger.info(f"HostedSTTService started with {self.workers} transcription workers.")
+
+    async def _load_model(self):
+        from ..STT.transcribe import Config, STTService
+
+        model_size = self.model_size or Config.MODEL_SIZE
+        started = time.monotonic()
+        try:
+            self.executor.model = await asyncio.to_thread(STTService._create_model, model_size, Config.CPU_THREADS, self.workers)
+            logger.info(f"HostedSTTService: Whisper model '{model_size}' ready after {time.monotonic() - started:.2f}s.")
+        except Exception as e:
+            logger.critical(f"HostedSTTService: Loading Whisper model '{model_size}' failed: {e}", exc_info=True)
+            self.executor.close(error=RuntimeError(f"Whisper model unavailable: {e}"))
+
+    async def open_session(self, client_id: str, user_session_id: str, encoding: str = DEFAULT_ENCODING,
+                           sample_rate: int = 16000) -> Optional[str]:
+        """Starts transcribing the stream of `client_id`. Returns an error text if it cannot."""
+        if not self.enabled or self.executor is None:
+            return "Backend-hosted STT is disabled (set STT_HOSTED=1)."
+        from ..STT.transcribe import Config, STTService
+
+        if encoding not in ENCODINGS:
+            return f"Unsupported audio encoding '{encoding}', expected one of {sorted(ENCODINGS)}."
+        if sample_rate != Config.SAMPLE_RATE:
+            return f"Unsupported sample rate {sample_rate}, audio must be sent at {Config.SAMPLE_RATE} Hz."
+        if client_id in self.sessions:
+            await self.close_session(client_id)  # A restarted stream replaces the old one
+        if len(self.sessions) >= self.max_sessions:
+            return f"Too many STT streams ({self.max_sessions})."
+
+        service = STTService(user_session_id, transcriber=self.executor.for_session(client_id))
+        service.audio_transport.bind_loop(asyncio.get_running_loop())
+        task = asyncio.create_task(service._process_audio_loop(_QueueSocket(client_id, self.incoming_queue)))
+        self.sessions[client_id] = _HostedSession(client_id, encoding, service, task)
+        logger.info(f"HostedSTTService: Stream of {client_id} started ({encoding}, session {user_session_id}).")
+        return None
+
+    def feed(self, client_id: str, data: bytes) -> bool:
+        """Hands one binary audio frame to the session of `client_id`. False if it has no stream."""
+        session = self.sessions.get(client_id)
+        if session is None:
+            self.unknown_frames += 1
+            if self.unknown_frames == 1 or self.unknown_frames % 100 == 0:
+                logger.warning(f"HostedSTTService: Binary frame from {client_id} without stt.stream.start ({self.unknown_frames} so far).")
+            return False
+        session.frames += 1
+        session.bytes += len(data)
+        session.service.audio_transport.push(decode_frame(data, session.encoding))
+        return True
+
+    async def close_session(self, client_id: str, flush: bool = True):
+        """Ends the stream of `client_id`; with `flush`, its last utterance is transcribed first."""
+        session = self.sessions.pop(client_id, None)
+        if session is None:
+            return
+        service = session.service
+        if flush and not session.task.done():
+            try:
+                await asyncio.wait_for(self._flush(service, session.task), timeout=SESSION_FLUSH_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                logger.warning(f"HostedSTTService: Last utterance of {client_id} not finished after {SESSION_FLUSH_TIMEOUT_S}s; dropping it.")
+        service.stop()
+        session.task.cancel()
+        await asyncio.gather(session.task, return_exceptions=True)
+        logger.info(f"HostedSTTService: Stream of {client_id} closed after {session.frames} frames ({session.bytes} bytes).")
+
+    async def _flush(self, service, task: asyncio.Task):
+        """
+        Appends enough silence to end the current utterance and waits until it is processed,
+        or until the session's audio loop `task` ends and nothing reads the silence any more.
+        """
+        from ..STT.transcribe import Config
+
+        transport = service.audio_transport
+        transport.push(np.zeros(int((Config.VAD_SILENCE_DURATION_S + 0.5) * Config.SAMPLE_RATE), dtype=np.float32))
+        while (transport.depth() > 0 or not transport.consumer_waiting) and not task.done():
+            await asyncio.sleep(0.01)
+
+    async def stop(self):
+        for client_id in list(self.sessions):
+            await self.close_session(client_id, flush=False)
+        if self._load_task is not None:
+            self._load_task.cancel()
+            await asyncio.gather(self._load_task, return_exceptions=True)
+        if self.executor is not None:
+            self.executor.close()
+            self.executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "model_ready": self.executor is not None and self.executor.model is not None,
+            "sessions": {
+                cid: {"encoding": s.encoding, "frames": s.frames, "bytes": s.bytes,
+                      "audio_transport": s.service.audio_transport.stats(),
+                      "transcription": s.service.transcriber.stats(), "latency": s.service.latency.snapshot()}
+                for cid, s in self.sessions.items()
+            },
+            "unknown_frames": self.unknown_frames,
+        }
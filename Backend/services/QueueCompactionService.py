@@ -0,0 +1,178 @@
+# Backend/services/QueueCompactionService.py
+
+import asyncio
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiofiles
+
+from ..queues.FileQueueLocks import queue_file_lock
+
+logger = logging.getLogger(__name__)
+
+# Terminal entries (processed detections, delivered explanations) stay in the queue files for
+# QUEUE_RETENTION seconds, then move to the archive
+QUEUE_RETENTION_S = float(os.getenv("QUEUE_RETENTION", "300"))
+QUEUE_COMPACT_INTERVAL_S = float(os.getenv("QUEUE_COMPACT_INTERVAL", "60"))
+# Append-only JSON-lines archive of the removed entries; empty = removed entries are dropped
+QUEUE_ARCHIVE_FILE = os.getenv("QUEUE_ARCHIVE_FILE", "Backend/AI/queue_archive.jsonl")
+QUEUE_ARCHIVE_MAX_BYTES = int(os.getenv("QUEUE_ARCHIVE_MAX_BYTES", str(10 * 1024 * 1024)))
+QUEUE_ARCHIVE_BACKUPS = int(os.getenv("QUEUE_ARCHIVE_BACKUPS", "5"))
+
+# Queue file -> terminal status and the field holding the time it was reached
+DEFAULT_QUEUE_FILES: Dict[str, Tuple[str, str]] = {
+    "Backend/AI/detections_queue.json": ("processed", "processed_at"),
+    "Backend/AI/explanations_queue.json": ("delivered", "delivered_at"),
+}
+
+
+class QueueCompactionService:
+    """
+    Periodically removes terminal entries older than the retention from the JSON file queues,
+    so the read-modify-write of every producer and consumer stays proportional to the live
+    entries instead of everything since startup. Removed entries are appended to a size-rotated
+    archive (queue_archive.jsonl, .1, .2, ...). Compaction holds the same lock per file as
+    SmallModel, MainModel and the ExplanationDeliveryService.
+    """
+
+    def __init__(self, queue_files: Optional[Dict[str, Tuple[str, str]]] = None,
+                 retention_s: float = QUEUE_RETENTION_S, interval_s: float = QUEUE_COMPACT_INTERVAL_S,
+                 archive_file: Optional[str] = QUEUE_ARCHIVE_FILE):
+        self.queue_files = {Path(path): rule for path, rule in (queue_files or DEFAULT_QUEUE_FILES).items()}
+        self.retention_s = retention_s
+        self.interval_s = interval_s
+        self.archive_file = Path(archive_file) if archive_file else None
+        self.archive_max_bytes = QUEUE_ARCHIVE_MAX_BYTES
+        self.archive_backups = QUEUE_ARCHIVE_BACKUPS
+        self._running = False
+        self._task: Optional[asyncio.Task] = None
+        self.compactions = 0
+        self.archived = 0
+        self.last_duration_ms = 0.0
+        self._entries: Dict[str, Dict[str, int]] = {}  # Status counts per file at the last compaction
+        logger.info("QueueCompactionService initialized")
+
+    async def start(self):
+        if not self._running:
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"QueueCompactionService started (retention {self.retention_s}s, every {self.interval_s}s)")
+
+    async def stop(self):
+        if self._running:
+            self._running = False
+            if self._task:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+            logger.info("QueueCompactionService stopped")
+
+    async def _run(self):
+        while self._running:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error compacting the queue files: {e}", exc_info=True)
+
+    async def compact(self) -> int:
+        """Compacts every queue file once. Returns the number of entries removed."""
+        started = time.perf_counter()
+        removed = 0
+        for path, (terminal_status, reached_field) in self.queue_files.items():
+            removed += await self._compact_file(path, terminal_status, reached_field)
+        self.compactions += 1
+        self.archived += removed
+        self.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        if removed:
+            logger.info(f"QueueCompactionService: Archived {removed} terminal queue entries in {self.last_duration_ms}ms.")
+        return removed
+
+    async def _compact_file(self, path: Path, terminal_status: str, reached_field: str) -> int:
+        cutoff = time.time() - self.retention_s
+        async with queue_file_lock(path):
+            try:
+                async with aiofiles.open(path, 'r', encoding='utf-8') as f:
+                    content = await f.read()
+                entries = json.loads(content) if content.strip() else []
+            except FileNotFoundError:
+                return 0
+            except json.JSONDecodeError as e:
+                logger.error(f"QueueCompactionService: Skipping unreadable queue file {path}: {e}")
+                return 0
+
+            kept, expired = [], []
+            for entry in entries:
+                reached = entry.get(reached_field, entry.get("timestamp", 0))
+                if entry.get("status") == terminal_status and isinstance(reached, (int, float)) and reached < cutoff:
+                    expired.append(entry)
+                else:
+                    kept.append(entry)
+            self._entries[path.name] = self._count_statuses(kept)
+            if not expired:
+                return 0
+
+            # Archive first: a crash in between leaves an entry in both places, never in neither
+            if self.archive_file is not None:
+                await asyncio.to_thread(self._archive, path.name, expired)
+            temp_file = path.with_suffix('.tmp')
+            async with aiofiles.open(temp_file, 'w', encoding='utf-8') as f:
+                await f.write(json.dumps(kept, indent=2, ensure_ascii=False))
+            await asyncio.to_thread(os.replace, str(temp_file), str(path))
+        return len(expired)
+
+    def _archive(self, queue_name: str, entries: List[Dict[str, Any]]):
+        self.archive_file.parent.mkdir(parents=True, exist_ok=True)
+        if self.archive_file.exists() and self.archive_file.stat().st_size >= self.archive_max_bytes:
+            self._rotate_archive()
+        archived_at = time.time()
+        with self.archive_file.open('a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps({"queue": queue_name, "archived_at": archived_at, "entry": entry}, ensure_ascii=False) + "\n")
+
+    def _rotate_archive(self):
+        """queue_archive.jsonl -> .1 -> .2 ...; the oldest beyond archive_backups is deleted."""
+        def backup(n: int) -> Path:
+            return self.archive_file.with_name(f"{self.archive_file.name}.{n}")
+
+        backup(self.archive_backups).unlink(missing_ok=True)
+        for n in range(self.archive_backups - 1, 0, -1):
+            if backup(n).exists():
+                backup(n).replace(backup(n + 1))
+        if self.archive_backups > 0:
+            self.archive_file.replace(backup(1))
+        else:
+            self.archive_file.unlink()
+
+    @staticmethod
+    def _count_statuses(entries: List[Dict[str, Any]]) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in entries:
+            status = entry.get("status", "unknown")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+    def stats(self) -> Dict[str, Any]:
+        """Current file sizes, entries by status at the last compaction, and compaction totals."""
+        files = {}
+        for path in self.queue_files:
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            files[path.name] = {"bytes": size, "entries": self._entries.get(path.name, {})}
+        return {
+            "files": files,
+            "compactions": self.compactions,
+            "archived": self.archived,
+            "last_duration_ms": self.last_duration_ms,
+            "retention_s": self.retention_s,
+        }
@@ -2,7 +2,7 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, Optional, List
+from typing import Awaitable, Callable, Dict, Optional, List
 
 from pydantic import ValidationError
 from starlette.websockets import WebSocket, WebSocketDisconnect, WebSocketState
@@ -20,6 +20,10 @@ class WebSocketManager:
         self.incoming_queue = incoming_queue
         self.websocket_out_queue = outgoing_queue
         self._dispatcher_task: Optional[asyncio.Task] = None
+        # Binary frames (audio for the backend-hosted STT) bypass the queues and go to this
+        # handler; on_disconnect is awaited when a client's connection is gone
+        self.binary_handler: Optional[Callable[[str, bytes], bool]] = None
+        self.on_disconnect: Optional[Callable[[str], Awaitable[None]]] = None
         logger.info("WebSocketManager initialized.")
 
     async def start(self):
@@ -103,6 +107,11 @@ class WebSocketManager:
             if client_id in self.client_tasks: del self.client_tasks[client_id]
             # HINZUGEFÜGT: Bereinigung der Session-Map bei Disconnect
             if client_id in self.user_session_map: del self.user_session_map[client_id]
+            if self.on_disconnect:
+                try:
+                    await self.on_disconnect(client_id)
+                except Exception as e:
+                    logger.error(f"Error in disconnect handler for {client_id}: {e}", exc_info=True)
             logger.info(f"Connection for {client_id} cleaned up.")
             
     async def _message_dispatcher(self):
@@ -153,7 +162,16 @@ class WebSocketManager:
         """Listens for incoming messages from a single client."""
         try:
             while True:
-                data = await websocket.receive_text()
+                event = await websocket.receive()
+                if event["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(event.get("code", 1000))
+                if event.get("bytes") is not None:
+                    if self.binary_handler:
+                        self.binary_handler(client_id, event["bytes"])
+                    else:
+                        logger.warning(f"Dropped binary frame from {client_id}: no handler for binary messages.")
+                    continue
+                data = event.get("text")
                 try:
                     message = UniversalMessage.model_validate(json.loads(data))
                     
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Manual microbenchmark of the shared hallucination filter: time per sentence for the STT and
+SmallModel (context-aware) layers, on clean speech and on hallucinations.
+
+    python Backend/tests/benchmark_hallucination_filter.py
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from Backend.core.hallucination_filter import context_aware_filter, stt_filter
+
+CORPUS = json.loads((Path(__file__).parent / "hallucination_corpus.json").read_text(encoding="utf-8"))
+CLEAN = [e["text"] for e in CORPUS if not e["stt_blocked"] and not stt_filter.find_patterns(e["text"].lower())]
+HALLUCINATIONS = [e["text"] for e in CORPUS if e["stt_blocked"]]
+
+
+def bench(label, func, sentences, number=2000):
+    seconds = timeit.timeit(lambda: [func(s) for s in sentences], number=number)
+    print(f"{label:<40} {seconds / (number * len(sentences)) * 1e6:8.2f} us/sentence")
+
+
+if __name__ == "__main__":
+    print(f"{len(CLEAN)} clean sentences, {len(HALLUCINATIONS)} hallucinations\n")
+    bench("STT filter, clean", stt_filter.check, CLEAN)
+    bench("STT filter, hallucinations", stt_filter.check, HALLUCINATIONS)
+    bench("SmallModel filter, clean", context_aware_filter.check, CLEAN)
+    bench("SmallModel filter, hallucinations", context_aware_filter.check, HALLUCINATIONS)
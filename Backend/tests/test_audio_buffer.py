@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the preallocated STT audio buffers (pre-roll ring buffer and utterance store).
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.STT.audio_buffer import AudioRingBuffer, UtteranceBuffer
+
+
+def test_ring_buffer_keeps_newest_samples_in_order():
+    ring = AudioRingBuffer(5)
+    ring.write(np.arange(3, dtype=np.float32))
+    assert ring.snapshot().tolist() == [0, 1, 2]
+
+    ring.write(np.arange(3, 7, dtype=np.float32))
+    assert len(ring) == 5
+    assert ring.snapshot().tolist() == [2, 3, 4, 5, 6]
+
+    # A block larger than the capacity only keeps its newest samples
+    ring.write(np.arange(10, 20, dtype=np.float32))
+    assert ring.snapshot().tolist() == [15, 16, 17, 18, 19]
+
+    ring.clear()
+    assert len(ring) == 0 and ring.snapshot().size == 0
+
+
+def test_utterance_buffer_returns_zero_copy_views():
+    buf = UtteranceBuffer(8)
+    buf.append(np.ones((4, 1), dtype=np.float32))  # sounddevice delivers (frames, channels)
+    buf.append(np.full(3, 2, dtype=np.float32))
+
+    full = buf.view()
+    assert full.tolist() == [1, 1, 1, 1, 2, 2, 2]
+    assert np.shares_memory(full, buf.tail(2))
+    assert buf.tail(2).tolist() == [2, 2]
+    assert buf.view(0, 4).tolist() == [1, 1, 1, 1]
+
+
+def test_utterance_buffer_grows_and_alternates_stores():
+    buf = UtteranceBuffer(4)
+    buf.append(np.arange(10, dtype=np.float32))
+    assert len(buf) == 10 and buf.capacity >= 10
+    assert buf.view().tolist() == list(range(10))
+
+    previous = buf.view()
+    buf.reset()
+    buf.append(np.full(10, -1, dtype=np.float32))
+    # A view handed out for the previous utterance is not overwritten by the next one
+    assert previous.tolist() == list(range(10))
+    assert len(buf) == 10
+
+
+def test_utterance_buffer_onset_and_final_resets_keep_previous_view():
+    buf = UtteranceBuffer(4)
+    previous = None
+    for value in range(3):
+        # Audio loop: reset at speech onset, append, hand out the final view, reset after the final
+        buf.reset()
+        buf.append(np.full(4, value, dtype=np.float32))
+        if previous is not None:
+            # The previous utterance's view is still intact after the next one was written
+            assert previous.tolist() == [value - 1] * 4
+            assert not np.shares_memory(previous, buf.view())
+        previous = buf.view()
+        buf.reset()
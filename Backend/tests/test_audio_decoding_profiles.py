@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the Whisper decoding profiles: each STTService call site uses its own profile,
+and config/CLI overrides reach the model.
+"""
+
+import os
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+from Backend.STT.decoding_profiles import parse_decoding_option, resolve_profile
+from Backend.STT.transcribe import STTService, Config
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+        self.words = []
+
+
+class _RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        return [_Segment(f" part{len(self.calls)}")], None
+
+
+@pytest.fixture
+def service():
+    service = STTService(user_session_id="profiles_test")
+    service.model = _RecordingModel()
+    yield service
+    service.transcriber.close()
+
+
+@pytest.mark.asyncio
+async def test_each_call_site_uses_its_profile(service, monkeypatch):
+    monkeypatch.setattr(Config, "LONG_FORM_BATCH_SIZE", 0)  # Chunks one after another
+    await service._transcribe_interim(np.zeros(Config.SAMPLE_RATE, dtype=np.float32))
+    await service._transcribe_long_audio(np.zeros(5 * Config.SAMPLE_RATE, dtype=np.float32))
+    await service._transcribe_long_audio(np.zeros(30 * Config.SAMPLE_RATE, dtype=np.float32))
+    interim, final, long_first, long_second = service.model.calls
+
+    assert interim["beam_size"] == 1 and interim["without_timestamps"] is True
+    assert interim["word_timestamps"] is True  # Required by local agreement
+    assert final["beam_size"] == 5 and final["condition_on_previous_text"] is False
+    assert long_first["condition_on_previous_text"] is True and "initial_prompt" not in long_first
+    assert long_second["initial_prompt"] == "part3"  # Context carried over from the previous chunk
+    assert all(call["language"] == Config.LANGUAGE for call in service.model.calls)
+
+
+@pytest.mark.asyncio
+async def test_profile_selection_and_overrides_from_config(service, monkeypatch):
+    monkeypatch.setattr(Config, "FINAL_PROFILE", "interim-fast")
+    monkeypatch.setattr(Config, "DECODING_OVERRIDES", {"interim-fast": {"beam_size": 2}})
+    await service._transcribe_long_audio(np.zeros(Config.SAMPLE_RATE, dtype=np.float32))
+    assert service.model.calls[0]["beam_size"] == 2
+    assert service.model.calls[0]["temperature"] == 0.0
+
+
+def test_decoding_option_parsing():
+    assert parse_decoding_option("interim-fast.beam_size=2") == ("interim-fast", "beam_size", 2)
+    assert parse_decoding_option("long-form.temperature=[0.0, 0.2]") == ("long-form", "temperature", [0.0, 0.2])
+    assert parse_decoding_option("final-accurate.initial_prompt=Glossary: ROS, Kubernetes") == \
+        ("final-accurate", "initial_prompt", "Glossary: ROS, Kubernetes")
+    with pytest.raises(ValueError):
+        parse_decoding_option("beam_size=2")
+    with pytest.raises(ValueError):
+        resolve_profile("does-not-exist")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the backend-hosted STT: binary audio frames in compact encodings, fair scheduling
+of several sessions on one shared transcription executor, and the HostedSTTService turning a
+client's audio stream into stt.transcription messages.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+from Backend.STT.audio_codec import decode_frame, encode_frame
+from Backend.STT.transcribe import Config
+from Backend.STT.transcription_executor import TranscriptionExecutor, TranscriptionPriority
+from Backend.services.HostedSTTService import HostedSTTService
+from Backend.services.WebSocketManager import WebSocketManager
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeWhisperModel:
+    def transcribe(self, audio, **kwargs):
+        return [_Segment(" hello from the meeting room")], None
+
+
+class _BlockingModel:
+    """Records the order of transcriptions; the first one waits until released."""
+
+    def __init__(self):
+        self.order = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def transcribe(self, audio, **kwargs):
+        self.order.append(kwargs["tag"])
+        self.started.set()
+        self.release.wait(5)
+        return [], None
+
+
+class _ListQueue:
+    def __init__(self):
+        self.messages = []
+
+    async def enqueue(self, message):
+        self.messages.append(message)
+
+
+def _tone(seconds, amplitude=0.1):
+    t = np.arange(int(seconds * Config.SAMPLE_RATE)) / Config.SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def test_frame_encodings_round_trip():
+    samples = _tone(0.1)
+    assert len(encode_frame(samples, "s16le")) == 2 * len(samples)
+    assert len(encode_frame(samples, "mulaw")) == len(samples)
+    assert np.array_equal(decode_frame(encode_frame(samples, "f32le"), "f32le"), samples)
+    assert np.max(np.abs(decode_frame(encode_frame(samples, "s16le"), "s16le") - samples)) < 1e-4
+    # mu-law keeps the relative error small at speech levels
+    assert np.max(np.abs(decode_frame(encode_frame(samples, "mulaw"), "mulaw") - samples)) < 0.005
+    assert len(decode_frame(encode_frame(samples[:3], "s16le") + b"\x01", "s16le")) == 3
+    with pytest.raises(ValueError):
+        decode_frame(b"", "opus")
+
+
+@pytest.mark.asyncio
+async def test_shared_executor_serves_the_least_recently_served_session_first():
+    model = _BlockingModel()
+    executor = TranscriptionExecutor(model=model)
+    room_a, room_b = executor.for_session("a"), executor.for_session("b")
+    try:
+        first = asyncio.create_task(room_a.transcribe(np.zeros(10), tag="a1"))
+        await asyncio.to_thread(model.started.wait, 5)
+        queued = [asyncio.create_task(room_a.transcribe(np.zeros(10), tag=tag)) for tag in ("a2", "a3")]
+        queued.append(asyncio.create_task(room_b.transcribe(np.zeros(10), tag="b1")))
+        await asyncio.sleep(0.05)
+        assert room_b.stats()["queued_final"] == 1 and room_a.stats()["queued_final"] == 2
+        model.release.set()
+        await asyncio.gather(first, *queued)
+        assert model.order == ["a1", "b1", "a2", "a3"]
+    finally:
+        executor.close()
+
+
+@pytest.mark.asyncio
+async def test_closing_a_session_leaves_the_others_queued():
+    model = _BlockingModel()
+    executor = TranscriptionExecutor(model=model)
+    room_a, room_b = executor.for_session("a"), executor.for_session("b")
+    try:
+        running = asyncio.create_task(room_b.transcribe(np.zeros(10), tag="b1"))
+        await asyncio.to_thread(model.started.wait, 5)
+        dropped = asyncio.create_task(room_a.transcribe(np.zeros(10), tag="a1", priority=TranscriptionPriority.INTERIM))
+        kept = asyncio.create_task(room_b.transcribe(np.zeros(10), tag="b2"))
+        await asyncio.sleep(0.05)
+        room_a.close()
+        model.release.set()
+        with pytest.raises(RuntimeError):
+            await dropped
+        await asyncio.gather(running, kept)
+        assert model.order == ["b1", "b2"]
+    finally:
+        executor.close()
+
+
+@pytest.mark.asyncio
+async def test_streamed_audio_becomes_transcriptions_of_the_client():
+    incoming = _ListQueue()
+    hosted = HostedSTTService(incoming, enabled=True, workers=1)
+    await hosted.start(model=_FakeWhisperModel())
+    try:
+        assert await hosted.open_session("stt_client_1", "user_1", encoding="mulaw") is None
+        audio = np.concatenate([np.zeros(8000, dtype=np.float32), _tone(1.0)])
+        for start in range(0, len(audio), 1600):
+            assert hosted.feed("stt_client_1", encode_frame(audio[start:start + 1600], "mulaw"))
+            await asyncio.sleep(0)
+        await hosted.close_session("stt_client_1")
+    finally:
+        await hosted.stop()
+
+    [message] = [m for m in incoming.messages if m.type == "stt.transcription"]
+    assert (message.client_id, message.origin) == ("stt_client_1", "hosted_stt")
+    assert message.payload["user_session_id"] == "user_1"
+    assert message.payload["text"] == "hello from the meeting room"
+    assert not hosted.feed("stt_client_1", b"\x00\x00")  # Stream is gone
+
+
+@pytest.mark.asyncio
+async def test_flush_stops_waiting_when_the_audio_loop_has_died():
+    hosted = HostedSTTService(_ListQueue(), enabled=True, workers=1)
+    await hosted.start(model=_FakeWhisperModel())
+    try:
+        assert await hosted.open_session("stt_client_1", "user_1") is None
+        session = hosted.sessions["stt_client_1"]
+        session.task.cancel()
+        await asyncio.gather(session.task, return_exceptions=True)
+        # Nothing reads the appended silence any more, so the flush must not wait for it
+        await asyncio.wait_for(hosted._flush(session.service, session.task), timeout=1.0)
+        assert session.service.audio_transport.depth() > 0
+    finally:
+        await hosted.stop()
+
+
+@pytest.mark.asyncio
+async def test_open_session_rejects_what_it_cannot_transcribe():
+    assert await HostedSTTService(_ListQueue(), enabled=False).open_session("c", "u") is not None
+    hosted = HostedSTTService(_ListQueue(), enabled=True, workers=1, max_sessions=1)
+    await hosted.start(model=_FakeWhisperModel())
+    try:
+        assert "encoding" in await hosted.open_session("c", "u", encoding="opus")
+        assert "sample rate" in await hosted.open_session("c", "u", sample_rate=44100)
+        assert await hosted.open_session("c", "u") is None
+        assert "Too many" in await hosted.open_session("d", "u")
+    finally:
+        await hosted.stop()
+
+
+@pytest.mark.asyncio
+async def test_websocket_receiver_hands_binary_frames_to_the_binary_handler():
+    events = [
+        {"type": "websocket.receive", "bytes": b"\x01\x02"},
+        {"type": "websocket.receive", "text": '{"type": "ping", "payload": {}}'},
+        {"type": "websocket.disconnect", "code": 1000},
+    ]
+    websocket = MagicMock()
+
+    async def receive():
+        return events.pop(0)
+
+    websocket.receive = receive
+    incoming = _ListQueue()
+    manager = WebSocketManager(incoming_queue=incoming, outgoing_queue=_ListQueue())
+    frames = []
+    manager.binary_handler = lambda client_id, data: frames.append((client_id, data))
+
+    await manager._receiver(websocket, "stt_client_1")
+
+    assert frames == [("stt_client_1", b"\x01\x02")]
+    assert [m.type for m in incoming.messages] == ["ping"]
+
+
+def test_importing_the_stt_module_leaves_the_host_logging_alone(tmp_path):
+    # In a fresh interpreter: the import runs in the backend process when STT is hosted there
+    (tmp_path / "transcription.log").write_text("written by the STT client\n", encoding="utf-8")
+    code = ("import logging, sys\n"
+            "from unittest.mock import MagicMock\n"
+            "sys.modules['sounddevice'] = MagicMock()\n"
+            "sys.modules['faster_whisper'] = MagicMock()\n"
+            "import Backend.STT.transcribe\n"
+            "print(len(logging.getLogger().handlers), len(logging.getLogger('TranscriptionLog').handlers))\n")
+    repo_root = os.path.join(os.path.dirname(__file__), '..', '..')
+    result = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True, timeout=60,
+                            env={**os.environ, "PYTHONPATH": os.path.abspath(repo_root)})
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["0", "0"]
+    assert (tmp_path / "transcription.log").read_text(encoding="utf-8") == "written by the STT client\n"
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-utterance latency timeline: each final transcription carries its stage
+timestamps, and the stage durations are aggregated into rolling percentiles for the
+heartbeat and the metrics file.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+import Backend.STT.replay as replay
+from Backend.STT.latency import LatencyMetrics, UtteranceTimeline
+from Backend.STT.transcribe import Config, STTService
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeWhisperModel:
+    def transcribe(self, audio, **kwargs):
+        return [_Segment(" a sentence about latency")], None
+
+
+def _timeline(**events):
+    timeline = UtteranceTimeline()
+    for event, at in events.items():
+        timeline.mark(event, at=at)
+    return timeline
+
+
+def test_timeline_payload_is_relative_to_speech_onset():
+    timeline = _timeline(speech_onset=10.0, last_speech=11.0, vad_end=12.5, final_start=12.5,
+                         transcribed=12.8, filtered=12.8005, send_start=12.801, sent=12.803)
+    payload = timeline.to_payload()
+    assert payload["events_ms"]["speech_onset"] == 0.0
+    assert payload["events_ms"]["sent"] == 2803.0
+    durations = payload["durations_ms"]
+    assert durations["endpoint_wait_ms"] == 1500.0
+    assert durations["final_transcribe_ms"] == 300.0
+    assert durations["speech_end_to_sent_ms"] == 1803.0
+    # Stages whose events were not reached are left out
+    assert "onset_to_first_interim_ms" not in durations
+
+
+def test_metrics_keep_rolling_percentiles_and_export(tmp_path):
+    metrics = LatencyMetrics(window=100)
+    for i in range(150):
+        metrics.observe(_timeline(last_speech=0.0, vad_end=0.0, sent=(i + 1) / 1000))
+    summary = metrics.snapshot()["speech_end_to_sent_ms"]
+    # Only the last 100 utterances (51..150 ms) are kept
+    assert (summary["count"], summary["p50"], summary["p99"], summary["max"]) == (100, 101.0, 149.0, 150.0)
+
+    path = tmp_path / "latency.json"
+    metrics.export(path)
+    exported = json.loads(path.read_text(encoding="utf-8"))
+    assert exported["utterances"] == 150
+    assert exported["stages"]["speech_end_to_sent_ms"] == summary
+
+
+@pytest.mark.asyncio
+async def test_replayed_utterance_carries_its_timeline(monkeypatch, tmp_path):
+    t = np.arange(Config.SAMPLE_RATE) / Config.SAMPLE_RATE
+    tone = (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    audio = np.concatenate([np.zeros(8000, dtype=np.float32), tone])
+    monkeypatch.setattr(replay, "load_audio_file", lambda path, sample_rate: audio)
+    audio_file = tmp_path / "clip.wav"
+    audio_file.write_bytes(b"")
+
+    service = STTService(user_session_id="latency_test")
+    service.model = _FakeWhisperModel()
+    websocket = replay.RecordingWebSocket()
+    runner = replay.ReplayRunner(service, Config.SAMPLE_RATE, Config.AUDIO_BLOCK_SIZE,
+                                 silence_tail_s=Config.VAD_SILENCE_DURATION_S + 0.5)
+    await asyncio.wait_for(runner.run([audio_file], websocket), timeout=30)
+
+    [final] = websocket.messages("stt.transcription")
+    latency = final["payload"]["latency"]
+    events = latency["events_ms"]
+    assert list(events)[0] == "speech_onset"
+    for earlier, later in [("last_speech", "vad_end"), ("vad_end", "final_start"),
+                           ("final_start", "transcribed"), ("transcribed", "filtered"), ("filtered", "send_start")]:
+        assert events[earlier] <= events[later]
+    assert "sent" not in events  # Marked after the payload was serialised
+
+    stages = service.latency.snapshot()
+    assert stages["speech_end_to_sent_ms"]["count"] == 1
+    assert stages["send_ms"]["p50"] >= 0
+    assert service._timeline is None
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for long utterances: chunks overlap, are decoded together in one batched call, and
+the words in each overlap are kept only once when the chunk results are merged.
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+from Backend.STT.long_form import FRAMES_PER_SECOND, merge_chunk_words, plan_chunks
+from Backend.STT.streaming import TimedWord, join_words
+from Backend.STT.transcribe import Config, STTService
+
+# One word per second of audio, "w0" to "w44"
+SPOKEN = [f" w{i}" for i in range(45)]
+
+
+def _word(i):
+    return SimpleNamespace(word=SPOKEN[i], start=i + 0.2, end=i + 0.7)
+
+
+class _FakeBatchedPipeline:
+    """Transcribes every clip (with its overlap) like faster-whisper's batched pipeline would."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def transcribe(self, audio, clip_timestamps, **options):
+        self.model.calls.append(dict(options, clip_timestamps=clip_timestamps))
+        segments = []
+        for clip in clip_timestamps:
+            words = [_word(i) for i in range(len(SPOKEN)) if clip["start"] <= i + 0.2 and i + 0.7 <= clip["end"]]
+            segments.append(SimpleNamespace(seek=int(clip["start"] * FRAMES_PER_SECOND), words=words,
+                                            text="".join(w.word for w in words)))
+        return iter(segments), None
+
+
+class _Model:
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        return [SimpleNamespace(text=" sequential", words=[])], None
+
+
+def test_overlap_words_are_kept_once():
+    chunks = plan_chunks(45.0, chunk_s=20.0, overlap_s=2.0)
+    assert chunks == [(0.0, 20.0), (18.0, 38.0), (36.0, 45.0)]
+    # Both chunks heard "w18" and "w19"; the earlier one keeps w18 (centre before 19.0), the later one w19
+    first = [TimedWord(SPOKEN[i], i + 0.2, i + 0.7) for i in range(0, 20)]
+    second = [TimedWord(SPOKEN[i], i + 0.2, i + 0.7) for i in range(18, 38)]
+    third = [TimedWord(SPOKEN[i], i + 0.2, i + 0.7) for i in range(36, 45)]
+    assert join_words(merge_chunk_words(chunks, [first, second, third])) == "".join(SPOKEN).strip()
+
+
+@pytest.mark.asyncio
+async def test_long_utterance_is_decoded_in_one_batched_call(monkeypatch):
+    monkeypatch.setattr(Config, "LONG_FORM_BATCH_SIZE", 4)
+    service = STTService(user_session_id="long_form_test")
+    service.transcriber.batched_factory = _FakeBatchedPipeline
+    service.model = _Model()
+
+    text = await service._transcribe_long_audio(np.zeros(45 * Config.SAMPLE_RATE, dtype=np.float32))
+    assert text == "".join(SPOKEN).strip()
+    (call,) = service.model.calls
+    assert len(call["clip_timestamps"]) == 3 and call["batch_size"] == 4
+    assert call["word_timestamps"] is True and call["vad_filter"] is False
+
+    monkeypatch.setattr(Config, "LONG_FORM_BATCH_SIZE", 0)
+    assert await service._transcribe_long_audio(np.zeros(45 * Config.SAMPLE_RATE, dtype=np.float32)) == \
+        "sequential sequential sequential"
+    service.transcriber.close()
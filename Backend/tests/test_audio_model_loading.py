@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for background Whisper model loading: transcriptions requested while the model is
+still loading wait for it, the model is warmed up on silence first, and a failed load
+fails the waiting transcriptions instead of hanging them.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+import Backend.STT.transcribe as transcribe
+from Backend.STT.transcribe import Config, STTService
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+        self.words = []
+
+
+class _SlowLoadingModel:
+    def __init__(self, release: threading.Event):
+        release.wait(timeout=5)
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(audio)
+        return [_Segment(f" call{len(self.calls)}")], None
+
+
+@pytest.mark.asyncio
+async def test_transcription_waits_for_background_load_and_warm_up(monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(transcribe, "WhisperModel", lambda *args, **kwargs: _SlowLoadingModel(release))
+    service = STTService(user_session_id="loading_test")
+    assert service.model is None and not service.model_ready.is_set()
+
+    loader = service.start_model_loading()
+    assert service.start_model_loading() is None  # Already loading
+    speech = np.full(2 * Config.SAMPLE_RATE, 0.1, dtype=np.float32)
+    pending = asyncio.create_task(service._transcribe_long_audio(speech))
+    await asyncio.sleep(0.1)
+    assert not pending.done()  # Queued in the executor while the model loads
+
+    release.set()
+    assert await asyncio.wait_for(pending, timeout=5) == "call2"
+    await asyncio.to_thread(loader.join)
+    warm_up, utterance = service.model.calls
+    assert len(warm_up) == int(Config.MODEL_WARMUP_S * Config.SAMPLE_RATE) and not warm_up.any()
+    assert len(utterance) == len(speech)
+    assert service.model_ready.is_set() and service._model_stats()["load_s"] >= 0
+    service.transcriber.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_load_fails_waiting_transcriptions(monkeypatch):
+    release = threading.Event()
+
+    def broken_model(*args, **kwargs):
+        release.wait(timeout=5)
+        raise OSError("weights not found")
+
+    monkeypatch.setattr(transcribe, "WhisperModel", broken_model)
+    service = STTService(user_session_id="loading_test")
+    service.start_model_loading()
+    pending = asyncio.create_task(service._transcribe_long_audio(np.zeros(Config.SAMPLE_RATE, dtype=np.float32)))
+    await asyncio.sleep(0.1)
+    release.set()
+
+    with pytest.raises(RuntimeError, match="weights not found"):
+        await asyncio.wait_for(pending, timeout=5)
+    assert not service.model_ready.is_set()
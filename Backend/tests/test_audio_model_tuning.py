@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for RTF-driven Whisper model tuning: startup calibration picks the largest model
+within the real-time-factor budget, is cached per machine, and the online monitor
+suggests another size when the measured RTF drifts.
+"""
+
+import json
+import os
+import sys
+import types
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+import Backend.STT.model_tuning as model_tuning
+import Backend.STT.transcribe as transcribe
+from Backend.STT.model_tuning import RtfMonitor, calibrate
+
+SR = 16000
+# Seconds of processing per second of audio, by model size, with 4 threads (fewer threads are proportionally slower)
+COST = {"tiny": 0.05, "base": 0.15, "small": 0.4, "medium": 1.2}
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+
+class _CostModel:
+    def __init__(self, size, clock, threads):
+        self.size, self.clock, self.threads = size, clock, threads
+
+    def transcribe(self, audio, **options):
+        self.clock.now += COST[self.size] * (4 / self.threads if self.threads else 1) * len(audio) / SR
+        return iter([]), None
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _FakeClock()
+    monkeypatch.setattr(model_tuning, "time", types.SimpleNamespace(perf_counter=clock.perf_counter, monotonic=clock.monotonic))
+    return clock
+
+
+def test_calibration_picks_largest_model_within_budget(clock):
+    factory = lambda size, threads: _CostModel(size, clock, threads)
+    clip = np.zeros(2 * SR, dtype=np.float32)
+
+    choice, results = calibrate(factory, clip, SR, rtf_budget=0.35, model_sizes=list(COST), thread_counts=[2, 4])
+    assert (choice.model_size, choice.cpu_threads) == ("base", 4)
+    assert abs(choice.rtf - 0.15) < 1e-9
+    # "small" is over budget, so "medium" is never benchmarked
+    assert [r["model_size"] for r in results] == ["tiny", "tiny", "base", "base", "small", "small"]
+
+    choice, _ = calibrate(factory, clip, SR, rtf_budget=0.01, model_sizes=list(COST), thread_counts=[4])
+    assert choice.model_size == "tiny"  # Nothing fits: fall back to the smallest
+
+
+def test_service_calibrates_once_and_reuses_cached_choice(clock, monkeypatch, tmp_path):
+    created = []
+
+    def whisper_model(size, cpu_threads=0, **kwargs):
+        created.append(size)
+        return _CostModel(size, clock, cpu_threads)
+
+    cache_file = tmp_path / "tuning.json"
+    monkeypatch.setattr(transcribe, "WhisperModel", whisper_model)
+    monkeypatch.setattr(transcribe.Config, "AUTO_TUNE", True)
+    monkeypatch.setattr(transcribe.Config, "AUTO_TUNE_RTF_BUDGET", 0.5)
+    monkeypatch.setattr(transcribe.Config, "AUTO_TUNE_CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(transcribe, "candidate_thread_counts", lambda: [4])
+
+    monkeypatch.setattr(transcribe.Config, "MODEL_WARMUP", False)
+
+    service = transcribe.STTService(user_session_id="tuning_test")
+    service.start_model_loading().join()
+    assert (service.model_size, service.model.size) == ("small", "small")
+    assert created == ["tiny", "base", "small", "medium"]
+    assert json.loads(cache_file.read_text())["choice"]["model_size"] == "small"
+    service.transcriber.close()
+
+    created.clear()
+    service = transcribe.STTService(user_session_id="tuning_test")
+    service.start_model_loading().join()
+    assert created == ["small"]  # No second calibration on the same machine
+    assert service._model_stats()["model_size"] == "small"
+    service.transcriber.close()
+
+
+def test_monitor_steps_model_size_on_rtf_drift(clock):
+    monitor = RtfMonitor(rtf_budget=0.5, model_sizes=list(COST), current_size="base", min_samples=3, cooldown_s=10)
+    clock.now = 100.0
+    for _ in range(3):
+        monitor.observe(audio_s=5.0, run_s=4.0)  # RTF 0.8, over budget
+    assert monitor.suggestion() == "tiny"
+    assert monitor.suggestion() is None  # Needs new samples and the cooldown first
+
+    for _ in range(3):
+        monitor.observe(audio_s=5.0, run_s=0.5)  # RTF 0.1, far below budget
+    assert monitor.suggestion() is None
+    clock.now += 11
+    assert monitor.suggestion() == "base"
+
+
+@pytest.mark.asyncio
+async def test_service_swaps_model_in_background(monkeypatch):
+    monkeypatch.setattr(transcribe, "WhisperModel", lambda size, **kwargs: types.SimpleNamespace(size=size))
+    service = transcribe.STTService(user_session_id="tuning_test")
+    service.model = types.SimpleNamespace(size="tiny")
+    service.rtf_monitor = MagicMock(suggestion=MagicMock(return_value="base"))
+
+    service._maybe_switch_model()
+    await service._model_switch_task
+    assert (service.model_size, service.model.size) == ("base", "base")
+    assert service._model_switch_task is None
+    service.transcriber.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the STT outbox: unsent transcriptions are bounded in memory, journaled to disk
+so a restarted process resends them, drained in sequence-numbered batches, and the
+backend drops transcriptions it already received.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+from Backend.STT.outbox import SentenceOutbox
+from Backend.STT.transcribe import Config, STTService
+from Backend.MessageRouter import MessageRouter
+from Backend.models.UniversalMessage import UniversalMessage
+
+
+def _message(outbox, text):
+    return outbox.stamp({"id": text, "type": "stt.transcription", "timestamp": 0.0, "payload": {"text": text}})
+
+
+def test_journal_spills_beyond_memory_and_survives_restart(tmp_path):
+    journal = tmp_path / "outbox.jsonl"
+    outbox = SentenceOutbox("stream-a", max_in_memory=2)
+    outbox.open_journal(journal)
+    for i in range(5):
+        outbox.append(_message(outbox, f"s{i}"))
+    assert (len(outbox), outbox.stats()["in_memory"], outbox.stats()["spilled"]) == (5, 2, 3)
+    outbox.ack(1)  # s0 was sent before the process died
+    outbox.close()
+
+    restarted = SentenceOutbox("stream-b", max_in_memory=2)
+    assert restarted.open_journal(journal) == 4
+    drained = []
+    while restarted:
+        batch = restarted.peek(3)
+        drained += [m["payload"]["text"] for m in batch]
+        restarted.ack(len(batch))
+    assert drained == ["s1", "s2", "s3", "s4"]
+    assert journal.read_text(encoding="utf-8") == ""  # Compacted once drained
+
+
+def test_memory_only_outbox_drops_oldest_at_cap():
+    outbox = SentenceOutbox("stream", max_in_memory=2)
+    for i in range(3):
+        outbox.append(_message(outbox, f"s{i}"))
+    assert [m["payload"]["text"] for m in outbox] == ["s1", "s2"]
+    assert outbox.stats()["dropped"] == 1
+
+
+@pytest.mark.asyncio
+async def test_backlog_is_resent_in_order_before_new_sentences(monkeypatch):
+    monkeypatch.setattr(Config, "OUTBOX_BATCH_SIZE", 2)
+    service = STTService(user_session_id="outbox_test")
+    websocket = MagicMock(open=False, send=AsyncMock())
+    for text in ["first sentence here", "second sentence here", "third sentence here"]:
+        await service._send_sentence(websocket, text)
+    assert len(service.unsent_sentences) == 3 and not websocket.send.called
+
+    websocket.open = True
+    await service._send_sentence(websocket, "fourth sentence here")
+    batches = [json.loads(call.args[0]) for call in websocket.send.call_args_list]
+    assert [b["type"] for b in batches] == ["stt.transcription.batch", "stt.transcription.batch"]
+    sent = [m["payload"] for b in batches for m in b["payload"]["messages"]]
+    assert [p["text"] for p in sent] == ["first sentence here", "second sentence here", "third sentence here", "fourth sentence here"]
+    assert [p["seq"] for p in sent] == [1, 2, 3, 4]
+    assert len(service.unsent_sentences) == 0 and service.unsent_sentences.stats()["resent"] == 4
+    service.transcriber.close()
+
+
+@pytest.mark.asyncio
+async def test_router_drops_resent_duplicates():
+    router = MessageRouter()
+    router._small_model.process_message = AsyncMock()
+    router._coalescer.max_delay_s = 0  # One detection request per transcription
+
+    def transcription(seq):
+        return {"type": "stt.transcription", "payload": {"text": f"sentence {seq}", "stream_id": "stt_a", "seq": seq}}
+
+    await router._process_client_message(UniversalMessage.model_validate(transcription(1)))
+    # Sentence 1 arrived but the send raised, so it is resent with sentence 2
+    await router._process_client_message(UniversalMessage(
+        type="stt.transcription.batch", payload={"messages": [transcription(1), transcription(2)]}, client_id="stt_a"
+    ))
+    await asyncio.sleep(0)
+    texts = [call.args[0].payload["text"] for call in router._small_model.process_message.call_args_list]
+    assert texts == ["sentence 1", "sentence 2"]
+
+
+@pytest.mark.asyncio
+async def test_an_invalid_item_does_not_drop_the_rest_of_the_batch():
+    router = MessageRouter()
+    router._small_model.process_message = AsyncMock()
+    router._coalescer.max_delay_s = 0
+
+    def transcription(seq):
+        return {"type": "stt.transcription", "payload": {"text": f"sentence {seq}", "stream_id": "stt_a", "seq": seq}}
+
+    await router._process_client_message(UniversalMessage(
+        type="stt.transcription.batch", client_id="stt_a",
+        payload={"messages": [transcription(1), {"payload": {"text": "no type"}}, transcription(3)]},
+    ))
+    await asyncio.sleep(0)
+    texts = [call.args[0].payload["text"] for call in router._small_model.process_message.call_args_list]
+    assert texts == ["sentence 1", "sentence 3"]
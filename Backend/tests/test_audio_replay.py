@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline replay mode of the STT module: audio is fed through the regular
+VAD and finalization path of STTService and a JSON-serialisable report is produced.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# No audio device or Whisper weights are needed for replay tests
+sys.modules['sounddevice'] = MagicMock()
+
+
+class _Segment:
+    def __init__(self, text):
+        self.text = text
+
+
+class _FakeWhisperModel:
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(len(audio))
+        return [_Segment(f" utterance of {round(len(audio) / 16000)} seconds")], None
+
+
+sys.modules['faster_whisper'] = MagicMock(WhisperModel=_FakeWhisperModel)
+
+import Backend.STT.replay as replay
+from Backend.STT.transcribe import STTService, Config
+
+
+def _tone(seconds):
+    t = np.arange(int(seconds * Config.SAMPLE_RATE)) / Config.SAMPLE_RATE
+    return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * Config.SAMPLE_RATE), dtype=np.float32)
+
+
+@pytest.mark.asyncio
+async def test_replay_reports_utterances_and_real_time_factor(monkeypatch, tmp_path):
+    audio = np.concatenate([_silence(0.5), _tone(1.0), _silence(2.0), _tone(1.0)])
+    monkeypatch.setattr(replay, "load_audio_file", lambda path, sample_rate: audio)
+    audio_file = tmp_path / "meeting.wav"
+    audio_file.write_bytes(b"")
+
+    service = STTService(user_session_id="replay_test")
+    service.model = _FakeWhisperModel()
+
+    report = await asyncio.wait_for(service.run_replay([audio_file]), timeout=30)
+
+    assert report["mode"] == "fast"
+    file_report = report["files"][0]
+    assert abs(file_report["audio_duration_s"] - 4.5) < 1e-6
+    assert file_report["real_time_factor"] is not None
+    assert len(file_report["utterances"]) == 2
+    assert all(u["finalize_latency_s"] >= 0 for u in file_report["utterances"])
+    assert "utterance of" in file_report["transcript"]
+    assert report["total"]["utterances"] == 2
+    json.dumps(report)  # The report must be serialisable as-is
+
+
+def test_collect_replay_files_filters_and_sorts(tmp_path):
+    for name in ["b.flac", "a.wav", "notes.txt"]:
+        (tmp_path / name).write_bytes(b"")
+    files = replay.collect_replay_files(replay_dir=str(tmp_path))
+    assert [f.name for f in files] == ["a.wav", "b.flac"]
+
+    with pytest.raises(FileNotFoundError):
+        replay.collect_replay_files(input_file=str(tmp_path / "missing.wav"))
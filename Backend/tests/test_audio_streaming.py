@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Tests for local-agreement streaming transcription: words confirmed by consecutive windows
+are committed, finalization only transcribes the uncommitted tail, and the utterance so far is
+sent as interim transcripts sharing the final's utterance_id.
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+sys.modules['sounddevice'] = MagicMock()
+sys.modules['faster_whisper'] = MagicMock()
+
+from Backend.STT.replay import RecordingWebSocket
+from Backend.STT.streaming import CommittedPrefixTracker, TimedWord
+from Backend.STT.transcribe import STTService, Config
+
+# The fake model recovers where a window starts in the utterance from the sample values:
+# speech sample i has the magnitude BASE + i * STEP (on a 200 Hz square wave, so the VAD
+# sees a tonal, speech-like signal).
+BASE, STEP = 0.1, 1e-7
+WORD_S = 0.5
+
+
+class _Word:
+    def __init__(self, word, start, end):
+        self.word, self.start, self.end = word, start, end
+
+
+class _Segment:
+    def __init__(self, words):
+        self.words = words
+        self.text = "".join(w.word for w in words)
+
+
+class _ScriptedWhisperModel:
+    """Emits word N for every complete 0.5s slot of speech it is given, with window-relative timestamps."""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        self.calls.append(len(audio))
+        speech = np.flatnonzero(audio)
+        if not len(speech):
+            return [], None
+        first = speech[0]
+        start_sample = int(round((abs(float(audio[first])) - BASE) / STEP)) - first
+        end_sample = start_sample + speech[-1] + 1
+        slot = int(WORD_S * Config.SAMPLE_RATE)
+        words = []
+        for n in range(max(0, -(-start_sample // slot)), end_sample // slot):
+            start = (n * slot - start_sample) / Config.SAMPLE_RATE
+            words.append(_Word(f" w{n}", start, start + WORD_S * 0.8))
+        return [_Segment(words)], None
+
+
+def test_tracker_commits_agreed_prefix_and_forces_stale_words():
+    tracker = CommittedPrefixTracker(max_uncommitted_s=4.0, force_commit_age_s=1.0)
+    first = [TimedWord(" Hello", 0.0, 0.4), TimedWord(" wor", 0.5, 0.9)]
+    assert tracker.update(first, 1.0) == []
+
+    second = [TimedWord(" hello,", 0.0, 0.4), TimedWord(" world", 0.5, 1.0), TimedWord(" and", 1.2, 1.5)]
+    committed = tracker.update(second, 2.0)
+    assert [w.text for w in committed] == [" hello,"]
+    assert tracker.committed_end_s == 0.4
+    assert tracker.hypothesis_text == "world and"
+
+    # The next hypotheses never agree, but the uncommitted span exceeds 4s
+    churn = [TimedWord(" x", 0.5, 1.0), TimedWord(" y", 2.0, 3.0), TimedWord(" z", 4.0, 5.0)]
+    committed = tracker.update(churn, 5.0)
+    assert [w.text for w in committed] == [" x", " y"]
+    assert tracker.committed_text == "hello, x y"
+    assert tracker.hypothesis_text == "z"
+
+
+@pytest.mark.asyncio
+async def test_finalization_transcribes_only_the_uncommitted_tail():
+    speech_s = 12.0
+    n = np.arange(int(speech_s * Config.SAMPLE_RATE))
+    square = np.where(np.sin(2 * np.pi * 200 * n / Config.SAMPLE_RATE) >= 0, 1.0, -1.0)
+    speech = ((BASE + n * STEP) * square).astype(np.float32)
+    lead_in = np.zeros(int(Config.VAD_CALIBRATION_S * 2 * Config.SAMPLE_RATE), dtype=np.float32)
+    tail = np.zeros(int((Config.VAD_SILENCE_DURATION_S + 0.5) * Config.SAMPLE_RATE), dtype=np.float32)
+    audio = np.concatenate([lead_in, speech, tail])
+
+    service = STTService(user_session_id="streaming_test")
+    model = _ScriptedWhisperModel()
+    service.model = model
+    websocket = RecordingWebSocket()
+    service.audio_transport.bind_loop(asyncio.get_running_loop())
+    loop_task = asyncio.create_task(service._process_audio_loop(websocket))
+
+    # Feed block by block and let each streaming window finish, i.e. transcription keeps up
+    for start in range(0, len(audio), Config.AUDIO_BLOCK_SIZE):
+        service.audio_transport.push(audio[start:start + Config.AUDIO_BLOCK_SIZE])
+        while service.audio_transport.depth() or service._streaming_tasks:
+            await asyncio.sleep(0.001)
+    async def final_sent():
+        while not websocket.messages("stt.transcription"):
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(final_sent(), timeout=10)
+    service.is_recording.clear()
+    loop_task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await loop_task
+
+    expected = " ".join(f"w{n}" for n in range(int(speech_s / WORD_S)))
+    assert [m["payload"]["text"] for m in websocket.messages("stt.transcription")] == [expected]
+    assert len(model.calls) >= 3  # At least two streaming windows plus the final pass
+
+    # Interims carry the utterance so far, each text once, and the final's utterance_id
+    interims = websocket.messages("stt.transcription.interim")
+    texts = [m["payload"]["text"] for m in interims]
+    assert texts and len(set(texts)) == len(texts)
+    assert expected.startswith(texts[0])
+    [final] = websocket.messages("stt.transcription")
+    assert {m["payload"]["utterance_id"] for m in interims} == {final["payload"]["utterance_id"]}
+
+    # The final pass covers the uncommitted tail (about one window plus the trailing
+    # silence), not the whole utterance
+    final_call = model.calls[-1]
+    assert final_call < len(audio) / 2
+    assert final_call <= (2 * Config.STREAMING_CHUNK_DURATION_S + Config.VAD_SILENCE_DURATION_S + 1) * Config.SAMPLE_RATE
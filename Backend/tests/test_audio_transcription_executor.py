@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the transcription executor that owns the Whisper model: finals run before
+queued interims, stale interim windows are replaced, and the queue depth is bounded.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.STT.transcription_executor import InterimSuperseded, TranscriptionExecutor, TranscriptionPriority
+
+
+class _GatedModel:
+    """Records the order of transcriptions; the first one blocks until released."""
+
+    def __init__(self):
+        self.order = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def transcribe(self, audio, **options):
+        self.order.append(audio)
+        self.started.set()
+        if len(self.order) == 1:
+            self.release.wait(timeout=5)
+        return iter([f"segments of {audio}"]), None
+
+
+async def _wait_until_running(model):
+    while not model.started.is_set():
+        await asyncio.sleep(0.001)
+
+
+@pytest.mark.asyncio
+async def test_final_overtakes_queued_interims_and_stale_windows_are_replaced():
+    model = _GatedModel()
+    executor = TranscriptionExecutor(model, max_pending=4)
+    interim = dict(priority=TranscriptionPriority.INTERIM, coalesce_key="interim")
+
+    running = asyncio.create_task(executor.transcribe("window-0", **interim))
+    await _wait_until_running(model)
+    stale = asyncio.create_task(executor.transcribe("window-1", **interim))
+    await asyncio.sleep(0.01)
+    newest = asyncio.create_task(executor.transcribe("window-2", **interim))
+    final = asyncio.create_task(executor.transcribe("final", priority=TranscriptionPriority.FINAL))
+    await asyncio.sleep(0.01)
+    model.release.set()
+
+    assert await final == ["segments of final"]
+    assert await newest == ["segments of window-2"]
+    assert await running == ["segments of window-0"]
+    with pytest.raises(InterimSuperseded):
+        await stale
+    assert model.order == ["window-0", "final", "window-2"]
+    assert executor.stats()["superseded"] == 1
+    executor.close()
+
+
+@pytest.mark.asyncio
+async def test_queue_bound_drops_oldest_interims_but_never_finals():
+    model = _GatedModel()
+    executor = TranscriptionExecutor(model, max_pending=2)
+
+    blocker = asyncio.create_task(executor.transcribe("running", priority=TranscriptionPriority.INTERIM))
+    await _wait_until_running(model)
+    old = asyncio.create_task(executor.transcribe("old", priority=TranscriptionPriority.INTERIM))
+    await asyncio.sleep(0.01)
+    finals = [asyncio.create_task(executor.transcribe(f"final-{i}")) for i in range(2)]
+    await asyncio.sleep(0.01)
+
+    stats = executor.stats()
+    assert stats["dropped"] == 1
+    assert stats["queued_final"] == 2 and stats["queued_interim"] == 0
+    with pytest.raises(InterimSuperseded):
+        await old
+
+    model.release.set()
+    await blocker
+    assert [await f for f in finals] == [["segments of final-0"], ["segments of final-1"]]
+    executor.close()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the lock-free audio hand-off between the recording thread and the asyncio loop.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.STT.audio_transport import AudioFrameTransport
+
+
+@pytest.mark.asyncio
+async def test_blocks_from_producer_thread_arrive_in_order():
+    transport = AudioFrameTransport(num_slots=64, block_size=4)
+    transport.bind_loop(asyncio.get_running_loop())
+
+    def producer():
+        for i in range(50):
+            transport.push(np.full((4, 1), i, dtype=np.float32))
+
+    thread = threading.Thread(target=producer)
+    thread.start()
+    received = []
+    for _ in range(50):
+        block = await transport.read(timeout=2.0)
+        received.append(int(block[0]))
+    thread.join()
+
+    assert received == list(range(50))
+    assert transport.stats()["frames_read"] == 200
+    assert transport.stats()["overruns"] == 0
+
+
+@pytest.mark.asyncio
+async def test_reader_wakes_without_waiting_for_timeout():
+    transport = AudioFrameTransport(num_slots=8, block_size=4)
+    loop = asyncio.get_running_loop()
+    transport.bind_loop(loop)
+
+    timer = threading.Timer(0.05, lambda: transport.push(np.ones((4, 1), dtype=np.float32)))
+    timer.start()
+    start = loop.time()
+    block = await transport.read(timeout=5.0)
+    assert block.tolist() == [1, 1, 1, 1]
+    assert loop.time() - start < 1.0
+
+
+@pytest.mark.asyncio
+async def test_overruns_and_large_blocks_are_counted():
+    transport = AudioFrameTransport(num_slots=2, block_size=4)
+    transport.bind_loop(asyncio.get_running_loop())
+
+    # A 10-frame block needs three slots; only two are free
+    transport.push(np.arange(10, dtype=np.float32).reshape(-1, 1), input_overflow=True)
+    stats = transport.stats()
+    assert stats["overruns"] == 1
+    assert stats["dropped_frames"] == 2
+    assert stats["stream_overflows"] == 1
+
+    assert (await transport.read(timeout=0.1)).tolist() == [0, 1, 2, 3]
+    assert (await transport.read(timeout=0.1)).tolist() == [4, 5, 6, 7]
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.read(timeout=0.05)
+
+
+@pytest.mark.asyncio
+async def test_stale_wake_up_does_not_return_an_empty_read():
+    transport = AudioFrameTransport(num_slots=4, block_size=4)
+    loop = asyncio.get_running_loop()
+    transport.bind_loop(loop)
+    transport.push(np.ones((4, 1), dtype=np.float32))
+    await transport.read(timeout=0.1)
+
+    # A wake-up scheduled for an earlier read runs only after the next read() cleared the event
+    loop.call_soon(transport._data_ready.set)
+    with pytest.raises(asyncio.TimeoutError):
+        await transport.read(timeout=0.05)
+    assert transport.depth() == 0
+    assert transport.frames_read == 4
+
+    transport.push(np.full((4, 1), 2, dtype=np.float32))
+    assert (await transport.read(timeout=0.1)).tolist() == [2, 2, 2, 2]
+    assert transport.depth() == 0
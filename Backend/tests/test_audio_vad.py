@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the STT voice activity detection: the adaptive VAD has to end utterances in a
+noisy room where the fixed energy threshold never does, and must not start on clicks.
+"""
+
+import os
+import sys
+
+import numpy as np
+from numpy.random import default_rng
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.STT.vad import AdaptiveVAD, EnergyVAD, create_vad
+
+SR = 16000
+BLOCK = 1600
+
+
+def _voice(seconds, amp=0.2):
+    """Harmonic, pitch-modulated signal standing in for voiced speech."""
+    t = np.arange(int(seconds * SR)) / SR
+    phase = 2 * np.pi * np.cumsum(140 + 20 * np.sin(2 * np.pi * 3 * t)) / SR
+    return (amp * sum(np.sin(k * phase) / k for k in range(1, 12)) / 2).astype(np.float32)
+
+
+def _noise(seconds, amp, seed=0):
+    return default_rng(seed).normal(0, amp, int(seconds * SR)).astype(np.float32)
+
+
+def _block_decisions(vad, audio):
+    return [vad.process(audio[i:i + BLOCK]).is_speech for i in range(0, len(audio), BLOCK)]
+
+
+def test_adaptive_vad_ends_speech_in_noise_where_fixed_threshold_does_not():
+    audio = _noise(5.0, 0.02)
+    audio[int(1.5 * SR):int(3.5 * SR)] += _voice(2.0)
+
+    adaptive = _block_decisions(AdaptiveVAD(SR), audio)
+    fixed = _block_decisions(EnergyVAD(SR, threshold=0.004), audio)
+
+    assert all(fixed)  # The fixed threshold never sees the end of the utterance
+    assert not any(adaptive[:14]) and not any(adaptive[37:])
+    assert all(adaptive[16:35])
+
+
+def test_single_click_does_not_start_speech_and_probabilities_are_per_frame():
+    vad = AdaptiveVAD(SR, frame_ms=20, onset_frames=3)
+    _block_decisions(vad, _noise(0.5, 0.001))  # Calibrate on a quiet room
+
+    click = _noise(0.1, 0.001, seed=1)
+    click[:320] += _voice(0.02, amp=0.5)
+    result = vad.process(click)
+    assert not result.is_speech
+    assert result.speech_prob.shape == (5,)
+    assert result.speech_prob[0] > 0.6 and result.speech_prob[1:].max() < 0.3
+
+    # Blocks that are not a multiple of the frame size carry the remainder over
+    result = vad.process(_voice(0.05))
+    assert result.speech_prob.shape == (2,)
+    result = vad.process(_voice(0.05))
+    assert result.speech_prob.shape == (3,)
+    assert result.is_speech
+
+
+def test_create_vad_selects_mode():
+    assert isinstance(create_vad("energy", SR, 0.004), EnergyVAD)
+    assert isinstance(create_vad("adaptive", SR, 0.004, onset_frames=2), AdaptiveVAD)
@@ -51,14 +51,14 @@ async def test_backend_task_lifecycle():
         
         # Test startup
         await backend.startup_event()
-        
-        # Verify MainModel task was created and stored
-        assert backend.main_model_task is not None
-        assert not backend.main_model_task.done()
-        assert backend.main_model_instance is not None
-        
-        # Test shutdown
-        await backend.shutdown_event()
+        try:
+            # Verify MainModel task was created and stored
+            assert backend.main_model_task is not None
+            assert not backend.main_model_task.done()
+            assert backend.main_model_instance is not None
+        finally:
+            # Test shutdown (also after a failed check: no background task may outlive the test)
+            await backend.shutdown_event()
         
         # Verify task was cancelled
         assert backend.main_model_task.cancelled()
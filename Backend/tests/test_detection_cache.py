@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the SmallModel detection cache: results are reused per normalized sentence, domain
+and role (LRU with a TTL), identical requests in flight share one LLM call, and the sentences of
+a coalesced transcript are cached on their own for manual requests.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.SmallModel import SmallModel
+from Backend.core.detection_cache import DetectionCache, detection_cache_key
+from Backend.core.transcript_coalescer import merge_transcripts
+from Backend.models.UniversalMessage import UniversalMessage
+
+
+def _small_model(monkeypatch, respond):
+    monkeypatch.setattr("Backend.AI.SmallModel.STREAMING_DETECTION", False)
+    small_model = SmallModel()
+    small_model.batch_delay = 0
+    calls = []
+
+    async def query(prompt):
+        calls.append(prompt)
+        return await respond(prompt)
+
+    monkeypatch.setattr(small_model, "_query_ollama_async", query)
+    return small_model, calls
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_detection_and_later_ones_hit_the_cache(monkeypatch):
+    release = asyncio.Event()
+
+    async def respond(prompt):
+        await release.wait()
+        return json.dumps({"terms": [{"term": "Kafka", "confidence": 0.9}]})
+
+    small_model, calls = _small_model(monkeypatch, respond)
+    first = asyncio.create_task(small_model.detect_terms_with_ai("We use Kafka.", "student"))
+    second = asyncio.create_task(small_model.detect_terms_with_ai("we use  KAFKA", "student"))
+    await asyncio.sleep(0.01)
+    release.set()
+    first_terms, second_terms = await asyncio.gather(first, second)
+
+    first_terms[0]["context"] = "changed by the caller"
+    third_terms = await small_model.detect_terms_with_ai("We use Kafka!", "student")
+    await small_model.detect_terms_with_ai("We use Kafka.", "teacher")  # Other role: own detection
+
+    assert len(calls) == 2
+    assert second_terms[0]["term"] == third_terms[0]["term"] == "Kafka"
+    assert third_terms[0]["context"] == "We use Kafka."
+    assert small_model.detection_cache.stats() == {
+        "size": 2, "hits": 1, "misses": 2, "joined": 1, "evictions": 0, "hit_rate": 0.5}
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_are_evicted_and_fallback_results_are_not_cached(monkeypatch):
+    cache = DetectionCache(max_entries=2, ttl_s=60)
+    for n in range(3):
+        cache.put(detection_cache_key(f"sentence {n}", None, None), [])
+    assert cache.get(detection_cache_key("sentence 0", None, None)) is None
+    assert cache.stats()["evictions"] == 1
+    cache.ttl_s = -1
+    assert cache.get(detection_cache_key("sentence 2", None, None)) is None
+
+    async def respond(prompt):
+        raise RuntimeError("Ollama down")
+
+    small_model, calls = _small_model(monkeypatch, respond)
+    fallback_terms = await small_model.detect_terms_with_ai("The database is slow.")
+    assert [t["term"] for t in fallback_terms] == ["database"]
+    assert small_model.detection_cache.stats()["size"] == 0
+
+    # Nor the pattern fallback used when the LLM answers without terms
+    async def respond_empty(prompt):
+        return json.dumps({"terms": []})
+
+    small_model, calls = _small_model(monkeypatch, respond_empty)
+    fallback_terms = await small_model.detect_terms_with_ai("The database is slow.")
+    assert [t["term"] for t in fallback_terms] == ["database"]
+    assert small_model.detection_cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_sentences_of_a_coalesced_transcript_are_cached_for_manual_requests(monkeypatch):
+    async def respond(prompt):
+        return json.dumps({"terms": [{"term": "Kafka", "confidence": 0.9}, {"term": "Flink", "confidence": 0.85}]})
+
+    small_model, calls = _small_model(monkeypatch, respond)
+    monkeypatch.setattr(small_model, "write_detection_to_queue", lambda message, terms: asyncio.sleep(0, True))
+    monkeypatch.setattr(small_model, "send_immediate_detection_notification",
+                        lambda message, terms, status="detected": asyncio.sleep(0))
+    sentences = [UniversalMessage(type="stt.transcription", client_id="stt_a", payload={"text": text, "user_session_id": "u"})
+                 for text in ("Events go through Kafka.", "Flink processes the streams.")]
+
+    await small_model.process_message(merge_transcripts(sentences))
+    manual = await small_model.detect_terms_with_ai("Flink processes the streams.")
+
+    assert len(calls) == 1
+    assert [(t["term"], t["context"]) for t in manual] == [("Flink", "Flink processes the streams.")]
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-process detection pipeline between SmallModel and MainModel: bounded with
+backpressure on the producer, journaled for crash recovery, and consumed without polling.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.MainModel import MainModel
+from Backend.AI.SmallModel import SmallModel
+from Backend.dependencies import set_detection_pipeline_instance
+from Backend.models.UniversalMessage import UniversalMessage
+from Backend.queues.DetectionPipeline import DetectionPipeline
+
+
+def _entry(n):
+    return {"id": f"det_{n}", "term": f"term {n}", "context": "ctx", "timestamp": 0, "status": "pending"}
+
+
+@pytest.mark.asyncio
+async def test_full_pipeline_holds_back_producers_until_the_consumer_takes_entries():
+    pipeline = DetectionPipeline(capacity=2, put_timeout_s=1.0)
+    assert await pipeline.put([_entry(1), _entry(2)])
+
+    blocked = asyncio.create_task(pipeline.put([_entry(3)]))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+
+    batch = await pipeline.get_batch(max_items=1)
+    assert await asyncio.wait_for(blocked, timeout=1.0)
+    assert [e["id"] for e in batch] == ["det_1"]
+    assert pipeline.stats()["depth"] == 2 and pipeline.stats()["in_flight"] == 1
+
+    pipeline.put_timeout_s = 0.05
+    assert not await pipeline.put([_entry(4)])
+    assert pipeline.stats()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_journal_requeues_entries_a_crashed_process_did_not_finish(tmp_path):
+    journal = tmp_path / "detections.jsonl"
+    pipeline = DetectionPipeline()
+    pipeline.open_journal(journal)
+    await pipeline.put([_entry(1), _entry(2), _entry(3)])
+    pipeline.task_done(await pipeline.get_batch(max_items=1))
+    await pipeline.get_batch(max_items=1)  # Taken but never finished
+    pipeline.close()
+
+    restarted = DetectionPipeline()
+    assert restarted.open_journal(journal) == 2
+    assert [e["id"] for e in await restarted.get_batch()] == ["det_2", "det_3"]
+    restarted.task_done([_entry(2), _entry(3)])
+    restarted.close()
+    assert journal.read_text(encoding="utf-8") == ""  # Truncated once idle
+
+
+@pytest.mark.asyncio
+async def test_detections_flow_from_small_model_to_main_model_without_the_file_queue(monkeypatch):
+    pipeline = DetectionPipeline()
+    set_detection_pipeline_instance(pipeline)
+    try:
+        small_model, main_model = SmallModel(), MainModel()
+        explained = asyncio.Event()
+        batches = []
+
+        async def explain_detections(batch):
+            batches.append(batch)
+            explained.set()
+
+        monkeypatch.setattr(main_model, "explain_detections", explain_detections)
+        consumer = asyncio.create_task(main_model.run_continuous_processing())
+        message = UniversalMessage(type="stt.transcription", payload={"text": "x", "user_session_id": "u"}, client_id="c")
+
+        assert await small_model.write_detection_to_queue(
+            message, [{"term": "Kafka", "context": "We use Kafka.", "timestamp": 0, "confidence": 0.8}])
+        await asyncio.wait_for(explained.wait(), timeout=1.0)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+        [[entry]] = batches
+        assert (entry["term"], entry["confidence"], entry["user_session_id"]) == ("Kafka", 0.8, "u")
+        assert small_model.detections_queue_file.read_text(encoding="utf-8") == "[]"
+        assert pipeline.stats()["done"] == 1
+    finally:
+        set_detection_pipeline_instance(None)
+
+
+@pytest.mark.asyncio
+async def test_entries_after_a_failed_explanation_are_requeued_unacknowledged(monkeypatch, tmp_path):
+    journal = tmp_path / "detections.jsonl"
+    pipeline = DetectionPipeline()
+    pipeline.open_journal(journal)
+    set_detection_pipeline_instance(pipeline)
+    try:
+        main_model = MainModel()
+        failed = asyncio.Event()
+        explained = []
+
+        async def explain_detections(batch):
+            if batch[0]["id"] == "det_2" and not failed.is_set():
+                failed.set()
+                raise OSError("disk full")
+            explained.extend(entry["id"] for entry in batch)
+
+        monkeypatch.setattr(main_model, "explain_detections", explain_detections)
+        await pipeline.put([_entry(1), _entry(2), _entry(3)])
+        consumer = asyncio.create_task(main_model.run_continuous_processing())
+        await asyncio.wait_for(failed.wait(), timeout=1.0)
+
+        assert explained == ["det_1"]
+        assert pipeline.stats()["depth"] == 2 and pipeline.stats()["in_flight"] == 0
+        records = [json.loads(line) for line in journal.read_text(encoding="utf-8").splitlines()]
+        assert [r["done"] for r in records if "done" in r] == ["det_1"]  # A restart would replay det_2 and det_3
+
+        # Retried after the back-off, in order
+        await asyncio.wait_for(_wait_until(lambda: len(explained) == 3), timeout=3.0)
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+        assert explained == ["det_1", "det_2", "det_3"]
+        assert pipeline.stats()["requeued"] == 2
+    finally:
+        set_detection_pipeline_instance(None)
+        pipeline.close()
+
+
+async def _wait_until(predicate):
+    while not predicate():
+        await asyncio.sleep(0.01)
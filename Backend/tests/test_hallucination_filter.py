@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the shared Whisper hallucination filter used by the STT module and
+SmallModel. hallucination_corpus.json records the verdicts of both layers for a corpus of
+hallucinations and legitimate sentences; the compiled filter must reproduce them.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.core.hallucination_filter import ALL_PATTERNS, context_aware_filter, stt_filter
+
+CORPUS = json.loads((Path(__file__).parent / "hallucination_corpus.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("entry", CORPUS, ids=[entry["text"][:40] for entry in CORPUS])
+def test_corpus_verdicts(entry):
+    stt_verdict = stt_filter.check(entry["text"])
+    assert stt_verdict.blocked == entry["stt_blocked"], stt_verdict.reason
+    assert context_aware_filter.check(entry["text"]).blocked == entry["smallmodel_blocked"]
+
+
+def test_verdict_reports_rule_and_overlapping_phrases():
+    verdict = stt_filter.check("That's all for today, goodbye!")
+    assert verdict.blocked and verdict.rule == "multiple"
+    assert verdict.matched == ("that's all for today", "goodbye")
+
+    # "thanks" inside "thanks for watching" counts as a second phrase
+    verdict = stt_filter.check("Thanks for watching!")
+    assert verdict.rule == "multiple" and verdict.matched == ("thanks for watching", "thanks")
+
+    verdict = stt_filter.check("Please like and subscribe to my channel")
+    assert (verdict.rule, verdict.pattern) == ("strict", "please like and subscribe")
+
+    verdict = context_aware_filter.check("Thanks to machine learning advances, we can now process this data efficiently")
+    assert not verdict.blocked and verdict.matched == ("thanks",)
+
+
+def test_phrase_scan_matches_substring_search():
+    text = "goodbye bye thank you for your time thanks for your attention please like and subscribe"
+    assert stt_filter.find_patterns(text) == [p for p in ALL_PATTERNS if p in text]
+    assert stt_filter.find_patterns("the cache warmed up after the deploy") == []
+
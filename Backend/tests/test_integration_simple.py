@@ -45,18 +45,18 @@ async def test_backend_integration():
         
         print("Testing startup...")
         await backend.startup_event()
-        
-        # Verify MainModel task was created and stored
-        assert backend.main_model_task is not None
-        assert not backend.main_model_task.done()
-        assert backend.main_model_instance is not None
-        print("✓ MainModel task created and stored successfully")
-        
-        # Let it run briefly
-        await asyncio.sleep(0.1)
-        
-        print("Testing shutdown...")
-        await backend.shutdown_event()
+        try:
+            # Verify MainModel task was created and stored
+            assert backend.main_model_task is not None
+            assert not backend.main_model_task.done()
+            assert backend.main_model_instance is not None
+            print("✓ MainModel task created and stored successfully")
+            
+            # Let it run briefly
+            await asyncio.sleep(0.1)
+        finally:
+            print("Testing shutdown...")
+            await backend.shutdown_event()
         
         # Verify task was cancelled
         assert backend.main_model_task.done()
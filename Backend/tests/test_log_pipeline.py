@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the queue-based logging pipeline: records are written by a background thread as
+JSON lines, a full queue drops records instead of blocking the caller, and hot-path debug
+records are rate limited per call site.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import Backend.core.log_pipeline as log_pipeline
+from Backend.core.log_pipeline import JsonFormatter, QueueLogging, RateLimitFilter
+
+
+def _record(lineno=1, level=logging.DEBUG, msg="audio chunk"):
+    return logging.LogRecord("test", level, "hot_path.py", lineno, msg, None, None)
+
+
+def test_records_are_written_as_json_lines_by_the_writer_thread(tmp_path):
+    path = tmp_path / "test.log"
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    test_logger = logging.getLogger("test_log_pipeline.json")
+    test_logger.propagate = False
+    pipeline = QueueLogging([handler]).start(test_logger, level=logging.DEBUG)
+
+    test_logger.info("Sent %s", "final", extra={"client_id": "stt_1", "seq": 7})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        test_logger.error("Dispatch failed", exc_info=True)
+    pipeline.stop()
+
+    sent, failed = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert (sent["level"], sent["message"], sent["client_id"], sent["seq"]) == ("INFO", "Sent final", "stt_1", 7)
+    assert failed["message"] == "Dispatch failed"
+    assert "ValueError: boom" in failed["exception"]
+
+
+def test_full_queue_drops_records_instead_of_blocking():
+    release = threading.Event()
+
+    class _SlowHandler(logging.Handler):
+        def emit(self, record):
+            release.wait(5)
+
+    test_logger = logging.getLogger("test_log_pipeline.slow")
+    test_logger.propagate = False
+    pipeline = QueueLogging([_SlowHandler()], max_queue=2).start(test_logger, level=logging.INFO)
+    for i in range(10):
+        test_logger.info("message %d", i)
+    assert pipeline.stats()["dropped"] >= 7
+    release.set()
+    pipeline.stop()
+
+
+def test_rate_limit_suppresses_hot_call_sites_and_reports_the_count(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(log_pipeline.time, "monotonic", lambda: now[0])
+    rate_limit = RateLimitFilter(burst=3, interval_s=10.0)
+
+    assert [rate_limit.filter(_record()) for _ in range(5)] == [True, True, True, False, False]
+    assert rate_limit.filter(_record(lineno=2))  # Other call sites have their own budget
+    assert rate_limit.filter(_record(level=logging.WARNING))  # Only debug records are limited
+
+    now[0] = 10.0
+    record = _record()
+    assert rate_limit.filter(record)
+    assert record.getMessage() == "audio chunk [2 similar messages suppressed]"
+    assert rate_limit.suppressed == 2
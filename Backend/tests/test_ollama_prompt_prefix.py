@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for Ollama prompt-prefix reuse: detection and explanation requests start with a fixed
+system message and put what changes per sentence at the end, keep the model loaded with
+keep_alive, warm it up at startup, and record prompt evaluation and generation times.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.MainModel import MainModel
+from Backend.AI.SmallModel import SmallModel
+from Backend.core.ollama_timings import OLLAMA_KEEP_ALIVE
+
+METRICS = {"load_duration": 0, "prompt_eval_count": 40, "prompt_eval_duration": 300_000_000,
+           "eval_count": 20, "eval_duration": 100_000_000}
+
+
+def _recording_client(requests, content="[]"):
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": content}, "done": True, **METRICS})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_detection_requests_share_a_fixed_prefix_and_end_with_the_sentence():
+    requests = []
+    small_model = SmallModel()
+    small_model.batch_delay = 0
+    small_model.http_client = _recording_client(requests)
+
+    await small_model._perform_ai_detection("We deploy with Terraform.", "student", "IT")
+    await small_model._perform_ai_detection("The cache uses Redis.", "teacher", "Medicine")
+    await small_model.warm_up()
+
+    first, second, warm_up = requests
+    assert first["messages"][0] == second["messages"][0] == warm_up["messages"][0]
+    assert first["messages"][0]["role"] == "system" and "Terraform" not in first["messages"][0]["content"]
+    assert first["messages"][1]["content"].rstrip().endswith('"We deploy with Terraform."')
+    assert first["keep_alive"] == OLLAMA_KEEP_ALIVE
+    assert warm_up["options"] == {"num_predict": 1}
+
+    stats = small_model.ollama_timings.stats()
+    assert stats["calls"] == 3 and stats["avg_prompt_eval_ms"] == 300.0 and stats["avg_eval_ms"] == 100.0
+    assert stats["prompt_eval_share"] == 0.75
+
+
+@pytest.mark.asyncio
+async def test_explanation_prompts_keep_the_system_message_fixed():
+    requests = []
+    main_model = MainModel()
+    main_model.http_client = _recording_client(requests, content="A distributed log.")
+
+    plain = main_model.build_prompt("Kafka", "We use Kafka.")
+    tailored = main_model.build_prompt("Kafka", "We use Kafka.", user_role="student", is_retry=True, domain="IT")
+    assert plain[0] == tailored[0]
+    assert "'student'" in tailored[1]["content"] and "regeneration" in tailored[1]["content"]
+    assert tailored[1]["content"].endswith('"We use Kafka."')
+
+    assert await main_model.query_llm(tailored) == "A distributed log."
+    assert requests[0]["keep_alive"] == OLLAMA_KEEP_ALIVE
+    assert main_model.ollama_timings.last["prompt_tokens"] == 40
+
+
+@pytest.mark.asyncio
+async def test_main_model_warm_up_is_cancelled_with_the_processing(monkeypatch):
+    monkeypatch.setattr("Backend.AI.MainModel.OLLAMA_WARMUP", True)
+    main_model = MainModel()
+    warming_up = asyncio.Event()
+
+    async def warm_up():
+        warming_up.set()
+        await asyncio.Event().wait()  # A model load that never finishes
+
+    monkeypatch.setattr(main_model, "warm_up", warm_up)
+    processing = asyncio.create_task(main_model.run_continuous_processing())
+    await asyncio.wait_for(warming_up.wait(), timeout=1.0)
+    processing.cancel()
+    await asyncio.gather(processing, return_exceptions=True)
+
+    assert main_model._warm_up_task.cancelled()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for the QueueCompactionService: terminal entries older than the retention leave the JSON
+file queues for a rotated archive, everything else stays, and the writers of a queue file share
+one lock with it.
+"""
+
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.queues.FileQueueLocks import queue_file_lock
+from Backend.services.QueueCompactionService import QueueCompactionService
+
+
+def _write(path, entries):
+    path.write_text(json.dumps(entries), encoding="utf-8")
+
+
+@pytest.mark.asyncio
+async def test_only_terminal_entries_past_the_retention_are_archived(tmp_path):
+    detections, explanations = tmp_path / "detections_queue.json", tmp_path / "explanations_queue.json"
+    old, now = time.time() - 600, time.time()
+    _write(detections, [
+        {"id": "d1", "status": "processed", "processed_at": old},
+        {"id": "d2", "status": "processing", "timestamp": old},
+    ])
+    _write(explanations, [
+        {"id": "e1", "status": "delivered", "delivered_at": old},
+        {"id": "e2", "status": "delivered", "delivered_at": now},
+        {"id": "e3", "status": "ready_for_delivery", "timestamp": old},
+    ])
+    archive = tmp_path / "queue_archive.jsonl"
+    service = QueueCompactionService(
+        {str(detections): ("processed", "processed_at"), str(explanations): ("delivered", "delivered_at")},
+        retention_s=300, archive_file=str(archive))
+
+    assert await service.compact() == 2
+    assert [e["id"] for e in json.loads(detections.read_text(encoding="utf-8"))] == ["d2"]
+    assert [e["id"] for e in json.loads(explanations.read_text(encoding="utf-8"))] == ["e2", "e3"]
+    records = [json.loads(line) for line in archive.read_text(encoding="utf-8").splitlines()]
+    assert [(r["queue"], r["entry"]["id"]) for r in records] == [
+        ("detections_queue.json", "d1"), ("explanations_queue.json", "e1")]
+
+    stats = service.stats()
+    assert stats["archived"] == 2
+    assert stats["files"]["explanations_queue.json"]["entries"] == {"delivered": 1, "ready_for_delivery": 1}
+
+
+@pytest.mark.asyncio
+async def test_the_archive_is_rotated_when_full(tmp_path):
+    queue, archive = tmp_path / "explanations_queue.json", tmp_path / "queue_archive.jsonl"
+    service = QueueCompactionService({str(queue): ("delivered", "delivered_at")}, retention_s=0,
+                                     archive_file=str(archive))
+    service.archive_max_bytes, service.archive_backups = 1, 2
+
+    for n in range(4):
+        _write(queue, [{"id": f"e{n}", "status": "delivered", "delivered_at": 0}])
+        await service.compact()
+
+    def archived_ids(path):
+        return [json.loads(line)["entry"]["id"] for line in path.read_text(encoding="utf-8").splitlines()]
+
+    assert archived_ids(archive) == ["e3"]
+    assert archived_ids(tmp_path / "queue_archive.jsonl.1") == ["e2"]
+    assert archived_ids(tmp_path / "queue_archive.jsonl.2") == ["e1"]
+    assert not (tmp_path / "queue_archive.jsonl.3").exists()
+
+
+@pytest.mark.asyncio
+async def test_writers_of_one_queue_file_share_a_lock(tmp_path):
+    assert queue_file_lock(tmp_path / "q.json") is queue_file_lock(str(tmp_path / "q.json"))
+    assert queue_file_lock(tmp_path / "q.json") is not queue_file_lock(tmp_path / "other.json")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for SmallModel micro-batching: sentences of several clients arriving within the batch
+delay share one LLM request with numbered sentences, and the terms of the response are handed
+back to the sentence (and so the client) they belong to.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.SmallModel import SmallModel
+
+
+def _small_model(monkeypatch, response, batch_delay=0.05):
+    small_model = SmallModel()
+    small_model.batch_delay = batch_delay
+    prompts = []
+
+    async def query(prompt):
+        prompts.append(prompt)
+        return json.dumps(response)
+
+    monkeypatch.setattr(small_model, "_query_ollama_async", query)
+    return small_model, prompts
+
+
+@pytest.mark.asyncio
+async def test_sentences_of_several_clients_share_one_request(monkeypatch):
+    small_model, prompts = _small_model(monkeypatch, [
+        {"sentence": 2, "term": "Kubernetes", "confidence": 0.85, "context": "wrong", "timestamp": 1},
+        {"sentence": 1, "term": "Kafka", "confidence": 0.8, "timestamp": 1},
+        {"term": "GraphQL", "confidence": 0.7, "timestamp": 1},  # No number: found by its text
+        {"term": "Hallucinated", "confidence": 0.9, "timestamp": 1},  # In no sentence: dropped
+    ])
+
+    kafka, kubernetes, small_talk, graphql = await asyncio.gather(
+        small_model.detect_terms_with_ai("We use Kafka for events."),
+        small_model.detect_terms_with_ai("It runs on Kubernetes."),
+        small_model.detect_terms_with_ai("See you tomorrow then."),
+        small_model.detect_terms_with_ai("The API speaks GraphQL."),
+    )
+
+    assert len(prompts) == 1
+    assert '1. "We use Kafka for events."' in prompts[0] and '4. "The API speaks GraphQL."' in prompts[0]
+    assert [t["term"] for t in kafka] == ["Kafka"]
+    assert kubernetes == [{"term": "Kubernetes", "timestamp": 1, "confidence": 0.85, "context": "It runs on Kubernetes."}]
+    assert small_talk == []
+    assert [t["term"] for t in graphql] == ["GraphQL"]
+    assert small_model.batch_stats == {"sentences": 4, "requests": 1, "max_batch": 4}
+
+
+@pytest.mark.asyncio
+async def test_a_full_batch_is_sent_without_waiting_and_roles_get_their_own_prompt(monkeypatch):
+    small_model, prompts = _small_model(monkeypatch, [], batch_delay=10.0)
+    small_model.batch_max_sentences = 3
+
+    await asyncio.wait_for(asyncio.gather(
+        small_model.detect_terms_with_ai("First sentence here.", user_role="student"),
+        small_model.detect_terms_with_ai("Second sentence here.", user_role="student"),
+        small_model.detect_terms_with_ai("Third sentence here.", user_role="teacher"),
+    ), timeout=1.0)
+
+    assert len(prompts) == 2
+    [student_prompt] = [p for p in prompts if "'student'" in p]
+    assert "numbered sentences" in student_prompt and "Third sentence" not in student_prompt
+    [teacher_prompt] = [p for p in prompts if "'teacher'" in p]
+    assert "in this sentence, considering the user is a 'teacher'" in teacher_prompt
+    assert '"Third sentence here."' in teacher_prompt and "1. " not in teacher_prompt.split("CRITICAL")[0]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_in_flight_batches_and_their_callers(monkeypatch):
+    small_model = SmallModel()
+    small_model.batch_delay = 0.01
+    small_model.batch_max_sentences = 1
+    requested = asyncio.Event()
+
+    async def query(prompt):
+        requested.set()
+        await asyncio.Event().wait()  # Ollama never answers
+
+    monkeypatch.setattr(small_model, "_query_ollama_async", query)
+    caller = asyncio.create_task(small_model._detect_batched("We use Kafka for events."))
+    await asyncio.wait_for(requested.wait(), timeout=1.0)
+    assert len(small_model._batch_tasks) == 1  # The batch request is referenced while it runs
+
+    await small_model.stop()
+
+    assert small_model._batch_tasks == set()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(caller, timeout=1.0)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for speculative term detection: interim transcripts are run through the pattern detector
+and announced as "speculative" during speech; the final transcript of the same utterance
+confirms them without a second announcement or retracts the ones it does not contain.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.SmallModel import SmallModel
+from Backend.models.UniversalMessage import UniversalMessage
+
+
+class _ListQueue:
+    def __init__(self):
+        self.messages = []
+
+    async def enqueue(self, message):
+        self.messages.append(message)
+
+
+def _transcript(text, utterance_id="utt_1", interim=False):
+    return UniversalMessage(
+        type="stt.transcription.interim" if interim else "stt.transcription",
+        payload={"text": text, "utterance_id": utterance_id, "is_interim": interim},
+        client_id="stt_client_1",
+        origin="stt_module",
+    )
+
+
+@pytest.fixture
+def small_model(monkeypatch):
+    model = SmallModel()
+    model.outgoing_queue = _ListQueue()
+    queued = []
+
+    async def final_detection(sentence, user_role=None, domain=None, on_term=None):
+        return await model.detect_terms_fallback(sentence)
+
+    async def write_detection_to_queue(message, terms):
+        queued.extend(term["term"] for term in terms)
+        return True
+
+    monkeypatch.setattr(model, "detect_terms_with_ai", final_detection)
+    monkeypatch.setattr(model, "write_detection_to_queue", write_detection_to_queue)
+    model.queued = queued
+    return model
+
+
+@pytest.mark.asyncio
+async def test_interims_announce_each_term_once_without_cooldown(small_model):
+    await small_model.process_interim(_transcript("we deploy the backpropagation", interim=True))
+    await small_model.process_interim(_transcript("we deploy the backpropagation step to the database", interim=True))
+
+    first, second = small_model.outgoing_queue.messages
+    assert [t["term"] for t in first.payload["detected_terms"]] == ["backpropagation"]
+    assert [t["term"] for t in second.payload["detected_terms"]] == ["database"]
+    assert first.payload["detected_terms"][0]["status"] == "speculative"
+    assert first.payload["utterance_id"] == "utt_1"
+    assert small_model.cooldown_map == {}
+    assert small_model.queued == []
+
+
+@pytest.mark.asyncio
+async def test_final_confirms_known_terms_and_retracts_the_rest(small_model):
+    await small_model.process_interim(_transcript("the backpropagation on the database", interim=True))
+    small_model.outgoing_queue.messages.clear()
+
+    await small_model.process_message(_transcript("the backpropagation and the encryption layer"))
+
+    retraction, immediate = small_model.outgoing_queue.messages
+    assert retraction.type == "detection.retracted"
+    assert retraction.payload["retracted_terms"] == [{"term": "database", "reason": "not_in_final_text"}]
+    assert immediate.type == "detection.immediate"
+    assert [t["term"] for t in immediate.payload["detected_terms"]] == ["encryption"]
+    assert sorted(small_model.queued) == ["backpropagation", "encryption"]
+
+
+@pytest.mark.asyncio
+async def test_blocked_final_retracts_and_late_interims_are_ignored(small_model):
+    await small_model.process_interim(_transcript("the backpropagation step", interim=True))
+    small_model.outgoing_queue.messages.clear()
+
+    await small_model.process_message(_transcript("backpropagation"))  # Too short to be processed
+    await small_model.process_interim(_transcript("the backpropagation step again", interim=True))
+
+    [retraction] = small_model.outgoing_queue.messages
+    assert retraction.payload["retracted_terms"] == [{"term": "backpropagation", "reason": "not_confirmed"}]
+
+
+@pytest.mark.asyncio
+async def test_phrases_reported_by_the_client_do_not_block_the_transcript(small_model):
+    # Only the server-side scan decides; a payload naming a phrase absent from the text is ignored
+    message = _transcript("we deploy the backpropagation step to the database")
+    message.payload["hallucination_matches"] = ["thank you for watching"]
+    await small_model.process_message(message)
+
+    assert sorted(small_model.queued) == ["backpropagation", "database"]
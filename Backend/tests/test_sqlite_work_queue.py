@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Tests for the durable SQLite work queues: atomic claims with a visibility timeout, retention of
+processed and delivered entries, and detections flowing from SmallModel through MainModel to
+the ExplanationDeliveryService without rewriting the JSON queue files.
+"""
+
+import os
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.MainModel import MainModel
+from Backend.AI.SmallModel import SmallModel
+from Backend.dependencies import set_durable_queues_instance
+from Backend.models.UniversalMessage import UniversalMessage
+from Backend.queues.SqliteWorkQueue import DurableQueues, SqliteWorkQueue
+from Backend.services.ExplanationDeliveryService import ExplanationDeliveryService
+
+
+def _entry(n, status="pending"):
+    return {"id": f"det_{n}", "term": f"term {n}", "context": "ctx", "timestamp": n, "status": status}
+
+
+@pytest.mark.asyncio
+async def test_claims_are_exclusive_and_expired_claims_are_handed_out_again(tmp_path):
+    queue = SqliteWorkQueue(tmp_path / "queue.db", "detections")
+    other_process = SqliteWorkQueue(tmp_path / "queue.db", "detections")
+    await queue.add([_entry(1), _entry(2), _entry(3)])
+
+    first = await queue.claim("pending", "processing", limit=2)
+    second = await other_process.claim("pending", "processing", limit=2, visibility_timeout_s=0.0)
+    assert [e["id"] for e in first] == ["det_1", "det_2"]
+    assert [e["id"] for e in second] == ["det_3"] and second[0]["status"] == "processing"
+
+    # The second consumer never finished: its entry is claimed again after the timeout
+    time.sleep(0.01)
+    assert [e["id"] for e in await queue.claim("pending", "processing")] == ["det_3"]
+    assert queue.stats()["reclaimed"] == 1
+
+    await queue.set_status(["det_1"], "processed", explanation="done")
+    assert queue.counts() == {"processing": 2, "processed": 1}
+    queue.close()
+    other_process.close()
+
+
+@pytest.mark.asyncio
+async def test_compaction_deletes_only_terminal_entries_past_the_retention(tmp_path):
+    queues = DurableQueues(tmp_path / "queue.db", retention_s=0.0)
+    await queues.detections.add([_entry(1), _entry(2)])
+    await queues.detections.set_status(["det_1"], "processed")
+    await queues.explanations.add([_entry(3, status="ready_for_delivery")])
+
+    time.sleep(0.01)
+    assert await queues.compact() == 1
+    assert queues.stats()["detections"]["counts"] == {"pending": 1}
+    assert queues.stats()["explanations"]["counts"] == {"ready_for_delivery": 1}
+    queues.close()
+
+
+@pytest.mark.asyncio
+async def test_detections_flow_through_the_durable_queue_to_delivery(tmp_path, monkeypatch):
+    queues = DurableQueues(tmp_path / "queue.db")
+    set_durable_queues_instance(queues)
+    try:
+        small_model, main_model = SmallModel(), MainModel()
+        message = UniversalMessage(type="stt.transcription", payload={"text": "x", "user_session_id": "u"}, client_id="c")
+        assert await small_model.write_detection_to_queue(
+            message, [{"term": "Kafka", "context": "We use Kafka.", "timestamp": 0, "confidence": 0.8}])
+        assert small_model.detections_queue_file.read_text(encoding="utf-8") == "[]"
+
+        async def explain_detections(batch):
+            for detection in batch:
+                await main_model.write_explanation_to_queue({**detection, "explanation": "A log.", "status": "ready_for_delivery"})
+
+        monkeypatch.setattr(main_model, "explain_detections", explain_detections)
+        monkeypatch.setattr("Backend.AI.MainModel.get_explanation_delivery_service_instance", lambda: None)
+        await main_model.process_detections_queue()
+        assert queues.detections.counts() == {"processed": 1}
+
+        delivery = ExplanationDeliveryService(MagicMock())
+        delivery._deliver_explanation = AsyncMock()
+        batch = await delivery._load_ready_explanations()
+        await delivery._process_and_deliver_batch(batch)
+
+        [delivered] = delivery._deliver_explanation.await_args.args
+        assert (delivered["term"], delivered["explanation"]) == ("Kafka", "A log.")
+        assert queues.explanations.counts() == {"delivered": 1}
+    finally:
+        set_durable_queues_instance(None)
+        queues.close()
+
+
+@pytest.mark.asyncio
+async def test_detections_left_by_a_failed_explanation_are_released_at_once(tmp_path, monkeypatch):
+    queues = DurableQueues(tmp_path / "queue.db")
+    await queues.detections.add([_entry(1), _entry(2), _entry(3)])
+    main_model = MainModel()
+
+    async def explain_detections(batch):
+        if batch[0]["id"] == "det_2":
+            raise OSError("disk full")
+
+    monkeypatch.setattr(main_model, "explain_detections", explain_detections)
+    await main_model._process_durable_detections(queues)
+
+    assert queues.detections.counts() == {"processed": 1, "pending": 2}
+    # Claimable again right away, not only after the visibility timeout
+    assert [e["id"] for e in await queues.detections.claim("pending", "processing")] == ["det_2", "det_3"]
+    queues.close()
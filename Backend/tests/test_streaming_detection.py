@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming term detection: term objects are parsed out of Ollama's NDJSON token stream
+as they complete, and each accepted term is announced to the frontend before the response ends.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.SmallModel import SmallModel
+from Backend.core.json_stream import JsonObjectStream
+from Backend.models.UniversalMessage import UniversalMessage
+
+
+def _ndjson(*tokens, done=False):
+    return "".join(json.dumps({"message": {"role": "assistant", "content": t}, "done": done}) + "\n" for t in tokens).encode()
+
+
+class _Outgoing:
+    def __init__(self):
+        self.messages = []
+        self.changed = asyncio.Event()
+
+    async def enqueue(self, message):
+        self.messages.append(message)
+        self.changed.set()
+
+
+def test_objects_are_returned_as_soon_as_they_close():
+    stream = JsonObjectStream()
+    assert stream.feed('Sure! [\n  {"term": "Ka') == []
+    assert stream.feed('fka", "context": "a {braced} \\"quote\\""}') == [
+        {"term": "Kafka", "context": 'a {braced} "quote"'}]
+    assert stream.feed(', {"term": "Flink", "meta": {"n": 1}}, {"term": ') == [{"n": 1}, {"term": "Flink", "meta": {"n": 1}}]
+    assert stream.feed('broken}]') == []
+
+    # Items of a wrapping object's array close before the object itself
+    assert stream.feed('{"terms": [{"term": "Kafka"}, {"term": "Flink"}]}') == [
+        {"term": "Kafka"}, {"term": "Flink"}, {"terms": [{"term": "Kafka"}, {"term": "Flink"}]}]
+
+
+@pytest.mark.asyncio
+async def test_a_term_is_announced_before_the_response_is_complete(monkeypatch):
+    release = asyncio.Event()
+
+    async def body():
+        yield _ndjson('[{"term": "Kafka", "confidence": 0.9', ', "timestamp": 1},')
+        await release.wait()
+        yield _ndjson(' {"term": "Flink", "confidence": 0.85, "timestamp": 1}]')
+        yield _ndjson("", done=True)
+
+    async def handler(request):
+        assert json.loads(request.content)["stream"] is True
+        return httpx.Response(200, content=body())
+
+    small_model = SmallModel()
+    small_model.batch_delay = 0
+    small_model.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    small_model.outgoing_queue = outgoing = _Outgoing()
+    queued = []
+
+    async def write_detection_to_queue(message, terms):
+        queued.extend(terms)
+        return True
+
+    monkeypatch.setattr(small_model, "write_detection_to_queue", write_detection_to_queue)
+    message = UniversalMessage(type="stt.transcription", client_id="stt_a",
+                               payload={"text": "We stream events through Kafka and Flink.", "user_session_id": "u"})
+
+    processing = asyncio.create_task(small_model.process_message(message))
+    await asyncio.wait_for(outgoing.changed.wait(), timeout=1.0)
+    [first] = outgoing.messages
+    assert [t["term"] for t in first.payload["detected_terms"]] == ["Kafka"]
+    assert not processing.done()
+
+    release.set()
+    await asyncio.wait_for(processing, timeout=1.0)
+    # Flink arrived with the end of the stream; Kafka is not announced twice
+    assert [[t["term"] for t in m.payload["detected_terms"]] for m in outgoing.messages] == [["Kafka"], ["Flink"]]
+    assert sorted(t["term"] for t in queued) == ["Flink", "Kafka"]
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Tests for schema-constrained term detection: requests ask Ollama for a compact {"terms": [...]}
+object, which is parsed and validated directly; prose answers of models ignoring the format
+still go through the lenient extraction.
+"""
+
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.SmallModel import DETECTION_SCHEMA, SmallModel
+
+
+def _small_model(content, requests):
+    def handler(request):
+        requests.append(json.loads(request.content))
+        return httpx.Response(200, json={"message": {"role": "assistant", "content": content}, "done": True})
+
+    small_model = SmallModel()
+    small_model.http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return small_model
+
+
+@pytest.mark.asyncio
+async def test_structured_output_is_requested_and_validated():
+    requests = []
+    small_model = _small_model(json.dumps({"terms": [
+        {"term": "Kafka", "confidence": 0.9},
+        {"term": "", "confidence": 0.9},         # Empty term
+        {"term": "Flink", "confidence": "high"},  # Confidence not a number
+        "Redis",
+    ]}), requests)
+
+    terms = await small_model._perform_ai_detection("We use Kafka and Flink.")
+
+    assert requests[0]["format"] == DETECTION_SCHEMA
+    assert [(t["term"], t["confidence"], t["context"]) for t in terms] == [("Kafka", 0.9, "We use Kafka and Flink.")]
+    assert small_model.parse_stats == {"structured": 1, "fallback": 0}
+
+
+@pytest.mark.asyncio
+async def test_a_prose_answer_falls_back_to_lenient_extraction():
+    small_model = _small_model('Here you go:\n[{"term": "Kafka", "confidence": 0.8}]\nHope this helps!', [])
+
+    terms = await small_model._perform_ai_detection("We use Kafka.")
+
+    assert [t["term"] for t in terms] == ["Kafka"]
+    assert small_model.parse_stats == {"structured": 0, "fallback": 1}
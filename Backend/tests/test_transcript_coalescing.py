@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for transcript coalescing: short finals of one client and session are merged into one
+detection request within a time and length window, and SmallModel traces each detected term
+back to the sentence it was said in.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from Backend.AI.SmallModel import SmallModel
+from Backend.core.transcript_coalescer import TranscriptCoalescer
+from Backend.models.UniversalMessage import UniversalMessage
+
+
+def _final(text, client_id="stt_a", user_session_id="user_1", utterance_id=None):
+    return UniversalMessage(
+        type="stt.transcription",
+        payload={"text": text, "user_session_id": user_session_id, "utterance_id": utterance_id},
+        client_id=client_id,
+        origin="stt_module",
+    )
+
+
+@pytest.mark.asyncio
+async def test_short_finals_are_merged_per_client_until_the_deadline():
+    flushed = []
+    coalescer = TranscriptCoalescer(flushed.append, max_delay_s=0.05, target_words=12)
+
+    coalescer.add(_final("We use Kafka."))
+    coalescer.add(_final("For the event bus."))
+    coalescer.add(_final("Other client here.", client_id="stt_b"))
+    assert flushed == [] and coalescer.stats()["pending"] == 3
+
+    await asyncio.sleep(0.1)
+    merged, single = flushed
+    assert merged.payload["text"] == "We use Kafka. For the event bus."
+    assert [s["text"] for s in merged.payload["sources"]] == ["We use Kafka.", "For the event bus."]
+    assert single.payload["text"] == "Other client here." and "sources" not in single.payload
+    assert (coalescer.stats()["received"], coalescer.stats()["requests"]) == (3, 2)
+
+
+@pytest.mark.asyncio
+async def test_a_group_with_enough_words_is_sent_at_once():
+    flushed = []
+    coalescer = TranscriptCoalescer(flushed.append, max_delay_s=10.0, target_words=6)
+
+    coalescer.add(_final("Short one."))
+    coalescer.add(_final("And this makes it long enough."))
+
+    [merged] = flushed
+    assert len(merged.payload["sources"]) == 2
+    assert coalescer.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_terms_of_a_merged_request_keep_their_source_sentence(monkeypatch):
+    small_model = SmallModel()
+    queued = []
+
+    async def detect(sentence, user_role=None, domain=None, on_term=None):
+        assert sentence == "We added encryption. The database is slow."  # Without the hallucination
+        return [{"term": "encryption", "confidence": 0.9, "context": sentence, "timestamp": 0},
+                {"term": "database", "confidence": 0.9, "context": sentence, "timestamp": 0}]
+
+    async def write_detection_to_queue(message, terms):
+        queued.extend(terms)
+        return True
+
+    async def notify(message, terms, status="detected"):
+        pass
+
+    monkeypatch.setattr(small_model, "detect_terms_with_ai", detect)
+    monkeypatch.setattr(small_model, "write_detection_to_queue", write_detection_to_queue)
+    monkeypatch.setattr(small_model, "send_immediate_detection_notification", notify)
+    flushed = []
+    coalescer = TranscriptCoalescer(flushed.append, max_delay_s=10.0)
+    sentences = [_final("We added encryption."), _final("Thanks for watching!"), _final("The database is slow.")]
+    for sentence in sentences:
+        coalescer.add(sentence)
+    coalescer.flush_all()
+
+    await small_model.process_message(flushed[0])
+
+    # Each term points at its own transcript
+    by_term = {term["term"]: term for term in queued}
+    assert by_term["encryption"]["context"] == "We added encryption."
+    assert by_term["encryption"]["source_message_id"] == sentences[0].id
+    assert by_term["database"]["context"] == "The database is slow."
+    assert by_term["database"]["source_message_id"] == sentences[2].id
@@ -254,6 +254,8 @@ class ElectronMyElement extends UI {
       this._showNotification(message.payload.error, 'error');
     } else if (message.type === 'detection.immediate') {
       this._handleImmediateDetection(message.payload);
+    } else if (message.type === 'detection.retracted') {
+      this._handleRetractedDetection(message.payload);
     } else if (message.type === 'explanation.update') {
       this._handleExplanationUpdate(message.payload);
     } else if (message.type === 'explanation.new') {
@@ -693,6 +695,25 @@ class ElectronMyElement extends UI {
     }
   }
 
+  _handleRetractedDetection(payload) {
+    // Terms detected speculatively during speech that the final transcript did not confirm
+    if (!payload || !Array.isArray(payload.retracted_terms)) {
+      console.warn('Renderer: ⚠️ Invalid detection retraction received:', payload);
+      return;
+    }
+    payload.retracted_terms.forEach(termData => {
+      const placeholder = explanationManager.explanations.find(exp =>
+        exp.title === termData.term &&
+        !exp.isDeleted &&
+        exp.content && exp.content.includes(EXPLANATION_CONSTANTS.LOADING_PATTERN)
+      );
+      if (placeholder) {
+        explanationManager.deleteExplanation(placeholder.id);
+        console.log(`Renderer: ↩️ Removed speculative placeholder for "${termData.term}" (${termData.reason})`);
+      }
+    });
+  }
+
   _handleExplanationUpdate(payload) {
     console.log('Renderer: 📝 Explanation update received:', payload);
 
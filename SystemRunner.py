@@ -71,6 +71,9 @@ class SystemRunner:
             str(STT_SCRIPT_PATH),
             f"--user-session-id={user_session_id}"
         ]
+        if os.getenv("STT_HOSTED", "0").lower() in ("1", "true", "yes"):
+            # Backend transkribiert selbst (HostedSTTService); das Modul streamt nur das Mikrofon
+            stt_command.append(f"--stream-audio={os.getenv('STT_STREAM_ENCODING', 's16le')}")
         
         try:
             env = os.environ.copy()